@@ -1,23 +1,73 @@
 import requests
 import logging
-from typing import Optional, Dict, Any
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Iterable, Tuple, Union
 from urllib.parse import urljoin
 from config.settings import settings
+from api.cassette import Cassette, default_cassette
+from api.tracing import TracingHTTPAdapter, end_trace, start_trace
+from api.rate_limiter import FileTokenBucket, default_rate_limiter
+from api.resilience import (
+    AIMDController, RetryBudget, RETRY_STATUSES, IDEMPOTENT_METHODS,
+    backoff_delay, controller_from_settings, default_retry_budget
+)
 
 logger = logging.getLogger(__name__)
 
 
+class _Default:
+    """Значение по умолчанию, отличимое от явно переданного None."""
+
+
+DEFAULT = _Default()
+
+
+@dataclass
+class SearchResult:
+    """Результат одного запроса из пакетного поиска."""
+
+    query: str
+    response: Optional[requests.Response]
+    elapsed: float
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
 class APIClient:
     """API клиент для сайта Лабиринт."""
     
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        cassette: Union[Cassette, None, _Default] = DEFAULT,
+        rate_limiter: Optional[FileTokenBucket] = None
+    ) -> None:
         """
         Инициализация API клиента.
+
+        Args:
+            cassette: Кассета для записи/воспроизведения ответов
+                (по умолчанию выбирается через API_CASSETTE_MODE, None - без кассеты)
+            rate_limiter: Ограничитель частоты запросов
+                (по умолчанию общий для процессов, из API_RATE_LIMIT)
         """
         self.base_url = settings.BASE_URL  
+        self.cassette = default_cassette() if cassette is DEFAULT else cassette
+        self.rate_limiter = rate_limiter if rate_limiter is not None else default_rate_limiter()
         self.session = requests.Session()
         self.session.headers.update(settings.DEFAULT_HEADERS)
         self.timeout = settings.API_TIMEOUT
+        self.max_retries = settings.API_RETRY_COUNT
+        self.retry_budget: RetryBudget = default_retry_budget()
+        self.concurrency: AIMDController = controller_from_settings()
+
+        adapter = TracingHTTPAdapter(pool_connections=4, pool_maxsize=max(settings.API_POOL_SIZE, settings.API_AIMD_MAX))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
  
     def _make_request(
         self,
@@ -27,10 +77,15 @@ class APIClient:
         data: Optional[Dict[str, Any]] = None,
         json_data: Optional[Dict[str, Any]] = None,
         headers: Optional[Dict[str, str]] = None,
-        include_auth: bool = True
+        include_auth: bool = True,
+        stream: bool = False
     ) -> requests.Response:
         """
         Выполнение HTTP запроса.
+
+        Идемпотентные запросы повторяются до max_retries раз при сетевой ошибке
+        или ответе 429/5xx с экспоненциальной задержкой, пока не исчерпан
+        общий бюджет повторов.
         """
         url = urljoin(self.base_url, endpoint)
 
@@ -41,8 +96,72 @@ class APIClient:
         if include_auth and settings.TEST_TOKEN:
             request_headers["Authorization"] = f"Bearer {settings.TEST_TOKEN}"
 
+        if self.cassette is not None and self.cassette.is_replaying:
+            logger.info(f"Replaying {method} request to {url}")
+            return self.cassette.play(method, url, params)
+
+        retryable = method.upper() in IDEMPOTENT_METHODS
+        attempt = 0
+        self.retry_budget.record_request()
+
+        while True:
+            response, error = self._send(
+                method, url, params, data, json_data, request_headers, stream, attempt
+            )
+
+            should_retry = (
+                retryable
+                and attempt < self.max_retries
+                and (error is not None or response.status_code in RETRY_STATUSES)
+            )
+            if should_retry and not self.retry_budget.try_spend():
+                logger.warning(f"Retry budget exhausted, not retrying {method} {url}")
+                should_retry = False
+
+            if not should_retry:
+                if error is not None:
+                    logger.error(f"Request failed: {error}")
+                    raise error
+                if self.cassette is not None and self.cassette.is_recording:
+                    self.cassette.record(method, url, params, response)
+                return response
+
+            delay = self._retry_delay(attempt, response)
+            reason = error if error is not None else f"status {response.status_code}"
+            logger.warning(f"Retrying {method} {url} in {delay:.2f}s (attempt {attempt + 1}): {reason}")
+            if response is not None:
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        data: Optional[Dict[str, Any]],
+        json_data: Optional[Dict[str, Any]],
+        headers: Dict[str, str],
+        stream: bool,
+        attempt: int = 0
+    ) -> Tuple[Optional[requests.Response], Optional[requests.exceptions.RequestException]]:
+        """
+        Одна попытка запроса под ограничителем частоты и контроллером параллельности.
+
+        Разбивка времени попытки доступна в response.trace и передается
+        слушателям api.tracing.
+        """
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+        self.concurrency.acquire()
         logger.info(f"Sending {method} request to {url}")
+        started = time.perf_counter()
+        trace = start_trace(method, url, attempt)
+        released = False
 
+        # Место в лимите параллельности освобождается при любом исходе, иначе
+        # исключение не из requests (ValueError, KeyboardInterrupt) навсегда занимает слот
         try:
             response = self.session.request(
                 method=method,
@@ -50,18 +169,45 @@ class APIClient:
                 params=params,
                 data=data,
                 json=json_data,
-                headers=request_headers,
-                timeout=self.timeout
+                headers=headers,
+                timeout=self.timeout,
+                stream=stream
             )
-            return response
+            self.concurrency.release(time.perf_counter() - started, status=response.status_code)
+            released = True
         except requests.exceptions.RequestException as e:
-            logger.error(f"Request failed: {e}")
+            trace.fail(e)
+            self.concurrency.release(time.perf_counter() - started, error=e)
+            released = True
+            return None, e
+        except BaseException as e:
+            trace.fail(e)
             raise
+        finally:
+            end_trace()
+            if not released:
+                self.concurrency.discard()
+
+        if response.is_redirect:
+            # Переходы по редиректам выключены или не выполнены - ответ 3xx последний
+            trace.body_consumed(response.raw, response.raw.tell())
+        response.trace = trace
+        return response, None
+
+    def _retry_delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        """Задержка перед повтором: Retry-After из ответа или экспоненциальная с джиттером."""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(float(retry_after), settings.API_RETRY_BACKOFF_MAX)
+        return backoff_delay(attempt, settings.API_RETRY_BACKOFF, settings.API_RETRY_BACKOFF_MAX)
 
     def search_books(
         self,
         query: str,
-        include_auth: bool = True
+        include_auth: bool = True,
+        stream: bool = False,
+        page: Optional[int] = None
     ) -> requests.Response:
         """
         Поиск книг.
@@ -69,18 +215,70 @@ class APIClient:
         Args:
             query: Поисковый запрос
             include_auth: Включить авторизацию
+            stream: Не загружать тело ответа сразу (для чтения через iter_content)
+            page: Номер страницы результатов (по умолчанию первая)
 
         Returns:
             Response: Ответ с результатами поиска
         """
         params = {"q": query}
+        if page is not None and page > 1:
+            params["page"] = page
         return self._make_request(
             method="GET",
             endpoint="/search/",
             params=params,
-            include_auth=include_auth
+            include_auth=include_auth,
+            stream=stream
         )
 
+    def search_many(
+        self,
+        queries: Iterable[str],
+        concurrency: Optional[int] = None,
+        include_auth: bool = True,
+        stream: bool = False
+    ) -> List[SearchResult]:
+        """
+        Параллельный поиск по нескольким запросам.
+
+        Запросы выполняются в пуле потоков через общую сессию,
+        поэтому соединения переиспользуются. Лимит AIMD контроллера клиента
+        поднимается до concurrency, но не выше API_AIMD_MAX, и дальше
+        снижается при ошибках и медленных ответах.
+
+        Args:
+            queries: Поисковые запросы
+            concurrency: Максимальное количество одновременных запросов (по умолчанию API_CONCURRENCY)
+            include_auth: Включить авторизацию
+            stream: Не загружать тела ответов сразу
+
+        Returns:
+            List[SearchResult]: Результаты в порядке входных запросов
+        """
+        queries = list(queries)
+        if not queries:
+            return []
+
+        concurrency = concurrency or settings.API_CONCURRENCY
+        workers = max(1, min(concurrency, len(queries)))
+        self.concurrency.ensure_limit(workers, f"search_many concurrency {workers}")
+        if workers > self.concurrency.maximum:
+            logger.info(f"Concurrency {workers} is capped by API_AIMD_MAX={self.concurrency.maximum:g}")
+
+        def run(query: str) -> SearchResult:
+            started = time.perf_counter()
+            try:
+                response = self.search_books(query, include_auth=include_auth, stream=stream)
+                return SearchResult(query, response, time.perf_counter() - started)
+            except requests.exceptions.RequestException as e:
+                return SearchResult(query, None, time.perf_counter() - started, e)
+
+        logger.info(f"Running {len(queries)} search requests with concurrency {workers}")
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="search") as executor:
+            return list(executor.map(run, queries))
+
     def get(self, endpoint: str, **kwargs) -> requests.Response:
         """
         GET запрос.
@@ -0,0 +1,235 @@
+import base64
+import glob
+import json
+import logging
+import os
+import threading
+import zlib
+from datetime import timedelta
+from typing import Optional, Dict, Any, List, Tuple
+from urllib.parse import urlsplit, parse_qsl
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+MODE_OFF = "off"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+SKIPPED_HEADERS = {"content-encoding", "transfer-encoding", "content-length", "set-cookie", "date"}
+
+
+class CassetteMissError(requests.exceptions.ConnectionError):
+    """В кассете нет записи для запроса в режиме воспроизведения."""
+
+
+def normalize_request(
+    method: str,
+    url: str,
+    params: Optional[Dict[str, Any]] = None
+) -> Tuple[str, str, List[Tuple[str, str]]]:
+    """
+    Приводит запрос к ключу сопоставления: метод, путь и отсортированные параметры.
+    Хост не учитывается, поэтому кассета воспроизводится на любом BASE_URL.
+    """
+    parts = urlsplit(url)
+    pairs = parse_qsl(parts.query, keep_blank_values=True)
+
+    for key, value in (params or {}).items():
+        if value is None:
+            continue
+        values = value if isinstance(value, (list, tuple)) else [value]
+        pairs.extend((str(key), str(item)) for item in values)
+
+    return method.upper(), parts.path or "/", sorted(pairs)
+
+
+def request_key(method: str, url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    return json.dumps(normalize_request(method, url, params), ensure_ascii=False, separators=(",", ":"))
+
+
+class Cassette:
+    """
+    Кассета с записанными HTTP-ответами.
+
+    В режиме record ответы сохраняются в файл, в режиме replay отдаются из файла
+    без сетевых запросов. Запись начинается с пустой кассеты и перезаписывает
+    файл, поэтому устаревшие ответы не остаются. Тела ответов хранятся
+    сжатыми (zlib + base64).
+    """
+
+    def __init__(self, path: str, mode: str = MODE_REPLAY) -> None:
+        """
+        Args:
+            path: Путь к файлу кассеты
+            mode: Режим работы: record или replay
+        """
+        self.path = path
+        self.mode = mode
+        self.interactions: Dict[str, List[Dict[str, Any]]] = {}
+        self._played: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        if mode == MODE_REPLAY:
+            self.load()
+
+    @property
+    def is_recording(self) -> bool:
+        return self.mode == MODE_RECORD
+
+    @property
+    def is_replaying(self) -> bool:
+        return self.mode == MODE_REPLAY
+
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            logger.warning(f"Cassette file not found: {self.path}")
+            return
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            self.interactions = json.load(f)
+
+        logger.info(f"Loaded {len(self.interactions)} requests from cassette {self.path}")
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock:
+            data = json.dumps(self.interactions, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+            self._dirty = False
+
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(data)
+
+        logger.info(f"Saved {len(self.interactions)} requests to cassette {self.path}")
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        response: requests.Response
+    ) -> None:
+        """Сохраняет ответ на запрос в кассету."""
+        entry = {
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {
+                name: value for name, value in response.headers.items()
+                if name.lower() not in SKIPPED_HEADERS
+            },
+            "encoding": response.encoding,
+            "body": base64.b64encode(zlib.compress(response.content, 9)).decode("ascii"),
+        }
+
+        key = request_key(method, url, params)
+        with self._lock:
+            self.interactions.setdefault(key, []).append(entry)
+            self._dirty = True
+
+    def play(self, method: str, url: str, params: Optional[Dict[str, Any]] = None) -> requests.Response:
+        """
+        Возвращает записанный ответ на запрос.
+
+        Повторные одинаковые запросы получают записи по порядку, последняя запись повторяется.
+
+        Raises:
+            CassetteMissError: Если запрос не был записан
+        """
+        key = request_key(method, url, params)
+        with self._lock:
+            entries = self.interactions.get(key)
+            if not entries:
+                raise CassetteMissError(f"No recorded response for {key} in {self.path}")
+            index = self._played.get(key, 0)
+            self._played[key] = index + 1
+            entry = entries[min(index, len(entries) - 1)]
+
+        body = zlib.decompress(base64.b64decode(entry["body"]))
+
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.reason = entry["reason"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.headers["Content-Length"] = str(len(body))
+        response.encoding = entry["encoding"]
+        response.url = requests.Request(method, url, params=params).prepare().url
+        response.elapsed = timedelta(0)
+        response._content = body
+        response._content_consumed = True
+        return response
+
+
+_default_cassette: Optional[Cassette] = None
+
+
+def cassette_path(worker: Optional[str] = None) -> str:
+    """
+    Путь к кассете из API_CASSETTE_DIR и API_CASSETTE_NAME.
+
+    Args:
+        worker: Воркер pytest-xdist: при записи каждый воркер пишет в свой файл
+    """
+    name = settings.API_CASSETTE_NAME if worker is None else f"{settings.API_CASSETTE_NAME}.{worker}"
+    return os.path.join(settings.API_CASSETTE_DIR, f"{name}.json")
+
+
+def worker_cassettes() -> List[str]:
+    """Файлы кассет, записанные воркерами pytest-xdist."""
+    pattern = f"{glob.escape(settings.API_CASSETTE_NAME)}.gw*.json"
+    return sorted(glob.glob(os.path.join(glob.escape(settings.API_CASSETTE_DIR), pattern)))
+
+
+def remove_worker_cassettes() -> None:
+    """Удаляет файлы воркеров, оставшиеся от прерванной записи."""
+    for path in worker_cassettes():
+        os.remove(path)
+
+
+def merge_worker_cassettes() -> int:
+    """
+    Собирает записи воркеров pytest-xdist в общую кассету и удаляет их файлы.
+
+    Returns:
+        int: Количество объединенных файлов
+    """
+    parts = worker_cassettes()
+    if not parts:
+        return 0
+
+    merged = Cassette(cassette_path(), MODE_RECORD)
+    for part in parts:
+        with open(part, "r", encoding="utf-8") as f:
+            for key, entries in json.load(f).items():
+                merged.interactions.setdefault(key, []).extend(entries)
+    merged._dirty = True
+    merged.save()
+
+    for part in parts:
+        os.remove(part)
+    return len(parts)
+
+
+def default_cassette() -> Optional[Cassette]:
+    """Кассета, выбранная через API_CASSETTE_MODE, или None, если режим выключен."""
+    global _default_cassette
+
+    mode = settings.API_CASSETTE_MODE.lower()
+    if mode == MODE_OFF:
+        return None
+
+    if mode not in (MODE_RECORD, MODE_REPLAY):
+        raise ValueError(f"Unknown API_CASSETTE_MODE: {settings.API_CASSETTE_MODE}")
+
+    # Воркеры xdist не перезаписывают один файл: их записи объединяет контроллер
+    worker = os.getenv("PYTEST_XDIST_WORKER") if mode == MODE_RECORD else None
+    path = cassette_path(worker)
+    if _default_cassette is None or _default_cassette.path != path or _default_cassette.mode != mode:
+        _default_cassette = Cassette(path, mode)
+    return _default_cassette
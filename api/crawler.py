@@ -0,0 +1,232 @@
+"""
+Обход страниц результатов поиска по HTTP без браузера.
+
+Запуск:
+    python -m api.crawler "война и мир" --prefetch 4 --max-pages 50
+    python -m api.crawler "harry potter" --max-items 1000 --max-seconds 60
+"""
+import argparse
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Deque, Hashable, Iterator, List, Optional
+
+import requests
+
+from api.api_client import APIClient
+from api.search_parser import ProductRecord, iter_search_results
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+END = "end"
+NO_NEW_ITEMS = "no new items"
+PAGES = "max pages"
+ITEMS = "max items"
+TIME = "max time"
+ERROR = "error"
+
+
+@dataclass
+class CrawlStats:
+    """Статистика обхода."""
+
+    pages: int = 0
+    products: int = 0
+    duplicates: int = 0
+    requests: int = 0
+    max_inflight: int = 0
+    elapsed: float = 0.0
+    stop_reason: Optional[str] = None
+    error: Optional[Exception] = None
+
+    def summary(self) -> str:
+        rate = self.pages / self.elapsed if self.elapsed else 0.0
+        return (f"{self.pages} pages ({rate:.1f}/s), {self.products} products, {self.duplicates} duplicates, "
+                f"{self.requests} requests (max {self.max_inflight} in flight), stop: {self.stop_reason}")
+
+
+class SeenProducts:
+    """Множество последних увиденных товаров с вытеснением самых старых (LRU)."""
+
+    def __init__(self, size: int) -> None:
+        """
+        Args:
+            size: Максимальное количество хранимых ключей
+        """
+        self.size = size
+        self._keys: "OrderedDict[Hashable, None]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: Hashable) -> bool:
+        """
+        Запоминает ключ.
+
+        Returns:
+            bool: True, если ключ новый
+        """
+        if key in self._keys:
+            self._keys.move_to_end(key)
+            return False
+        self._keys[key] = None
+        if len(self._keys) > self.size:
+            self._keys.popitem(last=False)
+        return True
+
+
+def product_key(record: ProductRecord) -> Hashable:
+    """Ключ товара для дедупликации: id, иначе URL, иначе название и автор."""
+    if record.id is not None:
+        return record.id
+    return record.url or (record.title, record.author)
+
+
+class SearchCrawler:
+    """
+    Потоковый обход страниц /search/ через APIClient.search_books.
+
+    Следующие страницы запрашиваются заранее, но не больше prefetch
+    одновременно: каждая разбирается потоково в своем потоке, а товары
+    отдаются по порядку страниц. В памяти держатся только страницы окна
+    и ключи дедупликации (не больше dedup_size), поэтому объем памяти не
+    растет с количеством страниц. Обход заканчивается на пустой странице,
+    странице без новых товаров или по лимиту страниц, товаров и времени.
+    """
+
+    def __init__(
+        self,
+        client: APIClient,
+        query: str,
+        prefetch: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        max_items: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+        dedup_size: Optional[int] = None
+    ) -> None:
+        """
+        Args:
+            client: API клиент
+            query: Поисковый запрос
+            prefetch: Количество страниц в обработке одновременно (по умолчанию CRAWL_PREFETCH)
+            max_pages: Максимальное количество страниц
+            max_items: Максимальное количество уникальных товаров
+            max_seconds: Максимальная длительность обхода, сек
+            dedup_size: Размер LRU для дедупликации (по умолчанию CRAWL_DEDUP_SIZE)
+        """
+        self.client = client
+        self.query = query
+        self.prefetch = max(1, prefetch or settings.CRAWL_PREFETCH)
+        self.max_pages = max_pages
+        self.max_items = max_items
+        self.max_seconds = max_seconds
+        self.seen = SeenProducts(dedup_size or settings.CRAWL_DEDUP_SIZE)
+        self.stats = CrawlStats()
+        self._inflight = 0
+        self._lock = threading.Lock()
+
+    def _fetch(self, page: int) -> List[ProductRecord]:
+        with self._lock:
+            self._inflight += 1
+            self.stats.requests += 1
+            self.stats.max_inflight = max(self.stats.max_inflight, self._inflight)
+        try:
+            response = self.client.search_books(self.query, stream=True, page=page)
+            try:
+                response.raise_for_status()
+                return list(iter_search_results(response))
+            finally:
+                response.close()
+        finally:
+            with self._lock:
+                self._inflight -= 1
+
+    def __iter__(self) -> Iterator[ProductRecord]:
+        started = time.perf_counter()
+        deadline = started + self.max_seconds if self.max_seconds is not None else None
+        window: Deque[Future] = deque()
+        next_page = 1
+
+        executor = ThreadPoolExecutor(max_workers=self.prefetch, thread_name_prefix="crawl")
+        try:
+            while True:
+                while len(window) < self.prefetch and (self.max_pages is None or next_page <= self.max_pages):
+                    window.append(executor.submit(self._fetch, next_page))
+                    next_page += 1
+                if not window:
+                    self.stats.stop_reason = PAGES
+                    return
+
+                timeout = None if deadline is None else max(0.0, deadline - time.perf_counter())
+                try:
+                    records = window.popleft().result(timeout=timeout)
+                except TimeoutError:
+                    self.stats.stop_reason = TIME
+                    return
+                except requests.exceptions.RequestException as e:
+                    logger.warning(f"Crawl of '{self.query}' stopped on page {self.stats.pages + 1}: {e}")
+                    self.stats.stop_reason, self.stats.error = ERROR, e
+                    return
+
+                self.stats.pages += 1
+                if not records:
+                    self.stats.stop_reason = END
+                    return
+
+                new = 0
+                for record in records:
+                    if not self.seen.add(product_key(record)):
+                        self.stats.duplicates += 1
+                        continue
+                    new += 1
+                    self.stats.products += 1
+                    yield record
+                    if self.max_items is not None and self.stats.products >= self.max_items:
+                        self.stats.stop_reason = ITEMS
+                        return
+
+                if not new:
+                    self.stats.stop_reason = NO_NEW_ITEMS
+                    return
+                if deadline is not None and time.perf_counter() >= deadline:
+                    self.stats.stop_reason = TIME
+                    return
+        finally:
+            for future in window:
+                future.cancel()
+            # Уже начатые запросы дожидаются (не дольше одного запроса), чтобы после обхода
+            # не оставалось фоновых обращений к сайту; по лимиту времени - не ждем
+            executor.shutdown(wait=self.stats.stop_reason != TIME, cancel_futures=True)
+            self.stats.elapsed = time.perf_counter() - started
+            logger.info(f"Crawled '{self.query}': {self.stats.summary()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Обход результатов поиска labirint.ru по HTTP")
+    parser.add_argument("query", help="Поисковый запрос")
+    parser.add_argument("--prefetch", type=int, default=settings.CRAWL_PREFETCH, help="Страниц в обработке одновременно")
+    parser.add_argument("--max-pages", type=int, default=None, help="Максимальное количество страниц")
+    parser.add_argument("--max-items", type=int, default=None, help="Максимальное количество товаров")
+    parser.add_argument("--max-seconds", type=float, default=None, help="Максимальная длительность, сек")
+    parser.add_argument("--print", action="store_true", dest="print_items", help="Печатать товары")
+    args = parser.parse_args()
+
+    crawler = SearchCrawler(
+        APIClient(), args.query, prefetch=args.prefetch,
+        max_pages=args.max_pages, max_items=args.max_items, max_seconds=args.max_seconds
+    )
+    for record in crawler:
+        if args.print_items:
+            print(f"{record.id}\t{record.price}\t{record.title}\t{record.author or ''}")
+
+    print(crawler.stats.summary())
+    sys.exit(1 if crawler.stats.stop_reason == ERROR else 0)
+
+
+if __name__ == "__main__":
+    main()
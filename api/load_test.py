@@ -0,0 +1,363 @@
+"""
+Нагрузочный режим для поисковых эндпоинтов.
+
+Запуск:
+    python -m api.load_test --rate 10 --duration 30 --slo-p95 2 --max-error-rate 0.01
+    python -m api.load_test --users 5 --duration 60 --queries-file queries.txt
+"""
+import argparse
+import logging
+import math
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from api.api_client import APIClient
+from api.resilience import AIMDController
+from config.settings import settings
+from config.test_data import test_data
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyHistogram:
+    """
+    Гистограмма задержек с логарифмическими корзинами.
+
+    Значения не хранятся: каждая корзина шире предыдущей в (1 + precision) раз,
+    поэтому перцентиль вычисляется с относительной погрешностью не больше
+    precision при фиксированном объеме памяти (около 1500 корзин на диапазон
+    от 0.1 мс до 10 минут при точности 1%).
+    """
+
+    def __init__(self, min_value: float = 1e-4, max_value: float = 600.0, precision: float = 0.01) -> None:
+        """
+        Args:
+            min_value: Нижняя граница точного измерения, сек
+            max_value: Верхняя граница, большие значения попадают в последнюю корзину
+            precision: Относительная погрешность перцентилей
+        """
+        self.min_value = min_value
+        self.precision = precision
+        self._log_base = math.log1p(precision)
+        self._last_bucket = self._bucket(max_value)
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def _bucket(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        return int(math.log(value / self.min_value) / self._log_base) + 1
+
+    def _upper_bound(self, bucket: int) -> float:
+        return self.min_value * (1 + self.precision) ** bucket
+
+    def record(self, value: float) -> None:
+        bucket = min(self._bucket(value), self._last_bucket)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """
+        Значение, не больше которого percent процентов измерений.
+
+        Args:
+            percent: Перцентиль от 0 до 100
+        """
+        if not self.count:
+            return 0.0
+
+        rank = max(1, math.ceil(percent / 100 * self.count))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(max(self._upper_bound(bucket), self.min), self.max)
+        return self.max
+
+
+@dataclass
+class LoadTestResult:
+    """Итоги нагрузочного прогона."""
+
+    mode: str
+    duration: float
+    histogram: LatencyHistogram
+    requests: int = 0
+    errors: int = 0
+    statuses: Counter = field(default_factory=Counter)
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.duration if self.duration else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+    @property
+    def p50(self) -> float:
+        return self.histogram.percentile(50)
+
+    @property
+    def p95(self) -> float:
+        return self.histogram.percentile(95)
+
+    @property
+    def p99(self) -> float:
+        return self.histogram.percentile(99)
+
+    @property
+    def max(self) -> float:
+        return self.histogram.max
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "mode": self.mode,
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate, 4),
+            "throughput_rps": round(self.throughput, 2),
+            "p50": round(self.p50, 4),
+            "p95": round(self.p95, 4),
+            "p99": round(self.p99, 4),
+            "max": round(self.max, 4),
+            "statuses": dict(self.statuses),
+        }
+
+    def report(self) -> str:
+        statuses = ", ".join(f"{status}: {count}" for status, count in sorted(self.statuses.items(), key=str))
+        return (
+            f"mode:        {self.mode}\n"
+            f"duration:    {self.duration:.2f}s\n"
+            f"requests:    {self.requests} ({self.throughput:.2f} req/s)\n"
+            f"errors:      {self.errors} ({self.error_rate:.2%})\n"
+            f"latency:     p50={self.p50 * 1000:.1f}ms p95={self.p95 * 1000:.1f}ms "
+            f"p99={self.p99 * 1000:.1f}ms max={self.max * 1000:.1f}ms\n"
+            f"statuses:    {statuses}"
+        )
+
+    def slo_breaches(
+        self,
+        p50: Optional[float] = None,
+        p95: Optional[float] = None,
+        p99: Optional[float] = None,
+        max_latency: Optional[float] = None,
+        max_error_rate: Optional[float] = None,
+        min_throughput: Optional[float] = None
+    ) -> List[str]:
+        """
+        Список нарушенных SLO (пустой, если все выполнены). Порог None не проверяется.
+        """
+        breaches = []
+        for name, limit, actual in (("p50", p50, self.p50), ("p95", p95, self.p95),
+                                    ("p99", p99, self.p99), ("max", max_latency, self.max)):
+            if limit is not None and actual > limit:
+                breaches.append(f"{name} {actual:.3f}s > {limit:.3f}s")
+        if max_error_rate is not None and self.error_rate > max_error_rate:
+            breaches.append(f"error rate {self.error_rate:.2%} > {max_error_rate:.2%}")
+        if min_throughput is not None and self.throughput < min_throughput:
+            breaches.append(f"throughput {self.throughput:.2f} req/s < {min_throughput:.2f} req/s")
+        return breaches
+
+    def assert_slo(self, **limits: Optional[float]) -> None:
+        """
+        Проверяет SLO (аргументы как у slo_breaches).
+
+        Raises:
+            AssertionError: Если хотя бы одно SLO нарушено
+        """
+        breaches = self.slo_breaches(**limits)
+        assert not breaches, "Нарушены SLO: " + "; ".join(breaches) + "\n" + self.report()
+
+
+def default_queries() -> List[str]:
+    """Запросы из API_TEST_DATA["search_test_cases"] и файла LOAD_TEST_QUERIES_FILE."""
+    queries = [case["query"] for case in test_data.API_TEST_DATA["search_test_cases"]]
+    if settings.LOAD_TEST_QUERIES_FILE:
+        queries.extend(load_queries(settings.LOAD_TEST_QUERIES_FILE))
+    return queries
+
+
+def load_queries(path: str) -> List[str]:
+    """Читает запросы из файла, по одному в строке."""
+    with open(path, encoding="utf-8") as f:
+        return [line.rstrip("\r\n") for line in f if line.strip()]
+
+
+class LoadGenerator:
+    """
+    Генератор нагрузки на поиск через APIClient.
+
+    Два режима:
+    - run_rate: открытая модель, запросы отправляются с заданной частотой
+      независимо от ответов; задержка считается от запланированного момента
+      отправки, поэтому очередь перед сервером тоже попадает в перцентили;
+    - run_users: закрытая модель, фиксированное число виртуальных пользователей
+      отправляют запросы друг за другом.
+
+    Ответ с кодом 4xx/5xx или исключение считаются ошибкой.
+    """
+
+    def __init__(self, queries: Optional[Iterable[str]] = None, client: Optional[APIClient] = None) -> None:
+        """
+        Args:
+            queries: Запросы, перебираются по кругу (по умолчанию default_queries())
+            client: API клиент (по умолчанию создается без повторов запросов)
+        """
+        self.queries = list(queries) if queries is not None else default_queries()
+        if not self.queries:
+            raise ValueError("Load test needs at least one query")
+        if client is None:
+            client = APIClient()
+            client.max_retries = 0
+        self.client = client
+        self._lock = threading.Lock()
+        self._next = 0
+
+    def run_rate(self, rate: float, duration: float, max_workers: int = 50) -> LoadTestResult:
+        """
+        Отправляет запросы с частотой rate в течение duration секунд.
+
+        Args:
+            rate: Запросов в секунду
+            duration: Длительность, сек
+            max_workers: Максимум одновременных запросов
+        """
+        result = LoadTestResult(mode=f"rate {rate:g} req/s", duration=0.0, histogram=LatencyHistogram())
+        self._fix_concurrency(max_workers)
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="load") as executor:
+            sent = 0
+            while True:
+                scheduled = started + sent / rate
+                if scheduled - started >= duration:
+                    break
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(self._request, result, scheduled)
+                sent += 1
+
+        result.duration = time.perf_counter() - started
+        return result
+
+    def run_users(self, users: int, duration: float, think_time: float = 0.0) -> LoadTestResult:
+        """
+        Запускает users виртуальных пользователей на duration секунд.
+
+        Args:
+            users: Количество виртуальных пользователей
+            duration: Длительность, сек
+            think_time: Пауза пользователя между запросами, сек
+        """
+        result = LoadTestResult(mode=f"{users} users", duration=0.0, histogram=LatencyHistogram())
+        self._fix_concurrency(users)
+        started = time.perf_counter()
+        deadline = started + duration
+
+        def user() -> None:
+            while time.perf_counter() < deadline:
+                self._request(result, time.perf_counter())
+                if think_time:
+                    time.sleep(think_time)
+
+        threads = [threading.Thread(target=user, name=f"load-user-{i}", daemon=True) for i in range(users)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        result.duration = time.perf_counter() - started
+        return result
+
+    def _fix_concurrency(self, limit: int) -> None:
+        # Адаптивный лимит клиента исказил бы заданную нагрузку
+        self.client.concurrency = AIMDController(limit, limit, limit, latency_target=math.inf)
+
+    def _next_query(self) -> str:
+        with self._lock:
+            query = self.queries[self._next % len(self.queries)]
+            self._next += 1
+        return query
+
+    def _request(self, result: LoadTestResult, scheduled: float) -> None:
+        query = self._next_query()
+        status: object
+        try:
+            response = self.client.search_books(query)
+            status = response.status_code
+            failed = status >= 400
+        except Exception as e:
+            status = type(e).__name__
+            failed = True
+            logger.debug(f"Load request '{query}' failed: {e}")
+
+        latency = time.perf_counter() - scheduled
+        with self._lock:
+            result.histogram.record(latency)
+            result.requests += 1
+            result.errors += int(failed)
+            result.statuses[status] += 1
+
+
+def run_from_settings(generator: Optional[LoadGenerator] = None) -> LoadTestResult:
+    """Прогон с параметрами LOAD_TEST_RATE/LOAD_TEST_USERS/LOAD_TEST_DURATION."""
+    generator = generator or LoadGenerator()
+    if settings.LOAD_TEST_RATE > 0:
+        return generator.run_rate(settings.LOAD_TEST_RATE, settings.LOAD_TEST_DURATION)
+    return generator.run_users(settings.LOAD_TEST_USERS, settings.LOAD_TEST_DURATION)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Нагрузочный прогон поиска labirint.ru")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--rate", type=float, help="Частота запросов в секунду")
+    mode.add_argument("--users", type=int, help="Количество виртуальных пользователей")
+    parser.add_argument("--duration", type=float, default=settings.LOAD_TEST_DURATION or 30, help="Длительность, сек")
+    parser.add_argument("--queries-file", help="Файл с запросами, по одному в строке")
+    parser.add_argument("--slo-p95", type=float, default=settings.LOAD_TEST_SLO_P95, help="Порог p95, сек")
+    parser.add_argument("--slo-p99", type=float, default=settings.LOAD_TEST_SLO_P99, help="Порог p99, сек")
+    parser.add_argument("--max-error-rate", type=float, default=settings.LOAD_TEST_MAX_ERROR_RATE, help="Доля ошибок")
+    args = parser.parse_args()
+
+    queries = load_queries(args.queries_file) if args.queries_file else None
+    generator = LoadGenerator(queries)
+
+    if args.rate:
+        result = generator.run_rate(args.rate, args.duration)
+    else:
+        result = generator.run_users(args.users or settings.LOAD_TEST_USERS, args.duration)
+
+    print(result.report())
+    breaches = result.slo_breaches(p95=args.slo_p95, p99=args.slo_p99, max_error_rate=args.max_error_rate)
+    for breach in breaches:
+        print(f"SLO breach: {breach}")
+    sys.exit(1 if breaches else 0)
+
+
+if __name__ == "__main__":
+    main()
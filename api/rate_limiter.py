@@ -0,0 +1,153 @@
+import logging
+import os
+import struct
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from config.settings import settings
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+_STATE = struct.Struct("<dd")
+
+
+@dataclass
+class RateLimiterStats:
+    """Статистика ограничителя в текущем процессе."""
+
+    acquired: int = 0
+    delayed: int = 0
+    wait_time: float = 0.0
+
+    def summary(self) -> str:
+        return f"requests={self.acquired} delayed={self.delayed} wait={self.wait_time:.2f}s"
+
+
+class FileTokenBucket:
+    """
+    Token bucket, общий для всех процессов через файл состояния.
+
+    Состояние (количество токенов и время последнего пополнения) хранится в файле
+    и меняется под эксклюзивной блокировкой файла, поэтому воркеры pytest-xdist
+    делят один лимит. Запрос сразу резервирует токен (баланс может уйти в минус)
+    и спит вне блокировки ровно столько, сколько нужно до его очереди.
+    """
+
+    def __init__(self, path: str, rate: float, burst: int) -> None:
+        """
+        Args:
+            path: Путь к файлу состояния
+            rate: Количество запросов в секунду
+            burst: Максимальное количество запросов подряд без ожидания
+        """
+        self.path = path
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.stats = RateLimiterStats()
+        self._lock = threading.Lock()
+        self._fd: Optional[int] = None
+
+    def acquire(self) -> float:
+        """
+        Ожидает разрешения на один запрос.
+
+        Returns:
+            float: Время ожидания, сек
+        """
+        with self._lock:
+            fd = self._open()
+            self._lock_file(fd)
+            try:
+                now = time.time()
+                os.lseek(fd, 0, os.SEEK_SET)
+                data = os.read(fd, _STATE.size)
+                if len(data) == _STATE.size:
+                    tokens, updated = _STATE.unpack(data)
+                else:
+                    tokens, updated = float(self.burst), now
+
+                tokens = min(float(self.burst), tokens + max(0.0, now - updated) * self.rate)
+                tokens -= 1.0
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.write(fd, _STATE.pack(tokens, now))
+            finally:
+                self._unlock_file(fd)
+
+        delay = -tokens / self.rate if tokens < 0 else 0.0
+
+        with self._lock:
+            self.stats.acquired += 1
+            if delay > 0:
+                self.stats.delayed += 1
+                self.stats.wait_time += delay
+
+        if delay > 0:
+            logger.debug(f"Rate limiter delays request by {delay:.3f}s")
+            time.sleep(delay)
+        return delay
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def _open(self) -> int:
+        if self._fd is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o666)
+        return self._fd
+
+    @staticmethod
+    def _lock_file(fd: int) -> None:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_LOCK, _STATE.size)
+
+    @staticmethod
+    def _unlock_file(fd: int) -> None:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, _STATE.size)
+
+
+def default_state_path() -> str:
+    """Файл состояния, общий для воркеров одного запуска pytest-xdist."""
+    if settings.API_RATE_LIMIT_FILE:
+        return settings.API_RATE_LIMIT_FILE
+    run_id = os.getenv("PYTEST_XDIST_TESTRUNUID", "default")
+    return os.path.join(tempfile.gettempdir(), f"labirint-rate-limit-{run_id}.bin")
+
+
+_default_limiter: Optional[FileTokenBucket] = None
+
+
+def default_rate_limiter() -> Optional[FileTokenBucket]:
+    """Ограничитель из настроек API_RATE_LIMIT/API_RATE_BURST или None, если он выключен."""
+    global _default_limiter
+
+    if settings.API_RATE_LIMIT <= 0:
+        return None
+
+    path = default_state_path()
+    if (
+        _default_limiter is None
+        or _default_limiter.path != path
+        or _default_limiter.rate != settings.API_RATE_LIMIT
+        or _default_limiter.burst != max(1, settings.API_RATE_BURST)
+    ):
+        _default_limiter = FileTokenBucket(path, settings.API_RATE_LIMIT, settings.API_RATE_BURST)
+    return _default_limiter
@@ -0,0 +1,255 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Экспоненциальная задержка с полным джиттером: случайное значение в [0, base * 2^attempt]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class RetryBudget:
+    """
+    Общий бюджет повторных запросов.
+
+    Каждый первичный запрос пополняет бюджет на ratio токенов, каждый повтор
+    тратит один токен. Во время отказа сервиса повторов не больше ratio
+    от числа запросов, поэтому они не умножают нагрузку.
+    """
+
+    def __init__(self, ratio: float, reserve: float) -> None:
+        """
+        Args:
+            ratio: Доля повторов относительно первичных запросов
+            reserve: Начальный и максимальный запас токенов сверх накопленных
+        """
+        self.ratio = ratio
+        self.reserve = reserve
+        self.max_tokens = reserve
+        self.tokens = reserve
+        self.requests = 0
+        self.retries = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Списывает токен на повтор. Возвращает False, если бюджет исчерпан."""
+        with self._lock:
+            if self.tokens < 1:
+                self.rejected += 1
+                return False
+            self.tokens -= 1
+            self.retries += 1
+            return True
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "tokens": round(self.tokens, 2),
+                "requests": self.requests,
+                "retries": self.retries,
+                "rejected": self.rejected,
+            }
+
+
+@dataclass
+class LimitChange:
+    """Изменение лимита параллельности и его причина."""
+
+    timestamp: float
+    limit: float
+    reason: str
+
+
+@dataclass
+class ConcurrencyStats:
+    """Изменения лимитов параллельности всех клиентов процесса."""
+
+    controllers: int = 0
+    increases: int = 0
+    decreases: int = 0
+    lowest: Optional[float] = None
+
+    def summary(self) -> str:
+        lowest = "-" if self.lowest is None else f"{self.lowest:.2f}"
+        return (
+            f"clients={self.controllers} increases={self.increases} "
+            f"decreases={self.decreases} lowest_limit={lowest}"
+        )
+
+
+_stats = ConcurrencyStats()
+_stats_lock = threading.Lock()
+
+
+def concurrency_stats() -> ConcurrencyStats:
+    """Статистика AIMD контроллеров текущего процесса."""
+    return _stats
+
+
+class AIMDController:
+    """
+    Адаптивный лимит одновременных запросов (additive increase, multiplicative decrease).
+
+    Здоровый ответ увеличивает лимит на increase / limit (примерно +increase за
+    «окно» из limit ответов), ответ 429/5xx, ошибка или задержка выше
+    latency_target уменьшают лимит в decrease_factor раз, но не чаще раза за cooldown.
+    """
+
+    def __init__(
+        self,
+        initial: float,
+        minimum: float,
+        maximum: float,
+        latency_target: float,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        cooldown: float = 1.0,
+        history_size: int = 50
+    ) -> None:
+        self.limit = float(initial)
+        self.minimum = float(minimum)
+        self.maximum = float(maximum)
+        self.latency_target = latency_target
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.inflight = 0
+        self.history: Deque[LimitChange] = deque(maxlen=history_size)
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+        with _stats_lock:
+            _stats.controllers += 1
+
+    def acquire(self) -> float:
+        """
+        Ожидает свободного места под лимитом.
+
+        Returns:
+            float: Время ожидания, сек
+        """
+        started = time.perf_counter()
+        with self._condition:
+            while self.inflight >= max(1, int(self.limit)):
+                self._condition.wait()
+            self.inflight += 1
+        return time.perf_counter() - started
+
+    def release(self, latency: float, status: Optional[int] = None, error: Optional[Exception] = None) -> None:
+        """
+        Освобождает место и корректирует лимит по результату запроса.
+
+        Args:
+            latency: Время запроса, сек
+            status: Код ответа (None при ошибке)
+            error: Исключение запроса
+        """
+        with self._condition:
+            self.inflight -= 1
+
+            if error is not None:
+                self._decrease(f"error: {type(error).__name__}")
+            elif status == 429 or (status is not None and status >= 500):
+                self._decrease(f"status {status}")
+            elif latency > self.latency_target:
+                self._decrease(f"latency {latency:.2f}s > {self.latency_target:.2f}s")
+            else:
+                self._increase()
+
+            self._condition.notify_all()
+
+    def discard(self) -> None:
+        """Освобождает место без корректировки лимита (запрос прерван не сетевой ошибкой)."""
+        with self._condition:
+            self.inflight -= 1
+            self._condition.notify_all()
+
+    def ensure_limit(self, limit: int, reason: str) -> None:
+        """
+        Поднимает лимит до limit (но не выше maximum), если он ниже.
+
+        Args:
+            limit: Требуемое количество одновременных запросов
+            reason: Причина изменения для истории
+        """
+        with self._condition:
+            target = min(float(limit), self.maximum)
+            if target <= self.limit:
+                return
+            self.limit = target
+            self.history.append(LimitChange(time.time(), self.limit, reason))
+            self._condition.notify_all()
+
+    def snapshot(self) -> Dict[str, object]:
+        """Текущее состояние контроллера и последние изменения лимита."""
+        with self._condition:
+            return {
+                "limit": round(self.limit, 2),
+                "inflight": self.inflight,
+                "minimum": self.minimum,
+                "maximum": self.maximum,
+                "last_change": self.history[-1].reason if self.history else None,
+                "history": [
+                    {"limit": round(c.limit, 2), "reason": c.reason} for c in self.history
+                ],
+            }
+
+    def _increase(self) -> None:
+        if self.limit >= self.maximum:
+            return
+        previous = int(self.limit)
+        self.limit = min(self.maximum, self.limit + self.increase / max(self.limit, 1.0))
+        if int(self.limit) != previous:
+            self.history.append(LimitChange(time.time(), self.limit, "healthy responses"))
+            with _stats_lock:
+                _stats.increases += 1
+
+    def _decrease(self, reason: str) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit * self.decrease_factor)
+        self.history.append(LimitChange(time.time(), self.limit, reason))
+        with _stats_lock:
+            _stats.decreases += 1
+            _stats.lowest = self.limit if _stats.lowest is None else min(_stats.lowest, self.limit)
+        logger.info(f"Concurrency limit decreased to {self.limit:.2f}: {reason}")
+
+
+_default_budget: Optional[RetryBudget] = None
+_budget_lock = threading.Lock()
+
+
+def default_retry_budget() -> RetryBudget:
+    """Бюджет повторов, общий для всех клиентов процесса."""
+    global _default_budget
+    with _budget_lock:
+        if _default_budget is None:
+            _default_budget = RetryBudget(settings.API_RETRY_BUDGET_RATIO, settings.API_RETRY_BUDGET_RESERVE)
+        return _default_budget
+
+
+def controller_from_settings() -> AIMDController:
+    return AIMDController(
+        initial=settings.API_CONCURRENCY,
+        minimum=settings.API_AIMD_MIN,
+        maximum=settings.API_AIMD_MAX,
+        latency_target=settings.API_AIMD_LATENCY_TARGET
+    )
@@ -0,0 +1,162 @@
+import codecs
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import requests
+
+HTML_MARKERS = ("<!doctype html", "<html")
+
+
+@dataclass
+class ResponseAnalysis:
+    """Результат однопроходного анализа тела ответа."""
+
+    found: Dict[str, bool]
+    bytes_read: int
+    preview: str
+    truncated: bool
+    complete: bool
+
+    def __getitem__(self, pattern: str) -> bool:
+        if not pattern:
+            return True
+        return self.found[pattern.lower()]
+
+    def any(self, patterns: Iterable[str]) -> bool:
+        return any(self[pattern] for pattern in patterns)
+
+    @property
+    def is_html(self) -> bool:
+        return self.any(HTML_MARKERS)
+
+
+class MultiPatternMatcher:
+    """
+    Поиск нескольких подстрок за один проход по потоку текста без учета регистра.
+
+    Все еще не найденные подстроки объединены в одно регулярное выражение,
+    поэтому каждый фрагмент текста просматривается движком re один раз.
+    Найденные подстроки исключаются из выражения; хвост предыдущего фрагмента
+    сохраняется, чтобы находить совпадения на границе фрагментов.
+    Найденная подстрока определяется по именованной группе, а не по тексту
+    совпадения.
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns: List[str] = list(dict.fromkeys(p.lower() for p in patterns if p))
+        self.found: Dict[str, bool] = {p: False for p in self.patterns}
+        self._overlap = max((len(p) for p in self.patterns), default=1) - 1
+        self._tail = ""
+        self._regex: Optional["re.Pattern[str]"] = None
+        self._compile()
+
+    @property
+    def done(self) -> bool:
+        return self._regex is None
+
+    def feed(self, text: str) -> None:
+        if self.done or not text:
+            return
+
+        buffer = self._tail + text
+        position = 0
+
+        while self._regex is not None:
+            match = self._regex.search(buffer, position)
+            if match is None:
+                break
+            start = match.start()
+            # Подстроки с тем же началом (более короткие) ищутся на той же позиции,
+            # затем поиск продолжается со следующего символа.
+            while match is not None:
+                self.found[self.patterns[int(match.lastgroup[1:])]] = True
+                self._compile()
+                match = self._regex.match(buffer, start) if self._regex is not None else None
+            position = start + 1
+
+        self._tail = buffer[-self._overlap:] if self._overlap else ""
+
+    def _compile(self) -> None:
+        remaining = [i for i, p in enumerate(self.patterns) if not self.found[p]]
+        if not remaining:
+            self._regex = None
+            return
+        remaining.sort(key=lambda i: len(self.patterns[i]), reverse=True)
+        # Группа на каждую подстроку: текст совпадения в нижнем регистре может
+        # отличаться от подстроки ('İ'.lower() == 'i̇', 'ſ' совпадает с 's').
+        self._regex = re.compile(
+            "|".join(f"(?P<p{i}>{re.escape(self.patterns[i])})" for i in remaining), re.IGNORECASE
+        )
+
+
+def analyze_response(
+    response: requests.Response,
+    patterns: Iterable[str],
+    preview_size: int = 1000,
+    chunk_size: int = 16384,
+    drain: bool = True
+) -> ResponseAnalysis:
+    """
+    Анализирует тело ответа за один проход по response.iter_content.
+
+    Чтение останавливается, как только найдены все подстроки и заполнено превью.
+    Остаток тела при drain=True дочитывается без декодирования, чтобы соединение
+    вернулось в пул, иначе соединение закрывается.
+
+    Args:
+        response: Ответ (лучше полученный с stream=True)
+        patterns: Искомые подстроки (регистр не учитывается)
+        preview_size: Количество символов начала ответа для отчета
+        chunk_size: Размер читаемого фрагмента, байт
+        drain: Дочитать остаток тела после получения всех результатов
+
+    Returns:
+        ResponseAnalysis: Найденные подстроки, количество прочитанных байт и превью
+    """
+    matcher = MultiPatternMatcher(list(patterns) + list(HTML_MARKERS))
+    decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+    preview: List[str] = []
+    preview_length = 0
+    bytes_read = 0
+    truncated = False
+    complete = True
+
+    chunks = response.iter_content(chunk_size=chunk_size)
+    for chunk in chunks:
+        bytes_read += len(chunk)
+        text = decoder.decode(chunk)
+
+        if preview_length < preview_size:
+            piece = text[:preview_size - preview_length]
+            preview.append(piece)
+            preview_length += len(piece)
+            truncated = truncated or len(piece) < len(text)
+        elif text:
+            truncated = True
+
+        matcher.feed(text)
+
+        if matcher.done and preview_length >= preview_size:
+            complete = False
+            break
+
+    if not complete:
+        if drain:
+            for chunk in chunks:
+                bytes_read += len(chunk)
+                truncated = truncated or bool(chunk)
+            complete = True
+        else:
+            truncated = True
+            response.close()
+    else:
+        matcher.feed(decoder.decode(b"", final=True))
+
+    return ResponseAnalysis(
+        found=dict(matcher.found),
+        bytes_read=bytes_read,
+        preview="".join(preview),
+        truncated=truncated,
+        complete=complete
+    )
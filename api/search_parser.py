@@ -0,0 +1,275 @@
+import codecs
+import re
+from html.parser import HTMLParser
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import requests
+from config.test_data import test_data
+
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+_STEP_RE = re.compile(r"(//|/)([\w*-]+)((?:\[[^\]]+\])*)")
+_PREDICATE_RE = re.compile(
+    r"@([\w-]+)\s*=\s*['\"]([^'\"]*)['\"]"
+    r"|contains\(\s*@([\w-]+)\s*,\s*['\"]([^'\"]*)['\"]\s*\)"
+)
+_BOOK_ID_RE = re.compile(r"/books/(\d+)")
+_DIGITS_RE = re.compile(r"\d+")
+
+
+class ProductRecord(NamedTuple):
+    """Товар из результатов поиска."""
+
+    id: Optional[int]
+    title: Optional[str]
+    author: Optional[str]
+    price: Optional[int]
+    old_price: Optional[int]
+    url: Optional[str]
+
+
+class XPathStep(NamedTuple):
+    descendant: bool
+    tag: str
+    equals: Tuple[Tuple[str, str], ...]
+    contains: Tuple[Tuple[str, str], ...]
+
+    def matches(self, tag: str, attrs: Dict[str, str]) -> bool:
+        if self.tag != "*" and self.tag != tag:
+            return False
+        for name, value in self.equals:
+            if attrs.get(name) != value:
+                return False
+        for name, value in self.contains:
+            if value not in attrs.get(name, ""):
+                return False
+        return True
+
+
+def compile_xpath(xpath: str) -> List[XPathStep]:
+    """
+    Компилирует простой XPath из LOCATORS в последовательность шагов.
+
+    Поддерживаются оси / и //, теги и предикаты [@attr='value'],
+    [contains(@attr, 'value')] и их объединение через and.
+
+    Raises:
+        ValueError: Если выражение не поддерживается
+    """
+    expression = xpath.strip()
+    if expression.startswith("."):
+        expression = expression[1:]
+
+    steps = []
+    position = 0
+    for match in _STEP_RE.finditer(expression):
+        if match.start() != position:
+            break
+        equals, contains = [], []
+        for predicate in re.findall(r"\[([^\]]+)\]", match.group(3)):
+            for clause in re.split(r"\s+and\s+", predicate):
+                parsed = _PREDICATE_RE.fullmatch(clause.strip())
+                if parsed is None:
+                    raise ValueError(f"Unsupported XPath predicate in {xpath!r}: {clause}")
+                if parsed.group(1):
+                    equals.append((parsed.group(1), parsed.group(2)))
+                else:
+                    contains.append((parsed.group(3), parsed.group(4)))
+        steps.append(XPathStep(match.group(1) == "//", match.group(2).lower(), tuple(equals), tuple(contains)))
+        position = match.end()
+
+    if not steps or position != len(expression):
+        raise ValueError(f"Unsupported XPath: {xpath!r}")
+    return steps
+
+
+def _parse_price(text: Optional[str]) -> Optional[int]:
+    if not text:
+        return None
+    digits = "".join(_DIGITS_RE.findall(text))
+    return int(digits) if digits else None
+
+
+class _Frame:
+    __slots__ = ("tag", "exact", "inherited")
+
+    def __init__(self, tag: str, exact: Dict[str, frozenset], inherited: Dict[str, frozenset]) -> None:
+        self.tag = tag
+        self.exact = exact
+        self.inherited = inherited
+
+
+class SearchResultsParser(HTMLParser):
+    """
+    Потоковый разбор страницы результатов поиска в список ProductRecord.
+
+    Страница разбирается по событиям HTMLParser без построения DOM: для каждой
+    карточки товара отслеживается, какие шаги локаторов полей уже совпали.
+    Локаторы берутся из LOCATORS (search_results, search_result_title и т.д.).
+    Текст можно передавать частями через feed(); готовые товары забираются pop_records().
+    """
+
+    FIELDS = {
+        "title": "search_result_title",
+        "author": "search_result_author",
+        "price": "search_result_price",
+        "old_price": "search_result_old_price",
+    }
+
+    def __init__(self, locators: Optional[Dict[str, str]] = None) -> None:
+        super().__init__(convert_charrefs=True)
+        locators = locators or test_data.LOCATORS
+        card_steps = compile_xpath(locators["search_results"])
+        if len(card_steps) != 1:
+            raise ValueError("search_results locator must be a single step")
+        self._card_step = card_steps[0]
+        self._fields = {name: compile_xpath(locators[key]) for name, key in self.FIELDS.items()}
+
+        self._stack: List[_Frame] = []
+        self._card_depth: Optional[int] = None
+        self._card_attrs: Dict[str, str] = {}
+        self._values: Dict[str, List[str]] = {}
+        self._title_href: Optional[str] = None
+        self._capturing: Dict[int, List[Tuple[str, List[str]]]] = {}
+        self._records: List[ProductRecord] = []
+
+    def pop_records(self) -> List[ProductRecord]:
+        """Возвращает товары, разобранные с прошлого вызова."""
+        records, self._records = self._records, []
+        return records
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        attributes = {name: value or "" for name, value in attrs}
+
+        if self._card_depth is None:
+            if self._card_step.matches(tag, attributes):
+                self._open_card(tag, attributes)
+            elif tag not in VOID_ELEMENTS:
+                self._stack.append(_Frame(tag, {}, {}))
+            return
+
+        parent = self._stack[-1]
+        exact: Dict[str, frozenset] = {}
+        inherited: Dict[str, frozenset] = {}
+        targets: List[str] = []
+
+        for name, steps in self._fields.items():
+            parent_exact = parent.exact.get(name, frozenset())
+            parent_any = parent_exact | parent.inherited.get(name, frozenset())
+            matched = set()
+            for k in parent_any:
+                step = steps[k]
+                if (step.descendant or k in parent_exact) and step.matches(tag, attributes):
+                    matched.add(k + 1)
+            if len(steps) in matched:
+                targets.append(name)
+                matched.discard(len(steps))
+            if matched:
+                exact[name] = frozenset(matched)
+            if parent_any:
+                inherited[name] = parent_any
+
+        if "title" in targets and self._title_href is None:
+            self._title_href = attributes.get("href")
+
+        if tag in VOID_ELEMENTS:
+            return
+
+        self._stack.append(_Frame(tag, exact, inherited))
+        for name in targets:
+            self._capturing.setdefault(len(self._stack) - 1, []).append((name, []))
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index].tag == tag:
+                break
+        else:
+            return
+
+        while len(self._stack) > index:
+            depth = len(self._stack) - 1
+            self._stack.pop()
+            for name, parts in self._capturing.pop(depth, []):
+                text = " ".join("".join(parts).split())
+                if text:
+                    self._values.setdefault(name, []).append(text)
+            if self._card_depth is not None and depth == self._card_depth:
+                self._close_card()
+
+    def handle_data(self, data: str) -> None:
+        for captures in self._capturing.values():
+            for _, parts in captures:
+                parts.append(data)
+
+    def _open_card(self, tag: str, attributes: Dict[str, str]) -> None:
+        start = {name: frozenset([0]) for name in self._fields}
+        self._stack.append(_Frame(tag, start, {}))
+        self._card_depth = len(self._stack) - 1
+        self._card_attrs = attributes
+        self._values = {}
+        self._title_href = None
+
+    def _close_card(self) -> None:
+        self._records.append(build_product_record(self._card_attrs.get("data-product-id"), self._values, self._title_href))
+        self._card_depth = None
+        self._capturing.clear()
+
+
+def build_product_record(product_id: Optional[str], values: Dict[str, List[str]], url: Optional[str]) -> ProductRecord:
+    """
+    Собирает ProductRecord из текстов полей карточки.
+
+    Args:
+        product_id: Атрибут data-product-id карточки (если нет - берется из URL)
+        values: Тексты полей SearchResultsParser.FIELDS в порядке документа
+        url: href ссылки на название
+    """
+    if not product_id and url:
+        match = _BOOK_ID_RE.search(url)
+        product_id = match.group(1) if match else None
+
+    authors = values.get("author")
+    return ProductRecord(
+        id=int(product_id) if product_id and product_id.isdigit() else None,
+        title=values.get("title", [None])[0],
+        author=", ".join(authors) if authors else None,
+        price=_parse_price(values.get("price", [None])[0]),
+        old_price=_parse_price(values.get("old_price", [None])[0]),
+        url=url,
+    )
+
+
+def parse_search_results(html: str) -> List[ProductRecord]:
+    """Разбирает HTML страницы результатов поиска."""
+    parser = SearchResultsParser()
+    parser.feed(html)
+    parser.close()
+    return parser.pop_records()
+
+
+def iter_search_results(response: requests.Response, chunk_size: int = 16384) -> Iterator[ProductRecord]:
+    """
+    Разбирает ответ /search/ по мере чтения тела и возвращает товары по одному.
+
+    Args:
+        response: Ответ (лучше полученный с stream=True)
+        chunk_size: Размер читаемого фрагмента, байт
+    """
+    parser = SearchResultsParser()
+    decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        parser.feed(decoder.decode(chunk))
+        yield from parser.pop_records()
+
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    yield from parser.pop_records()
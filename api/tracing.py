@@ -0,0 +1,419 @@
+import logging
+import socket
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+from urllib3.util.connection import _set_socket_options, allowed_gai_family
+from urllib3.util.timeout import _DEFAULT_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+TraceListener = Callable[["RequestTrace"], None]
+
+_local = threading.local()
+_listeners: List[TraceListener] = []
+_listeners_lock = threading.Lock()
+
+
+@dataclass
+class RequestTrace:
+    """
+    Разбивка времени одного HTTP запроса.
+
+    Времена в секундах; dns, connect и tls равны None, если использовано
+    соединение из пула. wire_bytes - байты тела ответа, прочитанные из сокета
+    (до распаковки gzip), decoded_bytes - байты после распаковки.
+    """
+
+    method: str
+    url: str
+    attempt: int = 0
+    status: Optional[int] = None
+    reused: bool = True
+    dns: Optional[float] = None
+    connect: Optional[float] = None
+    tls: Optional[float] = None
+    ttfb: Optional[float] = None
+    download: Optional[float] = None
+    total: Optional[float] = None
+    wire_bytes: int = 0
+    decoded_bytes: int = 0
+    redirects: int = 0
+    error: Optional[str] = None
+
+    started: float = field(default_factory=time.perf_counter, repr=False)
+    _sent_at: Optional[float] = field(default=None, repr=False)
+    _headers_at: Optional[float] = field(default=None, repr=False)
+    _raw: object = field(default=None, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.total is not None
+
+    @property
+    def path(self) -> str:
+        parts = urlsplit(self.url)
+        return parts.path + (f"?{parts.query}" if parts.query else "")
+
+    def connection_opened(self, dns: Optional[float], connect: float, tls: Optional[float], opened_at: float) -> None:
+        self.reused = False
+        self.dns = dns
+        self.connect = connect
+        self.tls = tls
+        self._sent_at = opened_at
+
+    def request_sent(self, url: str) -> None:
+        if self._headers_at is not None:
+            self.redirects += 1
+        self.url = url
+        self._sent_at = time.perf_counter()
+
+    def headers_received(self, status: int, raw: object) -> None:
+        self._headers_at = time.perf_counter()
+        self.status = status
+        self.ttfb = self._headers_at - (self._sent_at or self.started)
+        self._raw = raw
+
+    def body_consumed(self, raw: object, wire_bytes: int) -> None:
+        """Завершает трассировку, когда тело последнего ответа (не редиректа) прочитано или закрыто."""
+        if self.finished or raw is not self._raw:
+            return
+        now = time.perf_counter()
+        self.wire_bytes = wire_bytes
+        self.download = now - (self._headers_at or now)
+        self.total = now - self.started
+        self._raw = None
+        _publish(self)
+
+    def fail(self, error: Exception) -> None:
+        if self.finished:
+            return
+        self.error = f"{type(error).__name__}: {error}"
+        self.total = time.perf_counter() - self.started
+        self._raw = None
+        _publish(self)
+
+    def as_dict(self) -> dict:
+        return {
+            "method": self.method,
+            "url": self.url,
+            "attempt": self.attempt,
+            "status": self.status,
+            "reused": self.reused,
+            "dns": self.dns,
+            "connect": self.connect,
+            "tls": self.tls,
+            "ttfb": self.ttfb,
+            "download": self.download,
+            "total": self.total,
+            "wire_bytes": self.wire_bytes,
+            "decoded_bytes": self.decoded_bytes,
+            "redirects": self.redirects,
+            "error": self.error,
+        }
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return getattr(_local, "trace", None)
+
+
+def start_trace(method: str, url: str, attempt: int = 0) -> RequestTrace:
+    """Начинает трассировку запроса в текущем потоке."""
+    trace = RequestTrace(method=method, url=url, attempt=attempt)
+    _local.trace = trace
+    return trace
+
+
+def end_trace() -> None:
+    """Отвязывает трассировку от потока (тело ответа может дочитываться позже)."""
+    _local.trace = None
+
+
+def add_listener(listener: TraceListener) -> None:
+    """Подписывает функцию на завершенные трассировки запросов."""
+    with _listeners_lock:
+        _listeners.append(listener)
+
+
+def remove_listener(listener: TraceListener) -> None:
+    with _listeners_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def _publish(trace: RequestTrace) -> None:
+    with _listeners_lock:
+        listeners = list(_listeners)
+    for listener in listeners:
+        try:
+            listener(trace)
+        except Exception as e:
+            logger.warning(f"Trace listener failed: {e}")
+
+
+@dataclass
+class TraceAggregate:
+    """Сводка трассировок одного эндпоинта (метод и путь без query)."""
+
+    count: int = 0
+    errors: int = 0
+    new_connections: int = 0
+    total: float = 0.0
+    max_total: float = 0.0
+    wire_bytes: int = 0
+
+    def add(self, trace: RequestTrace) -> None:
+        self.count += 1
+        self.errors += trace.error is not None
+        self.new_connections += not trace.reused
+        self.total += trace.total or 0.0
+        self.max_total = max(self.max_total, trace.total or 0.0)
+        self.wire_bytes += trace.wire_bytes
+
+
+class TraceRecorder:
+    """
+    Слушатель, собирающий трассировки в список (например, на время одного теста).
+
+    При заданном limit в traces остаются только первые limit трассировок,
+    остальные учитываются лишь в сводке по эндпоинтам (aggregates), поэтому
+    нагрузочный тест не держит в памяти тысячи трассировок.
+    """
+
+    def __init__(self, limit: Optional[int] = None) -> None:
+        """
+        Args:
+            limit: Максимальное количество сохраняемых трассировок (None - без ограничения)
+        """
+        self.limit = limit
+        self.traces: List[RequestTrace] = []
+        self.aggregates: Dict[str, TraceAggregate] = {}
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        return len(self.traces) + self.dropped
+
+    def __call__(self, trace: RequestTrace) -> None:
+        key = f"{trace.method} {urlsplit(trace.url).path}"
+        with self._lock:
+            self.aggregates.setdefault(key, TraceAggregate()).add(trace)
+            if self.limit is None or len(self.traces) < self.limit:
+                self.traces.append(trace)
+            else:
+                self.dropped += 1
+
+    def __enter__(self) -> "TraceRecorder":
+        add_listener(self)
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        remove_listener(self)
+
+
+def _ms(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value * 1000:.1f}"
+
+
+def format_trace_table(traces: Iterable[RequestTrace]) -> str:
+    """Компактная текстовая таблица трассировок для отчета (времена в мс)."""
+    header = ("#", "method", "path", "status", "conn", "dns", "connect", "tls", "ttfb", "download", "total", "wire", "decoded")
+    rows = [header]
+    for index, trace in enumerate(traces, 1):
+        rows.append((
+            str(index),
+            trace.method,
+            trace.path if len(trace.path) <= 60 else trace.path[:57] + "...",
+            str(trace.status) if trace.status is not None else (trace.error or "-").split(":")[0],
+            "reused" if trace.reused else "new",
+            _ms(trace.dns),
+            _ms(trace.connect),
+            _ms(trace.tls),
+            _ms(trace.ttfb),
+            _ms(trace.download),
+            _ms(trace.total),
+            str(trace.wire_bytes),
+            str(trace.decoded_bytes),
+        ))
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in rows)
+
+
+def format_trace_aggregates(aggregates: Dict[str, TraceAggregate]) -> str:
+    """Текстовая таблица сводки по эндпоинтам (времена в мс)."""
+    rows = [("endpoint", "requests", "errors", "new conn", "avg", "max", "wire")]
+    for key, aggregate in sorted(aggregates.items(), key=lambda item: -item[1].total):
+        rows.append((
+            key if len(key) <= 60 else key[:57] + "...",
+            str(aggregate.count),
+            str(aggregate.errors),
+            str(aggregate.new_connections),
+            _ms(aggregate.total / aggregate.count),
+            _ms(aggregate.max_total),
+            str(aggregate.wire_bytes),
+        ))
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in rows)
+
+
+class _TracingConnectionMixin:
+    """
+    Замеряет DNS, TCP connect и TLS handshake при открытии нового соединения.
+
+    Сокет открывается так же, как в urllib3.util.connection.create_connection:
+    перебираются все адреса getaddrinfo (IPv6 и IPv4, несколько A записей),
+    отдельно замеряется только сам getaddrinfo. Публичных хуков для этих
+    замеров в urllib3 нет, поэтому используются его внутренние функции 2.x
+    (версия закреплена в requirements.txt).
+    """
+
+    _trace_dns: Optional[float] = None
+    _trace_connect: Optional[float] = None
+
+    def _new_conn(self) -> socket.socket:
+        trace = current_trace()
+        if trace is None:
+            return super()._new_conn()
+
+        self._trace_dns = None
+        self._trace_connect = None
+        try:
+            sock = self._create_traced_connection()
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        except socket.timeout as e:
+            raise ConnectTimeoutError(
+                self, f"Connection to {self.host} timed out. (connect timeout={self.timeout})"
+            ) from e
+        except OSError as e:
+            raise NewConnectionError(self, f"Failed to establish a new connection: {e}") from e
+
+        sys.audit("http.client.connect", self, self.host, self.port)
+        return sock
+
+    def _create_traced_connection(self) -> socket.socket:
+        host = self._dns_host.strip("[]")
+        started = time.perf_counter()
+        addresses = socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        connect_started = time.perf_counter()
+        self._trace_dns = connect_started - started
+
+        error: Optional[OSError] = None
+        try:
+            for family, socktype, proto, _, address in addresses:
+                sock = None
+                try:
+                    sock = socket.socket(family, socktype, proto)
+                    _set_socket_options(sock, self.socket_options)
+                    if self.timeout is not _DEFAULT_TIMEOUT:
+                        sock.settimeout(self.timeout)
+                    if self.source_address:
+                        sock.bind(self.source_address)
+                    sock.connect(address)
+                    return sock
+                except OSError as e:
+                    error = e
+                    if sock is not None:
+                        sock.close()
+            raise error or OSError("getaddrinfo returns an empty list")
+        finally:
+            self._trace_connect = time.perf_counter() - connect_started
+
+    def connect(self) -> None:
+        trace = current_trace()
+        started = time.perf_counter()
+        super().connect()
+        if trace is None:
+            return
+
+        opened_at = time.perf_counter()
+        socket_time = (self._trace_dns or 0.0) + (self._trace_connect or 0.0)
+        tls = opened_at - started - socket_time if isinstance(self, HTTPSConnection) else None
+        trace.connection_opened(self._trace_dns, self._trace_connect or 0.0, tls, opened_at)
+
+
+class TracingHTTPConnection(_TracingConnectionMixin, HTTPConnection):
+    pass
+
+
+class TracingHTTPSConnection(_TracingConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TracingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TracingHTTPConnection
+
+
+class TracingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TracingHTTPSConnection
+
+
+def _instrument_body(raw, trace: RequestTrace) -> None:
+    """Оборачивает urllib3 ответ, чтобы считать байты тела и момент его дочитывания."""
+    stream = raw.stream
+    release_conn = raw.release_conn
+    streaming = False
+
+    def traced_stream(*args, **kwargs):
+        nonlocal streaming
+        streaming = True
+        try:
+            for chunk in stream(*args, **kwargs):
+                trace.decoded_bytes += len(chunk)
+                yield chunk
+        finally:
+            streaming = False
+            trace.body_consumed(raw, raw.tell())
+
+    def traced_release_conn() -> None:
+        # urllib3 освобождает соединение внутри последнего read(), до учета
+        # прочитанных байт, поэтому во время чтения трассировку завершает traced_stream
+        if not streaming:
+            trace.body_consumed(raw, raw.tell())
+        release_conn()
+
+    raw.stream = traced_stream
+    raw.release_conn = traced_release_conn
+
+
+class TracingHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter, записывающий разбивку времени в текущую трассировку потока.
+
+    Соединения пула создаются классами, которые замеряют DNS, connect и TLS;
+    время до первого байта фиксируется по получению заголовков, а загрузка
+    и объем тела - по дочитыванию ответа. Тело редиректа requests дочитывает
+    перед переходом по Location, поэтому оно не завершает трассировку: ее
+    завершает ответ, на котором переходы закончились. Без активной трассировки
+    адаптер работает как обычный HTTPAdapter.
+    """
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TracingHTTPConnectionPool,
+            "https": TracingHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        trace = current_trace()
+        if trace is None:
+            return super().send(request, **kwargs)
+
+        trace.request_sent(request.url)
+        response = super().send(request, **kwargs)
+        trace.headers_received(response.status_code, response.raw)
+        if not response.is_redirect:
+            _instrument_body(response.raw, trace)
+        return response
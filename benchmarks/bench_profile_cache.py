@@ -0,0 +1,65 @@
+"""
+Бенчмарк загрузки страниц с пустым профилем браузера и с прогретым кэшем.
+
+Запуск:
+    python -m benchmarks.bench_profile_cache --launches 5
+"""
+import argparse
+import statistics
+import time
+
+from conftest import create_driver, launch_driver, quit_driver
+from config.settings import settings
+from utils.profile_cache import COLD, WARM, default_profile_cache, warm_urls
+from utils.web_vitals import capture_page_performance
+
+
+def measure(mode: str, url: str, launches: int) -> dict:
+    settings.BROWSER_CACHE_MODE = mode
+    launch_times, loads, transfers = [], [], []
+    for _ in range(launches):
+        started = time.perf_counter()
+        driver = launch_driver()
+        launch_times.append(time.perf_counter() - started)
+        try:
+            driver.get(url)
+            performance = capture_page_performance(driver, settings.PAGE_PERFORMANCE_SETTLE_MS)
+        finally:
+            quit_driver(driver)
+        if performance is not None and performance.load is not None:
+            loads.append(performance.load)
+            transfers.append(performance.transfer_size)
+
+    return {
+        "launch": statistics.median(launch_times),
+        "load": statistics.median(loads) if loads else None,
+        "transfer": statistics.median(transfers) if transfers else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Время загрузки страницы: холодный и прогретый профиль")
+    parser.add_argument("--launches", type=int, default=5, help="Количество запусков браузера в каждом режиме")
+    parser.add_argument("--url", default=None, help="Страница для замера (по умолчанию первая из BROWSER_CACHE_WARM_URLS)")
+    args = parser.parse_args()
+    url = args.url or warm_urls()[0]
+
+    settings.BROWSER_CACHE_MODE = WARM
+    default_profile_cache().ensure_template(create_driver)
+
+    results = {mode: measure(mode, url, args.launches) for mode in (COLD, WARM)}
+
+    print(f"url:         {url}")
+    for mode, result in results.items():
+        load = "-" if result["load"] is None else f"{result['load']:.0f}ms"
+        transfer = "-" if result["transfer"] is None else f"{result['transfer'] / 1024:.0f} KiB"
+        print(f"{mode + ':':<12} launch {result['launch']:.2f}s, load {load}, transferred {transfer}")
+
+    cold, warm = results[COLD]["load"], results[WARM]["load"]
+    if cold and warm:
+        print(f"speedup:     {cold / warm:.2f}x")
+    print(f"cache:       {default_profile_cache().stats.summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Бенчмарк разбора страниц результатов поиска.
+
+Запуск:
+    python -m benchmarks.bench_search_parser --pages 300
+"""
+import argparse
+import time
+
+from api.search_parser import parse_search_results
+from utils.stub_server import render_search_page
+
+QUERIES = ["война и мир", "harry potter", "1984", "мастер и маргарита", "12 стульев"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Пропускная способность SearchResultsParser")
+    parser.add_argument("--pages", type=int, default=300, help="Количество страниц")
+    parser.add_argument("--repeat", type=int, default=3, help="Количество повторов, берется лучший")
+    args = parser.parse_args()
+
+    pages = [render_search_page(QUERIES[i % len(QUERIES)], 1 + i % 3) for i in range(args.pages)]
+    total_bytes = sum(len(page.encode("utf-8")) for page in pages)
+
+    best = float("inf")
+    products = 0
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        products = sum(len(parse_search_results(page)) for page in pages)
+        best = min(best, time.perf_counter() - started)
+
+    print(f"pages:       {len(pages)}")
+    print(f"products:    {products}")
+    print(f"time:        {best:.3f}s")
+    print(f"throughput:  {len(pages) / best:.1f} pages/s, {total_bytes / best / 1024 / 1024:.2f} MiB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Бенчмарк запуска pytest: время сбора тестов и импорта модулей.
+
+Запуск:
+    python -m benchmarks.bench_startup -m api --budget-ms 1500
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FORBIDDEN = ("selenium", "webdriver_manager")
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+@dataclass
+class StartupReport:
+    """Результат одного запуска: время и импортированные модули (self, cumulative в мкс)."""
+
+    wall: float
+    collected: str
+    imports: Dict[str, Tuple[int, int]]
+
+    def forbidden(self, packages: Sequence[str] = FORBIDDEN) -> List[str]:
+        return sorted({name.split(".")[0] for name in self.imports if name.split(".")[0] in packages})
+
+    def by_package(self) -> List[Tuple[str, int]]:
+        totals: Dict[str, int] = defaultdict(int)
+        for name, (self_us, _) in self.imports.items():
+            totals[name.split(".")[0]] += self_us
+        return sorted(totals.items(), key=lambda item: -item[1])
+
+
+def measure_startup(markexpr: str, paths: Sequence[str] = ("tests",)) -> StartupReport:
+    """
+    Собирает тесты в отдельном процессе с -X importtime.
+
+    Args:
+        markexpr: Выражение -m
+        paths: Пути для сбора тестов
+
+    Returns:
+        StartupReport: Время запуска и импортированные модули
+    """
+    command = [sys.executable, "-X", "importtime", "-m", "pytest", "--collect-only", "-q",
+               "-p", "no:cacheprovider", *(["-m", markexpr] if markexpr else []), *paths]
+    env = dict(os.environ, PERF_BASELINE_ENABLED="false")
+    started = time.perf_counter()
+    result = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - started
+
+    imports = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            imports[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    summary = result.stdout.strip().splitlines()
+    return StartupReport(wall, summary[-1] if summary else "", imports)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Время запуска pytest и импорта модулей")
+    parser.add_argument("-m", dest="markexpr", default="api", help="Выражение -m ('' - все тесты)")
+    parser.add_argument("--repeat", type=int, default=3, help="Количество повторов, берется лучший")
+    parser.add_argument("--top", type=int, default=10, help="Количество модулей в отчете")
+    parser.add_argument("--budget-ms", type=float, default=1500, help="Допустимое время запуска, мс")
+    parser.add_argument("paths", nargs="*", default=["tests"], help="Пути для сбора тестов")
+    args = parser.parse_args()
+
+    report = min((measure_startup(args.markexpr, args.paths) for _ in range(args.repeat)), key=lambda r: r.wall)
+
+    print(f"collected:   {report.collected}")
+    print(f"time:        {report.wall * 1000:.0f}ms (budget {args.budget_ms:.0f}ms)")
+    print(f"imports:     {len(report.imports)} modules")
+    print("packages (self time):")
+    for package, self_us in report.by_package()[:args.top]:
+        print(f"  {self_us / 1000:8.1f}ms  {package}")
+    print("modules (cumulative time):")
+    for name, (_, cumulative) in sorted(report.imports.items(), key=lambda item: -item[1][1])[:args.top]:
+        print(f"  {cumulative / 1000:8.1f}ms  {name}")
+
+    forbidden = report.forbidden() if args.markexpr == "api" else []
+    if forbidden:
+        print(f"FAIL: API-only run imported {', '.join(forbidden)}")
+    if report.wall * 1000 > args.budget_ms:
+        print("FAIL: startup is over budget")
+    if forbidden or report.wall * 1000 > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
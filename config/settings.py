@@ -11,16 +11,83 @@ class Settings:
     API_BASE_URL = "https://www.labirint.ru"  
 
     API_TIMEOUT = int(os.getenv("API_TIMEOUT", "30"))
-    API_RETRY_COUNT = int(os.getenv("API_RETRY_COUNT", "3"))
+    API_RETRY_COUNT = int(os.getenv("API_RETRY_COUNT", os.getenv("API_MAX_RETRIES", "3")))
+    API_RETRY_BACKOFF = float(os.getenv("API_RETRY_BACKOFF", "0.5"))
+    API_RETRY_BACKOFF_MAX = float(os.getenv("API_RETRY_BACKOFF_MAX", "8"))
+    API_RETRY_BUDGET_RATIO = float(os.getenv("API_RETRY_BUDGET_RATIO", "0.2"))
+    API_RETRY_BUDGET_RESERVE = float(os.getenv("API_RETRY_BUDGET_RESERVE", "10"))
+    API_CONCURRENCY = int(os.getenv("API_CONCURRENCY", "5"))
+    CRAWL_PREFETCH = int(os.getenv("CRAWL_PREFETCH", "4"))
+    CRAWL_DEDUP_SIZE = int(os.getenv("CRAWL_DEDUP_SIZE", "100000"))
+    API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "10"))
+    API_AIMD_MIN = int(os.getenv("API_AIMD_MIN", "1"))
+    API_AIMD_MAX = int(os.getenv("API_AIMD_MAX", "16"))
+    API_AIMD_LATENCY_TARGET = float(os.getenv("API_AIMD_LATENCY_TARGET", "5"))
+    API_TRACE_LIMIT = int(os.getenv("API_TRACE_LIMIT", "200"))
+
+    API_RATE_LIMIT = float(os.getenv("API_RATE_LIMIT", "0"))
+    API_RATE_BURST = int(os.getenv("API_RATE_BURST", "5"))
+    API_RATE_LIMIT_FILE = os.getenv("API_RATE_LIMIT_FILE", "")
+
+    LOAD_TEST_RATE = float(os.getenv("LOAD_TEST_RATE", "0"))
+    LOAD_TEST_USERS = int(os.getenv("LOAD_TEST_USERS", "5"))
+    LOAD_TEST_DURATION = float(os.getenv("LOAD_TEST_DURATION", "0"))
+    LOAD_TEST_QUERIES_FILE = os.getenv("LOAD_TEST_QUERIES_FILE", "")
+    LOAD_TEST_SLO_P95 = float(os.getenv("LOAD_TEST_SLO_P95", "3"))
+    LOAD_TEST_SLO_P99 = float(os.getenv("LOAD_TEST_SLO_P99", "5"))
+    LOAD_TEST_MAX_ERROR_RATE = float(os.getenv("LOAD_TEST_MAX_ERROR_RATE", "0.01"))
+
+    PERF_BASELINE_ENABLED = os.getenv("PERF_BASELINE_ENABLED", "False").lower() == "true"
+    PERF_BASELINE_DB = os.getenv("PERF_BASELINE_DB", os.path.join(os.getcwd(), ".cache", "perf_history.sqlite"))
+    PERF_BASELINE_WINDOW = int(os.getenv("PERF_BASELINE_WINDOW", "10"))
+    PERF_BASELINE_MIN_RUNS = int(os.getenv("PERF_BASELINE_MIN_RUNS", "3"))
+    PERF_REGRESSION_THRESHOLD = float(os.getenv("PERF_REGRESSION_THRESHOLD", "0.25"))
+    PERF_REGRESSION_MIN_DELTA = float(os.getenv("PERF_REGRESSION_MIN_DELTA", "0.05"))
+    PERF_REGRESSION_ACTION = os.getenv("PERF_REGRESSION_ACTION", "warn").lower()
+    TEST_IMPACT_MAP = os.getenv("TEST_IMPACT_MAP", os.path.join(os.getcwd(), ".cache", "test_impact.json"))
+    TEST_DURATIONS_FILE = os.getenv("TEST_DURATIONS_FILE", os.path.join(os.getcwd(), ".cache", "test_durations.json"))
+    SCHEDULE_ORDER = os.getenv("SCHEDULE_ORDER", "none").lower()
+    SCHEDULE_DEFAULT_DURATION = float(os.getenv("SCHEDULE_DEFAULT_DURATION", "5"))
+    SCHEDULE_HISTORY_MAX_AGE = float(os.getenv("SCHEDULE_HISTORY_MAX_AGE", "168"))
+
+    USE_STUB_SERVER = os.getenv("USE_STUB_SERVER", "False").lower() == "true"
+
+    API_CASSETTE_MODE = os.getenv("API_CASSETTE_MODE", "off")
+    API_CASSETTE_DIR = os.getenv("API_CASSETTE_DIR", os.path.join(os.getcwd(), "cassettes"))
+    API_CASSETTE_NAME = os.getenv("API_CASSETTE_NAME", "labirint")
 
     BROWSER = os.getenv("BROWSER", "chrome")
     HEADLESS = os.getenv("HEADLESS", "False").lower() == "true"
     WINDOW_WIDTH = int(os.getenv("WINDOW_WIDTH", "1920"))
     WINDOW_HEIGHT = int(os.getenv("WINDOW_HEIGHT", "1080"))
     IMPLICIT_WAIT = int(os.getenv("IMPLICIT_WAIT", "10"))
+    PAGE_LOAD_TIMEOUT = int(os.getenv("PAGE_LOAD_TIMEOUT", "30"))
+    BLOCKING_PROFILE = os.getenv("BLOCKING_PROFILE", "third-party")
+    BLOCKED_URL_PATTERNS = os.getenv("BLOCKED_URL_PATTERNS", "")
+    BLOCKING_SIZE_CACHE = os.getenv("BLOCKING_SIZE_CACHE", os.path.join(os.getcwd(), ".cache", "blocked_sizes.json"))
+    PAGE_PERFORMANCE_ENABLED = os.getenv("PAGE_PERFORMANCE_ENABLED", "True").lower() == "true"
+    PAGE_PERFORMANCE_SETTLE_MS = int(os.getenv("PAGE_PERFORMANCE_SETTLE_MS", "200"))
+    LOCATOR_SLOW_MS = float(os.getenv("LOCATOR_SLOW_MS", "2"))
+
+    NETWORK_IDLE_TIME = float(os.getenv("NETWORK_IDLE_TIME", "0.5"))
+    NETWORK_IDLE_MAX_INFLIGHT = int(os.getenv("NETWORK_IDLE_MAX_INFLIGHT", "2"))
+    NAVIGATION_POLL_INTERVAL = float(os.getenv("NAVIGATION_POLL_INTERVAL", "0.05"))
+
+    BROWSER_POOL_ENABLED = os.getenv("BROWSER_POOL_ENABLED", "True").lower() == "true"
+    BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "1"))
+    BROWSER_POOL_MAX_USES = int(os.getenv("BROWSER_POOL_MAX_USES", "20"))
+    BROWSER_CACHE_MODE = os.getenv("BROWSER_CACHE_MODE", "cold").lower()
+    BROWSER_CACHE_DIR = os.getenv("BROWSER_CACHE_DIR", os.path.join(os.getcwd(), ".cache", "browser_profile"))
+    BROWSER_CACHE_WARM_URLS = os.getenv("BROWSER_CACHE_WARM_URLS", "/,/search/?q=книга")
+    BROWSER_CACHE_MAX_MB = int(os.getenv("BROWSER_CACHE_MAX_MB", "200"))
+    BROWSER_CACHE_MAX_AGE = float(os.getenv("BROWSER_CACHE_MAX_AGE", "24"))
 
     DOWNLOAD_DIR = os.path.join(os.getcwd(), "downloads")
-    SCREENSHOT_DIR = os.path.join(os.getcwd(), "screenshots")
+    SCREENSHOT_DIR = os.getenv("SCREENSHOTS_DIR", os.path.join(os.getcwd(), "screenshots"))
+    ARTIFACT_COMPRESSION_LEVEL = int(os.getenv("ARTIFACT_COMPRESSION_LEVEL", "9"))
+    ARTIFACT_INLINE_LIMIT_KB = int(os.getenv("ARTIFACT_INLINE_LIMIT_KB", "256"))
+    FAILURE_CAPTURE_ENABLED = os.getenv("FAILURE_CAPTURE_ENABLED", "True").lower() == "true"
+    FAILURE_CAPTURE_COMMANDS = int(os.getenv("FAILURE_CAPTURE_COMMANDS", "20"))
     LOGS_DIR = os.path.join(os.getcwd(), "logs")
 
     TEST_EMAIL = os.getenv("TEST_EMAIL", "")
@@ -81,6 +81,7 @@ class TestData:
         "search_result_title": ".//a[@class='product-title-link']",
         "search_result_author": ".//div[@class='product-author']//a",
         "search_result_price": ".//span[@class='price-val']//span",
+        "search_result_old_price": ".//span[@class='price-old']//span",
 
         "cart_items": "//div[@class='basket-list-items']",
         "cart_item_title": ".//a[@class='basket-list-item-link']",
@@ -95,5 +96,19 @@ class TestData:
         "prev_page": "//a[contains(@class, 'pagination-prev')]"
     }
 
+    PERFORMANCE_BUDGETS: Dict[str, Dict[str, float]] = {
+        "main_page": {
+            "ttfb": 1500,
+            "lcp": 4000,
+            "cls": 0.1,
+            "total_blocking_time": 1500
+        },
+        "book_page": {
+            "ttfb": 1500,
+            "lcp": 4000,
+            "cls": 0.1
+        }
+    }
+
 
 test_data = TestData()
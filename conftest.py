@@ -1,15 +1,39 @@
 import pytest
 import os
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+import sys
+import json
+import allure
+from collections import Counter
+from typing import TYPE_CHECKING, Optional
 from config.settings import settings
 
+if TYPE_CHECKING:
+    # Selenium импортируется только при создании браузера: запуск -m api его не загружает
+    from selenium import webdriver
+    from utils.browser_pool import BrowserPool
+    from utils.profile_cache import ProfileCache
 
-@pytest.fixture(scope="function")
-def driver():
+browser_pool_key = pytest.StashKey["BrowserPool"]()
+profile_cache_key = pytest.StashKey["ProfileCache"]()
+rate_limiter_stats_key = pytest.StashKey[dict]()
+concurrency_stats_key = pytest.StashKey[dict]()
+artifact_stats_key = pytest.StashKey[dict]()
+blocking_totals_key = pytest.StashKey[Counter]()
+dom_wait_totals_key = pytest.StashKey[Counter]()
+test_failed_key = pytest.StashKey[bool]()
+
+
+def create_driver(user_data_dir: Optional[str] = None) -> "webdriver.Chrome":
     """
-    Фикстура для создания WebDriver.
+    Создает и настраивает новый экземпляр WebDriver.
+
+    Args:
+        user_data_dir: Каталог профиля (копия шаблона кэша или собираемый шаблон)
     """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from utils.profile_cache import default_profile_cache
+
     options = Options()
 
     options.add_argument("--no-sandbox")
@@ -21,20 +45,439 @@ def driver():
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option("useAutomationExtension", False)
 
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL", "browser": "ALL"})
+
+    if user_data_dir is not None:
+        profile_cache = default_profile_cache()
+        if profile_cache is not None:
+            for argument in profile_cache.browser_arguments(user_data_dir):
+                options.add_argument(argument)
+        else:
+            options.add_argument(f"--user-data-dir={user_data_dir}")
+
     driver = webdriver.Chrome(options=options)
 
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
 
     driver.implicitly_wait(10)
-    driver.set_page_load_timeout(30)
+    driver.set_page_load_timeout(settings.PAGE_LOAD_TIMEOUT)
+
+    return driver
+
+
+def launch_driver() -> "webdriver.Chrome":
+    """
+    Запускает браузер для теста.
+
+    В режиме BROWSER_CACHE_MODE=warm браузер получает собственную копию
+    шаблона профиля, HTTP кэш которого прогрет ключевыми страницами сайта;
+    такой браузер закрывается через quit_driver().
+    """
+    from utils.profile_cache import default_profile_cache
+
+    profile_cache = default_profile_cache()
+    if profile_cache is None:
+        return create_driver()
+    return profile_cache.launch(create_driver)
+
+
+def quit_driver(driver: "webdriver.Chrome") -> None:
+    """Закрывает браузер, запущенный launch_driver(), вместе с копией профиля."""
+    from utils.profile_cache import default_profile_cache
+
+    profile_cache = default_profile_cache()
+    if profile_cache is None:
+        driver.quit()
+    else:
+        profile_cache.quit(driver)
+
+
+@pytest.fixture(scope="session")
+def browser_pool(request):
+    """
+    Фикстура пула браузеров на всю сессию.
+    """
+    from utils.browser_pool import BrowserPool
+
+    pool = BrowserPool(
+        factory=launch_driver,
+        closer=quit_driver,
+        max_idle=settings.BROWSER_POOL_SIZE,
+        max_uses=settings.BROWSER_POOL_MAX_USES
+    )
+    request.config.stash[browser_pool_key] = pool
+
+    yield pool
+
+    pool.close()
+
+
+@pytest.fixture(scope="function")
+def driver(request):
+    """
+    Фикстура для создания WebDriver.
+
+    При включенном пуле (BROWSER_POOL_ENABLED) сессия берется из пула
+    и после теста сбрасывается, иначе браузер запускается заново для каждого теста.
+
+    Запросы блокируются по профилю BLOCKING_PROFILE (none, third-party, assets),
+    профиль теста задается маркером @pytest.mark.blocking("assets").
+    Отчет о заблокированных запросах прикрепляется к Allure.
+
+    Браузер возвращается в пул или закрывается при любой ошибке в teardown;
+    после упавшего теста сессия в пул не возвращается.
+    """
+    from utils.dom_waits import wait_totals
+    from utils.profile_cache import default_profile_cache
+    from utils.request_blocking import RequestBlocker
+
+    profile_cache = default_profile_cache()
+    if profile_cache is not None:
+        request.config.stash[profile_cache_key] = profile_cache
+
+    pool = request.getfixturevalue("browser_pool") if settings.BROWSER_POOL_ENABLED else None
+    driver = pool.acquire() if pool is not None else launch_driver()
+
+    marker = request.node.get_closest_marker("blocking")
+    blocker = RequestBlocker(driver, marker.args[0] if marker else settings.BLOCKING_PROFILE)
 
     yield driver
 
-    driver.quit()
+    broken = request.node.stash.get(test_failed_key, False)
+    try:
+        request.config.stash[dom_wait_totals_key] = wait_totals()
+        report = blocker.finish()
+        totals = request.config.stash.setdefault(blocking_totals_key, Counter())
+        totals.update(tests=1, blocked=report.blocked_requests, saved=report.saved_bytes, loaded=report.loaded_bytes)
+        allure.attach(report.summary(), name="Заблокированные запросы", attachment_type=allure.attachment_type.TEXT)
+    except Exception:
+        broken = True
+        raise
+    finally:
+        if pool is not None:
+            pool.release(driver, broken=broken)
+        else:
+            quit_driver(driver)
+
+
+@pytest.fixture(scope="session")
+def api_cassette():
+    """
+    Фикстура кассеты API (режим задается через API_CASSETTE_MODE: off, record, replay).
+    """
+    from api.cassette import default_cassette
+    cassette = default_cassette()
+
+    yield cassette
+
+    if cassette is not None and cassette.is_recording:
+        cassette.save()
+
+
+@pytest.fixture(scope="session")
+def stub_server():
+    """
+    Фикстура локального сервера, имитирующего поисковые эндпоинты Лабиринта.
+    """
+    from utils.stub_server import LabirintStubServer
+    server = LabirintStubServer().start()
+
+    yield server
 
+    server.stop()
 
 
 @pytest.fixture(scope="function")
-def api_client():
+def labirint_stub(stub_server, monkeypatch):
+    """
+    Фикстура, направляющая settings.BASE_URL на локальный сервер.
+
+    Деградации, включенные в тесте через inject(), сбрасываются после теста.
+    """
+    monkeypatch.setattr(settings, "BASE_URL", stub_server.url)
+
+    yield stub_server
+
+    stub_server.reset()
+
+
+@pytest.fixture(scope="function")
+def api_client(request, api_cassette):
     from api.api_client import APIClient
-    return APIClient()
+    if settings.USE_STUB_SERVER:
+        request.getfixturevalue("labirint_stub")
+    client = APIClient(cassette=api_cassette)
+    yield client
+
+    state = client.concurrency.snapshot()
+    if state["history"]:
+        allure.attach(
+            json.dumps(state, ensure_ascii=False, indent=2),
+            name="Лимит параллельности API",
+            attachment_type=allure.attachment_type.JSON
+        )
+
+
+@pytest.fixture(autouse=True)
+def request_traces(request):
+    """
+    Собирает трассировки HTTP запросов теста.
+
+    После теста таблица с разбивкой времени прикрепляется к отчету Allure,
+    а трассировки передаются в хук pytest_api_request_traces. Хранятся только
+    первые API_TRACE_LIMIT трассировок, остальные запросы (нагрузочные тесты)
+    попадают в отчет сводкой по эндпоинтам.
+    """
+    from api.tracing import TraceRecorder, format_trace_aggregates, format_trace_table
+
+    with TraceRecorder(limit=settings.API_TRACE_LIMIT) as recorder:
+        yield recorder.traces
+
+    if recorder.traces:
+        allure.attach(
+            format_trace_table(recorder.traces),
+            name="HTTP запросы (мс)",
+            attachment_type=allure.attachment_type.TEXT
+        )
+        if recorder.dropped:
+            allure.attach(
+                f"{recorder.count} запросов, в таблице первые {len(recorder.traces)}\n\n"
+                + format_trace_aggregates(recorder.aggregates),
+                name="HTTP запросы по эндпоинтам (мс)",
+                attachment_type=allure.attachment_type.TEXT
+            )
+        request.config.hook.pytest_api_request_traces(item=request.node, traces=list(recorder.traces))
+
+
+@pytest.fixture(scope="session")
+def worker_name():
+    """
+    Имя воркера pytest-xdist (master при запуске без xdist).
+    """
+    return os.getenv("PYTEST_XDIST_WORKER", "master")
+
+
+@pytest.fixture(scope="session")
+def shared_api_client(request, api_cassette):
+    """
+    API клиент на всю сессию воркера: один пул соединений на процесс.
+
+    Частота запросов всех воркеров ограничивается общим API_RATE_LIMIT.
+    """
+    from api.api_client import APIClient
+    client = APIClient(cassette=api_cassette)
+    if settings.USE_STUB_SERVER:
+        client.base_url = request.getfixturevalue("stub_server").url
+
+    yield client
+
+    client.session.close()
+
+
+def pytest_addhooks(pluginmanager):
+    from utils import hookspecs
+    pluginmanager.add_hookspecs(hookspecs)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("test impact")
+    group.addoption(
+        "--impact-record", action="store_true", default=False,
+        help="Записать карту зависимостей тестов от функций проекта (TEST_IMPACT_MAP)"
+    )
+    group.addoption(
+        "--impact-diff", metavar="REF", default=None,
+        help="Запустить только тесты, затронутые изменениями относительно git ревизии REF"
+    )
+
+    group = parser.getgroup("scheduling")
+    group.addoption(
+        "--shard", metavar="K/N", default=None,
+        help="Запустить K-й из N шардов, сбалансированных по истории длительностей (TEST_DURATIONS_FILE)"
+    )
+    group.addoption(
+        "--schedule-order", choices=("none", "longest-first", "fail-fast"), default=settings.SCHEDULE_ORDER,
+        help="Порядок тестов: longest-first - долгие первыми, fail-fast - упавшие, нестабильные и быстрые первыми"
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "ui: UI тесты (Selenium WebDriver)")
+    config.addinivalue_line("markers", "api: API тесты (requests)")
+    config.addinivalue_line("markers", "load: нагрузочные тесты (LOAD_TEST_*)")
+    config.addinivalue_line("markers", "blocking(profile): профиль блокировки запросов браузера")
+
+    if config.getoption("allure_report_dir", None):
+        from utils.artifacts import set_results_dir
+        set_results_dir(config.getoption("allure_report_dir"))
+
+    if settings.PERF_BASELINE_ENABLED:
+        from utils.perf_baseline import PerfBaselinePlugin
+        config.pluginmanager.register(PerfBaselinePlugin(settings.PERF_BASELINE_DB), "perf-baseline")
+
+    if config.getoption("impact_record") or config.getoption("impact_diff"):
+        from utils.impact import ImpactPlugin
+        config.pluginmanager.register(ImpactPlugin(
+            settings.TEST_IMPACT_MAP,
+            root=str(config.rootpath),
+            record=config.getoption("impact_record"),
+            base=config.getoption("impact_diff")
+        ), "test-impact")
+
+    from utils.scheduling import SchedulingPlugin, parse_shard
+    config.pluginmanager.register(SchedulingPlugin(
+        settings.TEST_DURATIONS_FILE,
+        shard=parse_shard(config.getoption("shard")),
+        order=config.getoption("schedule_order"),
+        default_duration=settings.SCHEDULE_DEFAULT_DURATION,
+        max_age=settings.SCHEDULE_HISTORY_MAX_AGE * 3600
+    ), "scheduling")
+
+
+def pytest_ignore_collect(collection_path, config):
+    # Модули, ни один тест которых не проходит фильтр -m, не импортируются вовсе
+    markexpr = config.getoption("markexpr")
+    if markexpr and collection_path.suffix == ".py" and collection_path.name.startswith("test_"):
+        from utils.static_marks import marker_sources, module_may_match
+        sources = marker_sources(collection_path, config.rootpath, config.pluginmanager.get_plugins())
+        if not module_may_match(collection_path, markexpr, sources):
+            return True
+    return None
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    # Фикстура driver не возвращает в пул браузер упавшего теста
+    outcome = yield
+    if call.when == "call" and outcome.get_result().failed:
+        item.stash[test_failed_key] = True
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config, items):
+    # Плагин с Selenium регистрируется, только если после фильтров остались UI тесты
+    if settings.FAILURE_CAPTURE_ENABLED and any("driver" in getattr(item, "fixturenames", ()) for item in items):
+        from utils.failure_capture import FailureCapturePlugin
+        config.pluginmanager.register(FailureCapturePlugin(settings.FAILURE_CAPTURE_COMMANDS), "failure-capture")
+
+
+def pytest_sessionstart(session):
+    if settings.API_CASSETTE_MODE.lower() == "record" and not hasattr(session.config, "workerinput"):
+        from api.cassette import remove_worker_cassettes
+        remove_worker_cassettes()
+
+
+def pytest_sessionfinish(session):
+    from utils.artifacts import close_artifact_store
+    artifact_stats = close_artifact_store()
+    if artifact_stats is not None:
+        session.config.stash.setdefault(artifact_stats_key, {})["master"] = artifact_stats.summary()
+
+    blocking_totals = session.config.stash.get(blocking_totals_key, None)
+    if blocking_totals:
+        from utils.request_blocking import save_size_cache
+        save_size_cache()
+
+    workeroutput = getattr(session.config, "workeroutput", None)
+    if workeroutput is None:
+        if settings.API_CASSETTE_MODE.lower() == "record":
+            from api.cassette import merge_worker_cassettes
+            merge_worker_cassettes()
+        return
+
+    if blocking_totals:
+        workeroutput["blocking"] = dict(blocking_totals)
+
+    dom_wait_totals = session.config.stash.get(dom_wait_totals_key, None)
+    if dom_wait_totals:
+        workeroutput["dom_waits"] = dict(dom_wait_totals)
+
+    if artifact_stats is not None:
+        workeroutput["artifacts"] = artifact_stats.summary()
+
+    from api.rate_limiter import default_rate_limiter
+    limiter = default_rate_limiter()
+    if limiter is not None:
+        workeroutput["rate_limiter"] = limiter.stats.summary()
+
+    from api.resilience import concurrency_stats
+    if concurrency_stats().controllers:
+        workeroutput["api_concurrency"] = concurrency_stats().summary()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    blocking = getattr(node, "workeroutput", {}).get("blocking")
+    if blocking:
+        node.config.stash.setdefault(blocking_totals_key, Counter()).update(blocking)
+
+    dom_waits = getattr(node, "workeroutput", {}).get("dom_waits")
+    if dom_waits:
+        node.config.stash.setdefault(dom_wait_totals_key, Counter()).update(dom_waits)
+
+    artifacts = getattr(node, "workeroutput", {}).get("artifacts")
+    if artifacts:
+        node.config.stash.setdefault(artifact_stats_key, {})[node.gateway.id] = artifacts
+
+    summary = getattr(node, "workeroutput", {}).get("rate_limiter")
+    if summary:
+        node.config.stash.setdefault(rate_limiter_stats_key, {})[node.gateway.id] = summary
+
+    concurrency = getattr(node, "workeroutput", {}).get("api_concurrency")
+    if concurrency:
+        node.config.stash.setdefault(concurrency_stats_key, {})[node.gateway.id] = concurrency
+
+
+def pytest_terminal_summary(terminalreporter):
+    config = terminalreporter.config
+
+    pool = config.stash.get(browser_pool_key, None)
+    if pool is not None:
+        terminalreporter.write_sep("-", "browser pool")
+        terminalreporter.write_line(pool.stats.summary())
+
+    profile_cache = config.stash.get(profile_cache_key, None)
+    if profile_cache is not None and profile_cache.stats.clones:
+        terminalreporter.write_sep("-", "browser profile cache")
+        terminalreporter.write_line(profile_cache.stats.summary())
+
+    artifact_stats = config.stash.get(artifact_stats_key, {})
+    if artifact_stats:
+        terminalreporter.write_sep("-", f"artifacts ({settings.SCREENSHOT_DIR})")
+        for worker, summary in sorted(artifact_stats.items()):
+            terminalreporter.write_line(f"{worker}: {summary}")
+
+    blocking = config.stash.get(blocking_totals_key, None)
+    if blocking:
+        terminalreporter.write_sep("-", f"blocked requests ({settings.BLOCKING_PROFILE})")
+        terminalreporter.write_line(
+            f"{blocking['tests']} tests: {blocking['blocked']} requests blocked, "
+            f"~{blocking['saved'] / 1024:.0f} KiB saved, {blocking['loaded'] / 1024:.0f} KiB loaded"
+        )
+
+    dom_waits = config.stash.get(dom_wait_totals_key, None)
+    if dom_waits:
+        from utils.dom_waits import format_wait_totals
+        terminalreporter.write_sep("-", "DOM waits")
+        terminalreporter.write_line(format_wait_totals(dom_waits))
+
+    worker_stats = dict(config.stash.get(rate_limiter_stats_key, {}))
+    if not worker_stats and settings.API_RATE_LIMIT > 0:
+        from api.rate_limiter import default_rate_limiter
+        worker_stats["master"] = default_rate_limiter().stats.summary()
+
+    if worker_stats:
+        terminalreporter.write_sep("-", "API rate limiter")
+        for worker, summary in sorted(worker_stats.items()):
+            terminalreporter.write_line(f"{worker}: {summary}")
+
+    concurrency = dict(config.stash.get(concurrency_stats_key, {}))
+    if not concurrency and "api.resilience" in sys.modules:
+        from api.resilience import concurrency_stats
+        if concurrency_stats().controllers:
+            concurrency["master"] = concurrency_stats().summary()
+
+    if concurrency:
+        terminalreporter.write_sep("-", "API concurrency (AIMD)")
+        for worker, summary in sorted(concurrency.items()):
+            terminalreporter.write_line(f"{worker}: {summary}")
@@ -1,33 +1,205 @@
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
-from typing import Tuple, List
+from typing import Tuple, List, Optional, Dict
+from dataclasses import dataclass
 from selenium.webdriver.remote.webelement import WebElement
+from config.settings import settings
+from config.test_data import test_data
+from utils.devtools import NetworkIdleTracker, get_event_stream
+from utils.dom_waits import DomWaitEngine, PRESENT, ALL_PRESENT, VISIBLE, CLICKABLE
+from utils.perf_baseline import PAGE, record_metric
+from utils.web_vitals import PagePerformance, capture_page_performance, install_long_task_observer
+from urllib.parse import urlsplit
 import allure
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+RESOURCE_COUNT_SCRIPT = "return performance.getEntriesByType('resource').length;"
+
+
+@dataclass
+class NavigationTiming:
+    """Время ожидания готовности страницы после навигации."""
+
+    url: str
+    ready_state: float
+    network_idle: float
+    total: float
+    requests: int
+    timed_out: bool
 
 
 class BasePage:
     """Базовый класс для всех страниц."""
 
+    PERFORMANCE_BUDGET: Optional[str] = None
+
     def __init__(self, driver):
         self.driver = driver
         self.wait = WebDriverWait(driver, 10)
+        self.waits = DomWaitEngine(driver)
+        self.navigation_timings: List[NavigationTiming] = []
+        self.performance_history: List[PagePerformance] = []
+        if settings.PAGE_PERFORMANCE_ENABLED:
+            install_long_task_observer(driver)
 
     @allure.step("Открыть URL: {url}")
-    def open(self, url: str) -> None:
+    def open(self, url: str) -> Optional[PagePerformance]:
+        """
+        Открывает URL, ждет готовности страницы и собирает показатели производительности.
+
+        Returns:
+            Optional[PagePerformance]: Показатели страницы (None, если сбор выключен или недоступен)
+        """
+        tracker = self.track_network()
         self.driver.get(url)
+        self.wait_for_page_ready(tracker)
+        if not settings.PAGE_PERFORMANCE_ENABLED:
+            return None
+        return self.capture_performance()
+
+    @property
+    def performance(self) -> Optional[PagePerformance]:
+        """Показатели последней навигации."""
+        return self.performance_history[-1] if self.performance_history else None
+
+    @allure.step("Собрать показатели производительности страницы")
+    def capture_performance(self) -> Optional[PagePerformance]:
+        """
+        Собирает Navigation Timing, Resource Timing, LCP, CLS и long tasks текущей страницы
+        и прикрепляет их к отчету Allure.
+        """
+        performance = capture_page_performance(self.driver, settings.PAGE_PERFORMANCE_SETTLE_MS)
+        if performance is None:
+            return None
+
+        self.performance_history.append(performance)
+        allure.attach(
+            json.dumps(performance.as_dict(), indent=2, ensure_ascii=False),
+            name=f"Page performance: {urlsplit(performance.url).path or '/'}",
+            attachment_type=allure.attachment_type.JSON
+        )
+        if performance.lcp is not None:
+            record_metric(PAGE, f"lcp {urlsplit(performance.url).path or '/'}", performance.lcp / 1000)
+        logger.info(f"Page performance: {performance.summary()}")
+        return performance
+
+    @allure.step("Проверить бюджет производительности страницы")
+    def assert_performance_budget(self, budget: Optional[Dict[str, float]] = None) -> None:
+        """
+        Проверяет показатели последней навигации против бюджета.
+
+        Args:
+            budget: Лимиты по полям PagePerformance (по умолчанию
+                test_data.PERFORMANCE_BUDGETS[PERFORMANCE_BUDGET])
+
+        Raises:
+            AssertionError: Если показатели не собраны или бюджет превышен
+        """
+        if budget is None:
+            budget = test_data.PERFORMANCE_BUDGETS[self.PERFORMANCE_BUDGET]
+        performance = self.performance
+        assert performance is not None, "Показатели производительности страницы не собраны"
+
+        violations = performance.budget_violations(budget)
+        assert not violations, (
+            "Превышен бюджет производительности: " + "; ".join(violations) + "\n" + performance.summary()
+        )
+
+    def track_network(self) -> NetworkIdleTracker:
+        """
+        Начинает отслеживание сетевых запросов перед навигацией.
+
+        События, накопленные до вызова, отбрасываются.
+        """
+        stream = get_event_stream(self.driver)
+        stream.poll()
+        return NetworkIdleTracker(stream, max_inflight=settings.NETWORK_IDLE_MAX_INFLIGHT)
+
+    @allure.step("Дождаться загрузки страницы")
+    def wait_for_page_ready(
+        self,
+        tracker: Optional[NetworkIdleTracker] = None,
+        timeout: Optional[float] = None,
+        idle_time: Optional[float] = None
+    ) -> NavigationTiming:
+        """
+        Ожидает, пока document.readyState станет complete и сеть затихнет.
+
+        Args:
+            tracker: Трекер, запущенный до навигации через track_network()
+            timeout: Максимальное время ожидания, сек
+            idle_time: Окно «тишины» сети, сек
+
+        Returns:
+            NavigationTiming: Время, затраченное на ожидание
+        """
+        timeout = settings.PAGE_LOAD_TIMEOUT if timeout is None else timeout
+        idle_time = settings.NETWORK_IDLE_TIME if idle_time is None else idle_time
+        tracker = tracker or self.track_network()
+
+        started = time.perf_counter()
+        deadline = started + timeout
+        ready_at = None
+        resource_count = -1
+        resource_changed_at = started
+        quiet_for = 0.0
+        timed_out = False
+
+        try:
+            while True:
+                now = time.perf_counter()
+
+                if ready_at is None:
+                    if self.driver.execute_script("return document.readyState") == "complete":
+                        ready_at = now
+
+                tracker.update()
+                if tracker.available:
+                    quiet_for = tracker.idle_for()
+                else:
+                    count = self.driver.execute_script(RESOURCE_COUNT_SCRIPT)
+                    if count != resource_count:
+                        resource_count = count
+                        resource_changed_at = now
+                    quiet_for = now - resource_changed_at
+
+                if ready_at is not None and quiet_for >= idle_time:
+                    break
+
+                if now >= deadline:
+                    timed_out = True
+                    logger.warning(f"Page was not ready after {timeout}s: {self.driver.current_url}")
+                    break
+
+                time.sleep(settings.NAVIGATION_POLL_INTERVAL)
+        finally:
+            tracker.close()
+
+        total = time.perf_counter() - started
+        timing = NavigationTiming(
+            url=self.driver.current_url,
+            ready_state=(ready_at or time.perf_counter()) - started,
+            network_idle=total if timed_out else max(0.0, total - quiet_for),
+            total=total,
+            requests=tracker.requests_seen,
+            timed_out=timed_out
+        )
+        self.navigation_timings.append(timing)
+        record_metric(PAGE, urlsplit(timing.url).path or "/", total)
+        logger.info(f"Page ready in {total:.2f}s ({timing.requests} requests): {timing.url}")
+        return timing
 
     @allure.step("Найти элемент: {locator}")
     def find_element(self, locator: Tuple[str, str], timeout: int = 10) -> WebElement:
-        return WebDriverWait(self.driver, timeout).until(
-            EC.presence_of_element_located(locator)
-        )
+        return self.waits.until(locator, PRESENT, timeout)
 
     @allure.step("Найти элементы: {locator}")
     def find_elements(self, locator: Tuple[str, str], timeout: int = 10) -> List[WebElement]:
-        return WebDriverWait(self.driver, timeout).until(
-            EC.presence_of_all_elements_located(locator)
-        )
+        return self.waits.until(locator, ALL_PRESENT, timeout)
 
     @allure.step("Кликнуть по элементу: {locator}")
     def click(self, locator: Tuple[str, str]) -> None:
@@ -47,18 +219,14 @@ class BasePage:
     @allure.step("Проверить видимость элемента: {locator}")
     def is_element_visible(self, locator: Tuple[str, str], timeout: int = 5) -> bool:
         try:
-            WebDriverWait(self.driver, timeout).until(
-                EC.visibility_of_element_located(locator)
-            )
+            self.waits.until(locator, VISIBLE, timeout)
             return True
         except TimeoutException:
             return False
 
     @allure.step("Дождаться кликабельности элемента: {locator}")
     def wait_for_clickable(self, locator: Tuple[str, str], timeout: int = 10) -> WebElement:
-        return WebDriverWait(self.driver, timeout).until(
-            EC.element_to_be_clickable(locator)
-        )
+        return self.waits.until(locator, CLICKABLE, timeout)
 
     @allure.step("Получить текущий URL")
     def get_current_url(self) -> str:
@@ -1,14 +1,65 @@
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Tuple, List, Optional
+from dataclasses import dataclass, fields
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver
 from pages.base_page import BasePage
+from utils.dom_waits import PRESENT
 from config.test_data import test_data
 import allure
+import logging
+
+logger = logging.getLogger(__name__)
+
+NOT_FOUND = "Не найдено"
+
+SNAPSHOT_SCRIPT = """
+const locators = arguments[0];
+const result = {};
+for (const [name, xpath] of Object.entries(locators)) {
+    const node = document.evaluate(
+        xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+    ).singleNodeValue;
+    result[name] = node ? (node.innerText || node.textContent || "").trim() : null;
+}
+return result;
+"""
+
+
+@dataclass
+class BookSnapshot:
+    """
+    Снимок полей страницы книги.
+
+    Отсутствующее на странице поле имеет значение None.
+    """
+
+    title: Optional[str]
+    author: Optional[str]
+    price: Optional[str]
+    old_price: Optional[str]
+    description: Optional[str]
+
+    @property
+    def missing(self) -> List[str]:
+        return [f.name for f in fields(self) if getattr(self, f.name) is None]
+
+    @property
+    def is_complete(self) -> bool:
+        return all(value is not None for value in (self.title, self.author, self.price))
+
+    def to_info(self) -> Dict[str, Any]:
+        return {
+            f.name: NOT_FOUND if getattr(self, f.name) is None else getattr(self, f.name)
+            for f in fields(self)
+        }
 
 
 class BookPage(BasePage):
     """Page Object для страницы книги."""
 
+    PERFORMANCE_BUDGET = "book_page"
+
     BOOK_TITLE: Tuple[By, str] = (By.XPATH, test_data.LOCATORS["book_title"])
     BOOK_AUTHOR: Tuple[By, str] = (By.XPATH, test_data.LOCATORS["book_author"])
     BOOK_PRICE: Tuple[By, str] = (By.XPATH, test_data.LOCATORS["book_price"])
@@ -33,6 +84,34 @@ class BookPage(BasePage):
         """
         super().__init__(driver)
 
+    @allure.step("Получить снимок страницы книги")
+    def get_snapshot(self, timeout: int = 10) -> BookSnapshot:
+        """
+        Собирает все поля страницы книги за один вызов execute_script.
+
+        Перед чтением ждет появления названия книги: блок с названием и
+        ценой может дорисовываться скриптами после загрузки документа.
+
+        Args:
+            timeout (int): Максимальное время ожидания названия, сек
+
+        Returns:
+            BookSnapshot: Поля книги, отсутствующие поля равны None
+        """
+        try:
+            self.waits.until(self.BOOK_TITLE, PRESENT, timeout)
+        except TimeoutException:
+            logger.warning(f"Book title did not appear in {timeout}s, reading snapshot anyway")
+        locators = {
+            "title": self.BOOK_TITLE[1],
+            "author": self.BOOK_AUTHOR[1],
+            "price": self.BOOK_PRICE[1],
+            "old_price": self.BOOK_OLD_PRICE[1],
+            "description": self.BOOK_DESCRIPTION[1],
+        }
+        values = self.driver.execute_script(SNAPSHOT_SCRIPT, locators) or {}
+        return BookSnapshot(**{name: values.get(name) for name in locators})
+
     @allure.step("Получить информацию о книге")
     def get_book_info(self) -> Dict[str, Any]:
         """
@@ -41,34 +120,7 @@ class BookPage(BasePage):
         Returns:
             Dict[str, Any]: Словарь с информацией о книге
         """
-        info = {}
-
-        try:
-            info["title"] = self.get_element_text(self.BOOK_TITLE)
-        except:
-            info["title"] = "Не найдено"
-
-        try:
-            info["author"] = self.get_element_text(self.BOOK_AUTHOR)
-        except:
-            info["author"] = "Не найдено"
-
-        try:
-            info["price"] = self.get_element_text(self.BOOK_PRICE)
-        except:
-            info["price"] = "Не найдено"
-
-        try:
-            info["old_price"] = self.get_element_text(self.BOOK_OLD_PRICE)
-        except:
-            info["old_price"] = "Не найдено"
-
-        try:
-            info["description"] = self.get_element_text(self.BOOK_DESCRIPTION)
-        except:
-            info["description"] = "Не найдено"
-
-        return info
+        return self.get_snapshot().to_info()
 
     @allure.step("Проверить наличие кнопки 'Добавить в корзину'")
     def is_add_to_cart_button_present(self) -> bool:
@@ -118,10 +170,8 @@ class BookPage(BasePage):
         Returns:
             str: Цена книги
         """
-        try:
-            return self.get_element_text(self.BOOK_PRICE)
-        except:
-            return "Не найдено"
+        price = self.get_snapshot().price
+        return NOT_FOUND if price is None else price
 
     @allure.step("Проверить, что вся информация о книге отображается")
     def verify_book_information_complete(self) -> bool:
@@ -131,13 +181,7 @@ class BookPage(BasePage):
         Returns:
             bool: True если вся информация отображается
         """
-        info = self.get_book_info()
-
-        return all([
-            info["title"] != "Не найдено",
-            info["author"] != "Не найдено",
-            info["price"] != "Не найдено"
-        ])
+        return self.get_snapshot().is_complete
 
     @allure.step("Проверить наличие обложки книги")
     def is_book_cover_displayed(self) -> bool:
@@ -1,15 +1,63 @@
-from typing import List, Tuple, Optional
+from typing import Iterator, List, Tuple, Optional
+from dataclasses import dataclass
+from selenium.common.exceptions import JavascriptException, TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver
 from pages.base_page import BasePage
+from api.search_parser import ProductRecord, SearchResultsParser, build_product_record
 from config.settings import settings
+from config.test_data import test_data
 import allure
+import logging
 import time
 
+logger = logging.getLogger(__name__)
+
+RESULTS_SCRIPT = """
+const [cardXPath, fields, nextXPath] = arguments;
+
+function all(xpath, context) {
+    const snapshot = document.evaluate(xpath, context, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    const nodes = [];
+    for (let i = 0; i < snapshot.snapshotLength; i++) nodes.push(snapshot.snapshotItem(i));
+    return nodes;
+}
+
+const cards = all(cardXPath, document).map(card => {
+    const values = {};
+    let url = null;
+    for (const [name, xpath] of Object.entries(fields)) {
+        const nodes = all(xpath, card);
+        const texts = nodes.map(node => node.textContent.replace(/\\s+/g, " ").trim()).filter(text => text);
+        if (texts.length) values[name] = texts;
+        if (name === "title" && nodes.length) url = nodes[0].getAttribute("href");
+    }
+    return {id: card.getAttribute("data-product-id"), values: values, url: url};
+});
+const next = all(nextXPath, document)[0];
+return {url: location.href, cards: cards, next: next ? next.href : null};
+"""
+
+NAVIGATE_SCRIPT = "window.__resultsPageToken = arguments[0]; window.location.assign(arguments[1]);"
+SAME_DOCUMENT_SCRIPT = "return window.__resultsPageToken === arguments[0];"
+STOP_SCRIPT = "window.stop();"
+
+
+@dataclass
+class ResultsPage:
+    """Страница результатов поиска, разобранная одним вызовом скрипта."""
+
+    number: int
+    url: str
+    books: List[ProductRecord]
+    next_url: Optional[str]
+
 
 class MainPage(BasePage):
     """Page Object для главной страницы книжного магазина."""
 
+    PERFORMANCE_BUDGET = "main_page"
+
     LOGO = (By.CSS_SELECTOR, "a.b-header-b-logo-e-logo")
     SEARCH_INPUT = (By.CSS_SELECTOR, "#search-field")
     SEARCH_BUTTON = (By.CSS_SELECTOR, "button.b-header-b-search-e-btn")
@@ -33,8 +81,7 @@ class MainPage(BasePage):
         Returns:
             MainPage: Экземпляр текущей страницы
         """
-        self.driver.get(self.url)
-        time.sleep(2)  
+        self.open(self.url)
         return self
 
     @allure.step("Проверить, что главная страница отображается")
@@ -86,8 +133,9 @@ class MainPage(BasePage):
             search_input.send_keys(query)
 
             search_button = self.find_element(self.SEARCH_BUTTON)
+            tracker = self.track_network()
             search_button.click()
-            time.sleep(2)
+            self.wait_for_page_ready(tracker)
         except Exception as e:
             print(f"Ошибка при поиске: {e}")
 
@@ -101,7 +149,7 @@ class MainPage(BasePage):
         Returns:
             List[str]: Список названий книг
         """
-        return []
+        return [book.title for book in self.get_book_records() if book.title]
 
     @allure.step("Получить количество книг")
     def get_books_count(self) -> int:
@@ -111,7 +159,98 @@ class MainPage(BasePage):
         Returns:
             int: Количество книг
         """
-        return 0
+        return len(self.get_book_records())
+
+    def get_book_records(self) -> List[ProductRecord]:
+        """
+        Возвращает товары текущей страницы результатов.
+
+        Все карточки (search_results и поля search_result_* из LOCATORS)
+        читаются одним вызовом execute_script, без запроса на каждый элемент.
+
+        Returns:
+            List[ProductRecord]: Товары в порядке на странице
+        """
+        return self.read_results_page().books
+
+    @allure.step("Прочитать страницу результатов {number}")
+    def read_results_page(self, number: int = 1) -> ResultsPage:
+        """
+        Разбирает текущую страницу результатов поиска.
+
+        Args:
+            number (int): Номер страницы в обходе
+
+        Returns:
+            ResultsPage: Товары и ссылка на следующую страницу (next_page)
+        """
+        locators = test_data.LOCATORS
+        fields = {name: locators[key] for name, key in SearchResultsParser.FIELDS.items()}
+        result = self.driver.execute_script(RESULTS_SCRIPT, locators["search_results"], fields, locators["next_page"])
+        books = [build_product_record(card["id"], card["values"], card["url"]) for card in result["cards"]]
+        logger.info(f"Results page {number}: {len(books)} books, {result['url']}")
+        return ResultsPage(number, result["url"], books, result["next"])
+
+    def iter_results_pages(self, max_pages: Optional[int] = None) -> Iterator[ResultsPage]:
+        """
+        Обходит страницы результатов поиска по ссылке next_page.
+
+        Каждая страница отдается сразу после разбора; переход на следующую
+        запускается до этого, так что браузер загружает ее, пока вызывающий
+        код обрабатывает текущую. Если обход прерван (break или close()),
+        генератор дожидается начатого перехода, а если новая страница не
+        открылась за PAGE_LOAD_TIMEOUT - останавливает загрузку (window.stop()).
+        После выхода из цикла браузер находится на следующей странице
+        результатов, а не на текущей.
+
+        Args:
+            max_pages (Optional[int]): Максимальное количество страниц
+
+        Yields:
+            ResultsPage: Очередная страница результатов
+        """
+        page = self.read_results_page()
+        visited = {page.url}
+        while True:
+            next_url = page.next_url
+            if not next_url or next_url in visited or (max_pages is not None and page.number >= max_pages):
+                yield page
+                return
+
+            tracker = self.track_network()
+            token = f"results-{page.number}-{time.monotonic_ns()}"
+            self.driver.execute_script(NAVIGATE_SCRIPT, token, next_url)
+            try:
+                yield page
+            except GeneratorExit:
+                self._finish_navigation(token, tracker)
+                raise
+
+            self._wait_for_new_document(token)
+            self.wait_for_page_ready(tracker)
+            page = self.read_results_page(page.number + 1)
+            visited.add(page.url)
+
+    def _finish_navigation(self, token: str, tracker) -> None:
+        """Дожидается перехода, начатого до прерывания обхода, или останавливает его."""
+        try:
+            self._wait_for_new_document(token)
+            self.wait_for_page_ready(tracker)
+        except TimeoutException:
+            logger.warning("Next results page did not open after iteration stopped, stopping navigation")
+            self.driver.execute_script(STOP_SCRIPT)
+
+    def _wait_for_new_document(self, token: str, timeout: Optional[float] = None) -> None:
+        """Ждет, пока вместо страницы с маркером token откроется новый документ."""
+        deadline = time.perf_counter() + (settings.PAGE_LOAD_TIMEOUT if timeout is None else timeout)
+        while time.perf_counter() < deadline:
+            try:
+                if not self.driver.execute_script(SAME_DOCUMENT_SCRIPT, token):
+                    return
+            except JavascriptException:
+                pass
+            time.sleep(settings.NAVIGATION_POLL_INTERVAL)
+        raise TimeoutException(f"Next results page did not open after {timeout or settings.PAGE_LOAD_TIMEOUT}s")
 
     @allure.step("Кликнуть по логотипу")
     def click_logo(self) -> 'MainPage':
@@ -123,8 +262,9 @@ class MainPage(BasePage):
         """
         try:
             logo = self.find_element(self.LOGO)
+            tracker = self.track_network()
             logo.click()
-            time.sleep(2)
+            self.wait_for_page_ready(tracker)
         except:
             pass
         return self
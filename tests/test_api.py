@@ -1,9 +1,30 @@
 import pytest
 import allure
 import json
-from api.api_client import APIClient
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List
+from api.api_client import APIClient, SearchResult
+from api.response_analyzer import analyze_response
 from config.settings import settings
 from config.test_data import test_data
+from utils.artifacts import attach_artifact
+
+
+@contextmanager
+def streamed_searches(api_client: APIClient, queries: Iterable[str]) -> Iterator[List[SearchResult]]:
+    """
+    Пакетный поиск с потоковыми ответами, которые закрываются при выходе.
+
+    Ответы закрываются, даже если тест упал на одном из запросов
+    или не читал тело ответа (статус не 200).
+    """
+    searches = api_client.search_many(queries, stream=True)
+    try:
+        yield searches
+    finally:
+        for search in searches:
+            if search.response is not None:
+                search.response.close()
 
 
 @pytest.mark.api
@@ -32,25 +53,29 @@ class TestLabirintAPI:
 
         results = []
 
-        for query in test_queries:
-            with allure.step(f"Поиск книги: '{query}'"):
-                response = api_client.search_books(query)
-
-                result_info = {
-                    "query": query,
-                    "status_code": response.status_code,
-                    "success": response.status_code == 200,
-                    "content_type": response.headers.get("Content-Type", ""),
-                    "content_length": len(response.content) if response.content else 0
-                }
-
-                if result_info["success"]:
-                    content = response.text
-                    result_info["has_html_structure"] = "<!DOCTYPE html>" in content or "<html" in content
-                    result_info["contains_search_results"] = "search-result" in content or "product " in content
-                    result_info["contains_query"] = query.lower() in content.lower()
-
-                results.append(result_info)
+        with streamed_searches(api_client, test_queries) as searches:
+            for search in searches:
+                query = search.query
+                with allure.step(f"Поиск книги: '{query}'"):
+                    if search.error:
+                        raise search.error
+                    response = search.response
+                    analysis = analyze_response(response, ["search-result", "product ", query])
+
+                    result_info = {
+                        "query": query,
+                        "status_code": response.status_code,
+                        "success": response.status_code == 200,
+                        "content_type": response.headers.get("Content-Type", ""),
+                        "content_length": analysis.bytes_read
+                    }
+
+                    if result_info["success"]:
+                        result_info["has_html_structure"] = analysis.is_html
+                        result_info["contains_search_results"] = analysis.any(["search-result", "product "])
+                        result_info["contains_query"] = analysis[query]
+
+                    results.append(result_info)
 
         with allure.step("Анализ результатов поиска на кириллице"):
             allure.attach(
@@ -88,35 +113,38 @@ class TestLabirintAPI:
 
         search_results = []
 
-        for query in test_queries:
-            with allure.step(f"Поиск книги: '{query}'"):
-                response = api_client.search_books(query)
-
-                result = {
-                    "query": query,
-                    "status_code": response.status_code,
-                    "response_time": response.elapsed.total_seconds()
-                }
-
-                if response.status_code == 200:
-                    content = response.text
-                    result["content_length"] = len(content)
-                    result["is_html"] = "<!DOCTYPE html>" in content or "<html" in content
-                    result["has_results"] = any(
-                        marker in content.lower()
-                        for marker in ["search-result", "product ", "товар", "книг"]
-                    )
-                    result["mentions_query"] = query.lower() in content.lower()
-
-                search_results.append(result)
-
-                if response.status_code == 200:
-                    preview = content[:1000] + "..." if len(content) > 1000 else content
-                    allure.attach(
-                        preview,
-                        name=f"Response_preview_{query}",
-                        attachment_type=allure.attachment_type.HTML if result.get("is_html") else allure.attachment_type.TEXT,
-                    )
+        result_markers = ["search-result", "product ", "товар", "книг"]
+
+        with streamed_searches(api_client, test_queries) as searches:
+            for search in searches:
+                query = search.query
+                with allure.step(f"Поиск книги: '{query}'"):
+                    if search.error:
+                        raise search.error
+                    response = search.response
+
+                    result = {
+                        "query": query,
+                        "status_code": response.status_code,
+                        "response_time": response.elapsed.total_seconds()
+                    }
+
+                    if response.status_code == 200:
+                        analysis = analyze_response(response, result_markers + [query], preview_size=1000)
+                        result["content_length"] = analysis.bytes_read
+                        result["is_html"] = analysis.is_html
+                        result["has_results"] = analysis.any(result_markers)
+                        result["mentions_query"] = analysis[query]
+
+                    search_results.append(result)
+
+                    if response.status_code == 200:
+                        preview = analysis.preview + "..." if analysis.truncated else analysis.preview
+                        attach_artifact(
+                            preview,
+                            name=f"Response_preview_{query}",
+                            attachment_type=allure.attachment_type.HTML if result.get("is_html") else allure.attachment_type.TEXT,
+                        )
 
         with allure.step("Анализ результатов поиска на латинице"):
             allure.attach(
@@ -156,26 +184,29 @@ class TestLabirintAPI:
 
         results = []
 
-        for query in test_queries:
-            with allure.step(f"Поиск: '{query}'"):
-                response = api_client.search_books(query)
+        book_markers = ["product-", "book-", "товар", "книг"]
 
-                result_info = {
-                    "query": query,
-                    "status_code": response.status_code,
-                    "has_numbers": any(char.isdigit() for char in query)
-                }
+        with streamed_searches(api_client, test_queries) as searches:
+            for search in searches:
+                query = search.query
+                with allure.step(f"Поиск: '{query}'"):
+                    if search.error:
+                        raise search.error
+                    response = search.response
 
-                if response.status_code == 200:
-                    content = response.text
-                    result_info["response_size"] = len(content)
-                    result_info["contains_numbers"] = any(char.isdigit() for char in content[:5000])
-                    result_info["has_book_results"] = any(
-                        marker in content.lower()
-                        for marker in ["product-", "book-", "товар", "книг"]
-                    )
+                    result_info = {
+                        "query": query,
+                        "status_code": response.status_code,
+                        "has_numbers": any(char.isdigit() for char in query)
+                    }
+
+                    if response.status_code == 200:
+                        analysis = analyze_response(response, book_markers, preview_size=5000)
+                        result_info["response_size"] = analysis.bytes_read
+                        result_info["contains_numbers"] = any(char.isdigit() for char in analysis.preview)
+                        result_info["has_book_results"] = analysis.any(book_markers)
 
-                results.append(result_info)
+                    results.append(result_info)
 
         with allure.step("Анализ поиска с цифрами"):
             allure.attach(
@@ -227,10 +258,10 @@ class TestLabirintAPI:
                 }
 
                 if response.status_code == 200:
-                    content = response.text
-                    result["is_redirect"] = "location" in response.headers or "redirect" in content.lower()
-                    result["is_main_page"] = "лабиринт" in content.lower() and "книжный" in content.lower()
-                    result["has_content"] = len(content.strip()) > 0
+                    analysis = analyze_response(response, ["redirect", "лабиринт", "книжный"])
+                    result["is_redirect"] = "location" in response.headers or analysis["redirect"]
+                    result["is_main_page"] = analysis["лабиринт"] and analysis["книжный"]
+                    result["has_content"] = len(analysis.preview.strip()) > 0
 
                 results.append(result)
 
@@ -266,9 +297,12 @@ class TestLabirintAPI:
         results_with_auth = []
         results_without_auth = []
 
-        for query in test_queries:
+        for search in api_client.search_many(test_queries, include_auth=True):
+            query = search.query
             with allure.step(f"Поиск с авторизацией: '{query}'"):
-                response = api_client.search_books(query, include_auth=True)
+                if search.error:
+                    raise search.error
+                response = search.response
 
                 results_with_auth.append({
                     "query": query,
@@ -276,9 +310,12 @@ class TestLabirintAPI:
                     "headers_count": len(response.headers)
                 })
 
-        for query in test_queries:
+        for search in api_client.search_many(test_queries, include_auth=False):
+            query = search.query
             with allure.step(f"Поиск без авторизации: '{query}'"):
-                response = api_client.search_books(query, include_auth=False)
+                if search.error:
+                    raise search.error
+                response = search.response
 
                 result = {
                     "query": query,
@@ -289,7 +326,7 @@ class TestLabirintAPI:
 
                 results_without_auth.append(result)
 
-                allure.attach(
+                attach_artifact(
                     json.dumps(dict(response.headers), indent=2),
                     name=f"Headers_Without_Auth_{query}",
                     attachment_type=allure.attachment_type.JSON,
@@ -0,0 +1,369 @@
+import os
+import pytest
+import allure
+import time
+import socket
+import requests
+from api.api_client import APIClient
+from api.cassette import Cassette, CassetteMissError, cassette_path, default_cassette, merge_worker_cassettes
+from api.rate_limiter import FileTokenBucket
+from api.resilience import AIMDController, RetryBudget
+from api.tracing import TraceRecorder
+from config.settings import settings
+from config.test_data import test_data
+from utils.stub_server import LabirintStubServer
+
+SEARCH_ENDPOINT = test_data.API_TEST_DATA["search_endpoints"]["search"]
+
+
+@pytest.fixture(autouse=True)
+def live_requests(monkeypatch):
+    """Отключает кассеты, выбранные через окружение: тесты проверяют реальные запросы к серверу."""
+    monkeypatch.setattr(settings, "API_CASSETTE_MODE", "off")
+
+
+@pytest.mark.api
+@allure.feature("API Тесты")
+@allure.story("Локальный сервер")
+class TestAPIClientWithStub:
+    """Тесты APIClient против локального сервера с внедрением деградаций."""
+
+    @allure.title("Поиск через локальный сервер")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_search_endpoints(self, labirint_stub: LabirintStubServer) -> None:
+        """
+        Тест ответов поисковых эндпоинтов локального сервера.
+
+        Args:
+            labirint_stub (LabirintStubServer): Фикстура локального сервера
+        """
+        client = APIClient(cassette=None)
+
+        with allure.step("Поиск и автодополнение"):
+            search = client.search_books("война и мир")
+            autocomplete = client.get(
+                test_data.API_TEST_DATA["search_endpoints"]["autocomplete"],
+                params={"term": "война"}
+            )
+
+        assert search.status_code == 200
+        assert "product need-watch watched" in search.text
+        assert "война и мир" in search.text.lower()
+        assert autocomplete.json(), "Автодополнение вернуло пустой список"
+        assert labirint_stub.hits[SEARCH_ENDPOINT] == 1
+
+        with allure.step("Некорректный номер страницы"):
+            assert client.get(SEARCH_ENDPOINT, params={"q": "1984", "page": "abc"}).status_code == 400
+
+    @allure.title("Пакетный поиск выполняется параллельно")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_search_many_is_concurrent(self, labirint_stub: LabirintStubServer, monkeypatch) -> None:
+        """
+        Тест, что пять запросов с задержкой занимают время примерно одного запроса,
+        даже если начальный лимит AIMD (API_CONCURRENCY) меньше аргумента concurrency.
+
+        Args:
+            labirint_stub (LabirintStubServer): Фикстура локального сервера
+        """
+        monkeypatch.setattr(settings, "API_CONCURRENCY", 2)
+        labirint_stub.inject(SEARCH_ENDPOINT, latency=0.3)
+        client = APIClient(cassette=None)
+        queries = ["война и мир", "harry potter", "1984", "12 стульев", "анна каренина"]
+
+        started = time.perf_counter()
+        results = client.search_many(queries, concurrency=5)
+        elapsed = time.perf_counter() - started
+
+        assert [r.query for r in results] == queries
+        assert all(r.ok and r.response.status_code == 200 for r in results)
+        assert all(r.elapsed >= 0.3 for r in results)
+        assert elapsed < 0.3 * len(queries) / 2, f"Запросы выполнялись последовательно: {elapsed:.2f}сек"
+        assert client.concurrency.snapshot()["history"][0]["reason"] == "search_many concurrency 5"
+
+    @allure.title("Таймаут клиента при медленном сервере")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_timeout_is_reported_per_query(self, labirint_stub: LabirintStubServer) -> None:
+        """
+        Тест, что таймаут одного запроса возвращается как ошибка результата.
+
+        Args:
+            labirint_stub (LabirintStubServer): Фикстура локального сервера
+        """
+        labirint_stub.inject(SEARCH_ENDPOINT, latency=0.5)
+        client = APIClient(cassette=None)
+        client.timeout = 0.1
+        client.max_retries = 0
+
+        results = client.search_many(["война и мир", "1984"])
+
+        assert all(isinstance(r.error, requests.exceptions.Timeout) for r in results)
+        assert all(r.response is None for r in results)
+
+    @allure.title("Код ошибки и медленная отдача тела ответа")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_status_and_slow_body(self, labirint_stub: LabirintStubServer) -> None:
+        """
+        Тест внедрения кода статуса и медленной отдачи тела.
+
+        Args:
+            labirint_stub (LabirintStubServer): Фикстура локального сервера
+        """
+        client = APIClient(cassette=None)
+        client.max_retries = 0
+
+        with allure.step("Сервер отвечает 503"):
+            labirint_stub.inject(SEARCH_ENDPOINT, status=503)
+            assert client.search_books("1984").status_code == 503
+
+        with allure.step("Сервер отдает тело по частям"):
+            labirint_stub.inject(SEARCH_ENDPOINT, chunk_delay=0.05, chunk_size=4096)
+            started = time.perf_counter()
+            response = client.search_books("1984")
+            total = time.perf_counter() - started
+
+            assert response.status_code == 200
+            assert response.elapsed.total_seconds() < total
+            assert total >= 0.05 * (len(response.content) // 4096)
+
+    @allure.title("Запись и воспроизведение кассеты")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_cassette_roundtrip(self, labirint_stub: LabirintStubServer, tmp_path, monkeypatch) -> None:
+        """
+        Тест, что записанные ответы воспроизводятся без сетевых запросов.
+
+        Args:
+            labirint_stub (LabirintStubServer): Фикстура локального сервера
+        """
+        path = str(tmp_path / "cassette.json")
+
+        with allure.step("Запись ответов"):
+            recorder = APIClient(cassette=Cassette(path, "record"))
+            recorded = recorder.search_books("мастер и маргарита")
+            recorder.cassette.save()
+
+        with allure.step("Повторная запись перезаписывает кассету"):
+            recorder = APIClient(cassette=Cassette(path, "record"))
+            recorded = recorder.search_books("мастер и маргарита")
+            recorder.cassette.save()
+            assert [len(entries) for entries in Cassette(path, "replay").interactions.values()] == [1]
+
+        with allure.step("Воспроизведение ответов"):
+            monkeypatch.setattr(settings, "BASE_URL", "http://127.0.0.1:9")
+            player = APIClient(cassette=Cassette(path, "replay"))
+            replayed = player.search_books("мастер и маргарита")
+
+            assert replayed.status_code == recorded.status_code
+            assert replayed.text == recorded.text
+            assert labirint_stub.hits[SEARCH_ENDPOINT] == 2
+
+            with pytest.raises(CassetteMissError):
+                player.search_books("неизвестный запрос")
+
+        with allure.step("cassette=None отключает кассету из настроек"):
+            monkeypatch.setattr(settings, "BASE_URL", labirint_stub.url)
+            monkeypatch.setattr(settings, "API_CASSETTE_MODE", "replay")
+            assert APIClient().cassette is not None
+            assert APIClient(cassette=None).search_books("неизвестный запрос").status_code == 200
+
+        with allure.step("Записи воркеров xdist объединяются в одну кассету"):
+            monkeypatch.setattr(settings, "API_CASSETTE_DIR", str(tmp_path / "workers"))
+            for worker, query in (("gw0", "1984"), ("gw1", "дюна")):
+                monkeypatch.setenv("PYTEST_XDIST_WORKER", worker)
+                monkeypatch.setattr(settings, "API_CASSETTE_MODE", "record")
+                cassette = default_cassette()
+                assert cassette.path == cassette_path(worker)
+                APIClient(cassette=cassette).search_books(query)
+                cassette.save()
+
+            assert merge_worker_cassettes() == 2
+            assert os.listdir(tmp_path / "workers") == [os.path.basename(cassette_path())]
+            assert len(Cassette(cassette_path(), "replay").interactions) == 2
+
+    @allure.title("Общий лимит частоты запросов для нескольких клиентов")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_shared_rate_limit(self, labirint_stub: LabirintStubServer, tmp_path) -> None:
+        """
+        Тест, что клиенты с общим файлом состояния делят один лимит.
+
+        Args:
+            labirint_stub (LabirintStubServer): Фикстура локального сервера
+        """
+        path = str(tmp_path / "bucket.bin")
+        clients = [APIClient(cassette=None, rate_limiter=FileTokenBucket(path, rate=20, burst=1)) for _ in range(2)]
+
+        started = time.perf_counter()
+        for i in range(6):
+            clients[i % 2].search_books("1984")
+        elapsed = time.perf_counter() - started
+
+        waited = sum(c.rate_limiter.stats.wait_time for c in clients)
+        assert elapsed >= 5 / 20 * 0.9, f"Лимит не соблюдается: {elapsed:.2f}сек"
+        assert waited > 0
+        assert sum(c.rate_limiter.stats.acquired for c in clients) == 6
+
+    @allure.title("Повтор запроса после временной ошибки сервера")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_retry_recovers_after_errors(self, labirint_stub: LabirintStubServer, monkeypatch) -> None:
+        """
+        Тест, что GET-запрос повторяется при 503 и возвращает успешный ответ.
+
+        Args:
+            labirint_stub (LabirintStubServer): Фикстура локального сервера
+        """
+        monkeypatch.setattr(settings, "API_RETRY_BACKOFF", 0.01)
+        labirint_stub.inject(SEARCH_ENDPOINT, status=503, times=2)
+        client = APIClient(cassette=None)
+        client.max_retries = 3
+        client.retry_budget = RetryBudget(ratio=0.2, reserve=10)
+
+        response = client.search_books("1984")
+
+        assert response.status_code == 200
+        assert labirint_stub.hits[SEARCH_ENDPOINT] == 3
+        assert client.retry_budget.snapshot()["retries"] == 2
+
+    @allure.title("Бюджет повторов и снижение параллельности при отказе")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_retry_budget_and_aimd_during_outage(self, labirint_stub: LabirintStubServer, monkeypatch) -> None:
+        """
+        Тест, что при отказе сервиса повторы ограничены бюджетом, а лимит параллельности снижается.
+
+        Args:
+            labirint_stub (LabirintStubServer): Фикстура локального сервера
+        """
+        monkeypatch.setattr(settings, "API_RETRY_BACKOFF", 0.001)
+        labirint_stub.inject(SEARCH_ENDPOINT, status=503)
+        client = APIClient(cassette=None)
+        client.max_retries = 3
+        client.retry_budget = RetryBudget(ratio=0.1, reserve=2)
+        client.concurrency = AIMDController(initial=8, minimum=1, maximum=16, latency_target=5, cooldown=0)
+
+        queries = [f"запрос {i}" for i in range(20)]
+        results = client.search_many(queries, concurrency=4)
+
+        with allure.step("Повторов не больше бюджета"):
+            assert all(r.response.status_code == 503 for r in results)
+            budget = client.retry_budget.snapshot()
+            assert budget["retries"] <= 2 + 0.1 * len(queries)
+            assert labirint_stub.hits[SEARCH_ENDPOINT] == len(queries) + budget["retries"]
+
+        with allure.step("Лимит параллельности снижен"):
+            state = client.concurrency.snapshot()
+            allure.attach(str(state), name="AIMD", attachment_type=allure.attachment_type.TEXT)
+            assert state["limit"] == 1
+            assert state["last_change"] == "status 503"
+
+    @allure.title("Разбивка времени запроса")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_request_timing_breakdown(self, labirint_stub: LabirintStubServer, request_traces) -> None:
+        """
+        Тест трассировки: новое и переиспользованное соединение, время до первого байта и объем тела.
+
+        Args:
+            labirint_stub (LabirintStubServer): Фикстура локального сервера
+            request_traces: Трассировки запросов текущего теста
+        """
+        client = APIClient(cassette=None)
+        client.max_retries = 0
+
+        first = client.search_books("1984")
+        labirint_stub.inject(SEARCH_ENDPOINT, latency=0.2, chunk_delay=0.02, chunk_size=8192)
+        second = client.search_books("1984", stream=True)
+        body = second.content
+
+        with allure.step("Первый запрос открывает соединение"):
+            trace = first.trace
+            assert not trace.reused
+            assert trace.connect is not None and trace.tls is None
+            assert trace.decoded_bytes == trace.wire_bytes == len(first.content)
+
+        with allure.step("Второй запрос использует соединение из пула"):
+            trace = second.trace
+            assert trace.reused and trace.connect is None
+            assert trace.ttfb >= 0.2
+            assert trace.download >= 0.02 * (len(body) // 8192)
+            assert trace.total >= trace.ttfb + trace.download
+
+        assert [t.attempt for t in request_traces] == [0, 0]
+        assert request_traces[1] is second.trace
+
+    @allure.title("Трассировка запроса с редиректом")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_redirect_trace(self, labirint_stub: LabirintStubServer, request_traces) -> None:
+        """
+        Тест, что трассировка завершается на последнем ответе, а не на теле редиректа.
+
+        Args:
+            labirint_stub (LabirintStubServer): Фикстура локального сервера
+            request_traces: Трассировки запросов текущего теста
+        """
+        client = APIClient(cassette=None)
+        client.max_retries = 0
+        labirint_stub.inject("/old-search/", redirect=f"{SEARCH_ENDPOINT}?q=1984")
+        labirint_stub.inject(SEARCH_ENDPOINT, latency=0.3, chunk_delay=0.01, chunk_size=8192)
+
+        response = client.get("/old-search/")
+
+        trace = response.trace
+        assert request_traces == [trace]
+        assert trace.status == 200 and trace.redirects == 1
+        assert trace.ttfb >= 0.3
+        assert trace.total >= trace.ttfb + trace.download
+        assert trace.wire_bytes == len(response.content) == trace.decoded_bytes > 0
+
+    @allure.title("Трассировка не меняет выбор адреса соединения")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_traced_connection_tries_all_addresses(self, labirint_stub: LabirintStubServer, monkeypatch) -> None:
+        """
+        Тест, что при недоступном первом адресе getaddrinfo соединение открывается по следующему, а трассировки теста ограничены.
+
+        Args:
+            labirint_stub (LabirintStubServer): Фикстура локального сервера
+        """
+        with socket.socket() as closed:
+            closed.bind(("127.0.0.1", 0))
+            closed_port = closed.getsockname()[1]
+        getaddrinfo = socket.getaddrinfo
+
+        def addresses(host, port, *args, **kwargs):
+            resolved = getaddrinfo(host, port, *args, **kwargs)
+            refused = (socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", ("127.0.0.1", closed_port))
+            return [refused] + resolved
+
+        monkeypatch.setattr(socket, "getaddrinfo", addresses)
+        client = APIClient(cassette=None)
+        client.max_retries = 0
+
+        with TraceRecorder(limit=2) as recorder:
+            responses = [client.search_books("1984") for _ in range(3)]
+
+        assert all(r.status_code == 200 for r in responses)
+        assert not responses[0].trace.reused and responses[0].trace.dns is not None
+        assert len(recorder.traces) == 2 and recorder.dropped == 1
+        aggregate = recorder.aggregates[f"GET {SEARCH_ENDPOINT}"]
+        assert (aggregate.count, aggregate.errors, aggregate.new_connections) == (3, 0, 1)
+
+    @allure.title("Место в лимите параллельности освобождается при любом исключении")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_concurrency_slot_released_on_foreign_error(self, labirint_stub: LabirintStubServer, monkeypatch) -> None:
+        """
+        Тест, что исключение не из requests освобождает место AIMD, не меняя лимит.
+
+        Args:
+            labirint_stub (LabirintStubServer): Фикстура локального сервера
+        """
+        client = APIClient(cassette=None)
+        client.max_retries = 0
+        client.concurrency = AIMDController(initial=1, minimum=1, maximum=4, latency_target=5, cooldown=0)
+
+        def broken(*args, **kwargs):
+            raise ValueError("Invalid header value")
+
+        with monkeypatch.context() as patch, pytest.raises(ValueError):
+            patch.setattr(client.session, "request", broken)
+            client.search_books("1984")
+
+        state = client.concurrency.snapshot()
+        assert state["inflight"] == 0
+        assert state["limit"] == 1 and not state["history"]
+        assert client.search_books("1984").status_code == 200
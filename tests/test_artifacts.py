@@ -0,0 +1,110 @@
+import os
+import struct
+import zlib
+import pytest
+import allure
+from config.settings import settings
+from utils import artifacts
+from utils.artifacts import ArtifactStore, attach_artifact, attach_screenshot, optimize_png
+
+
+def make_png(width: int, height: int, level: int = 1) -> bytes:
+    """PNG в градациях серого с крупным узором (как у скриншота страницы), сжатый с заданным уровнем."""
+    def chunk(kind: bytes, body: bytes) -> bytes:
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+    rows = b"".join(b"\x00" + bytes(((x // 7) * (y // 5)) % 97 for x in range(width)) for y in range(height))
+    header = struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows, level)) + chunk(b"IEND", b"")
+
+
+class FakeDriver:
+    def __init__(self, png: bytes) -> None:
+        self.png = png
+
+    def get_screenshot_as_png(self) -> bytes:
+        return self.png
+
+
+def idat(png: bytes) -> bytes:
+    position, data = 8, b""
+    while position < len(png):
+        length, = struct.unpack(">I", png[position:position + 4])
+        if png[position + 4:position + 8] == b"IDAT":
+            data += png[position + 8:position + 8 + length]
+        position += 12 + length
+    return zlib.decompress(data)
+
+
+@allure.feature("UI Тесты")
+@allure.story("Артефакты")
+class TestArtifactStore:
+    """Тесты фонового хранилища вложений с адресацией по содержимому."""
+
+    @allure.title("Скриншоты пересжимаются без потерь в фоне")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_screenshot_is_optimized(self, tmp_path) -> None:
+        """
+        Тест, что скриншот записывается фоновым потоком и пересжатый PNG содержит те же пиксели.
+        """
+        png = make_png(400, 300)
+        store = ArtifactStore(str(tmp_path))
+
+        path = store.screenshot(FakeDriver(png))
+        assert os.path.exists(path)
+        store.close()
+
+        with open(path, "rb") as f:
+            stored = f.read()
+
+        assert path.startswith(str(tmp_path)) and path.endswith(".png")
+        assert len(stored) < len(png)
+        assert idat(stored) == idat(png)
+        assert optimize_png(b"not a png") == b"not a png"
+
+    @allure.title("Одинаковые вложения хранятся один раз")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_deduplication(self, tmp_path) -> None:
+        """
+        Тест, что одинаковое содержимое дает один файл, а разное - разные.
+        """
+        store = ArtifactStore(str(tmp_path))
+
+        first = store.submit('{"status": 200}', "json")
+        second = store.submit('{"status": 200}', "json")
+        other = store.submit('{"status": 404}', "json")
+        store.close()
+
+        assert first == second != other
+        assert (store.stats.written, store.stats.deduplicated) == (2, 1)
+        assert sum(len(files) for _, _, files in os.walk(tmp_path)) == 2
+
+        with allure.step("Повторный запуск находит файл на диске"):
+            rerun = ArtifactStore(str(tmp_path))
+            assert rerun.submit('{"status": 200}', "json") == first
+            rerun.close()
+            assert (rerun.stats.written, rerun.stats.deduplicated) == (0, 1)
+
+    @allure.title("Мелкие вложения целиком, крупные - относительной ссылкой")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_attachments(self, tmp_path, monkeypatch) -> None:
+        """
+        Тест, что текст до ARTIFACT_INLINE_LIMIT_KB прикрепляется целиком, а ссылки на файлы
+        строятся относительно каталога результатов Allure и только на записанные файлы.
+        """
+        attached = []
+        monkeypatch.setattr(allure, "attach", lambda body, name, attachment_type: attached.append((name, body)))
+        monkeypatch.setattr(settings, "ARTIFACT_INLINE_LIMIT_KB", 1)
+        monkeypatch.setattr(artifacts, "_default_store", ArtifactStore(str(tmp_path / "screenshots"), 0))
+        artifacts.set_results_dir(str(tmp_path / "allure-results"))
+        try:
+            assert attach_artifact('{"status": 200}', "small", allure.attachment_type.JSON) is None
+            path = attach_artifact("x" * 2048, "large", allure.attachment_type.TEXT)
+            screenshot = attach_screenshot(FakeDriver(make_png(10, 10)), "screenshot")
+        finally:
+            artifacts.set_results_dir(None)
+
+        assert attached[0] == ("small", '{"status": 200}')
+        assert os.path.exists(path) and os.path.exists(screenshot)
+        assert attached[1] == ("large", f"../screenshots/{os.path.relpath(path, tmp_path / 'screenshots')}")
+        assert attached[2][1].startswith("../screenshots/") and attached[2][1].endswith(".png")
@@ -0,0 +1,67 @@
+import allure
+from config.settings import settings
+from pages.book_page import SNAPSHOT_SCRIPT, BookPage
+from utils.dom_waits import PRESENT, WAIT_SCRIPT
+
+FIELDS = {"title": "1984", "author": "Джордж Оруэлл", "price": "499 ₽", "old_price": None, "description": "Роман"}
+
+
+class Timeouts:
+    script = 30.0
+
+
+class BookDriver:
+    """WebDriver, на котором поля книги читаются только после появления названия."""
+
+    timeouts = Timeouts()
+
+    def __init__(self, wait_results) -> None:
+        self.wait_results = list(wait_results)
+        self.rendered = False
+        self.log = []
+
+    def execute_async_script(self, script, *args):
+        assert script == WAIT_SCRIPT
+        self.log.append(("wait", args[1], args[2]))
+        result = self.wait_results.pop(0)
+        self.rendered = result["status"] == "ok"
+        return result
+
+    def execute_script(self, script, *args):
+        assert script == SNAPSHOT_SCRIPT
+        self.log.append(("snapshot",))
+        return FIELDS if self.rendered else {}
+
+
+@allure.feature("UI Тесты")
+@allure.story("Страница книги")
+class TestBookPage:
+    """Тесты снимка страницы книги без браузера."""
+
+    @allure.title("Снимок читается после появления названия")
+    @allure.severity(allure.severity_level.CRITICAL)
+    def test_snapshot_waits_for_title(self, monkeypatch) -> None:
+        """
+        Тест, что перед чтением полей выполняется одно ограниченное ожидание названия.
+        """
+        monkeypatch.setattr(settings, "PAGE_PERFORMANCE_ENABLED", False)
+        driver = BookDriver([{"status": "ok", "elements": ["h1"]}])
+
+        snapshot = BookPage(driver).get_snapshot(timeout=3)
+
+        assert driver.log == [("wait", BookPage.BOOK_TITLE[1], PRESENT), ("snapshot",)]
+        assert snapshot.title == "1984" and snapshot.missing == ["old_price"]
+
+    @allure.title("Снимок без названия после таймаута")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_snapshot_after_timeout(self, monkeypatch) -> None:
+        """
+        Тест, что страница без названия не ждет дольше таймаута и возвращает снимок с пустыми полями.
+        """
+        monkeypatch.setattr(settings, "PAGE_PERFORMANCE_ENABLED", False)
+        driver = BookDriver([{"status": "timeout"}])
+
+        snapshot = BookPage(driver).get_snapshot(timeout=1)
+
+        assert [entry[0] for entry in driver.log] == ["wait", "snapshot"]
+        assert snapshot.title is None
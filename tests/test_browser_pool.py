@@ -0,0 +1,152 @@
+import allure
+from selenium.common.exceptions import WebDriverException
+from utils.browser_pool import CLEAR_STORAGE_SCRIPT, BrowserPool
+
+
+class SwitchTo:
+    def __init__(self, driver: "PoolDriver") -> None:
+        self.driver = driver
+
+    def window(self, handle: str) -> None:
+        assert handle in self.driver.handles
+        self.driver.current = handle
+
+
+class PoolDriver:
+    """WebDriver с окнами и журналом команд сброса."""
+
+    def __init__(self, handles=("main",), current: str = "main") -> None:
+        self.handles = list(handles)
+        self.current = current
+        self.switch_to = SwitchTo(self)
+        self.alive = True
+        self.log = []
+
+    @property
+    def window_handles(self):
+        self._check()
+        return list(self.handles)
+
+    @property
+    def current_window_handle(self) -> str:
+        self._check()
+        return self.current
+
+    def open_window(self, handle: str) -> None:
+        self.handles.append(handle)
+        self.current = handle
+
+    def close(self) -> None:
+        self.handles.remove(self.current)
+        self.log.append(("close", self.current))
+
+    def execute_script(self, script, *args):
+        assert script == CLEAR_STORAGE_SCRIPT
+        self._check()
+        self.log.append(("clear_storage", self.current))
+        return "https://www.labirint.ru"
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.log.append(("cdp", cmd))
+
+    def delete_all_cookies(self) -> None:
+        self.log.append(("delete_cookies",))
+
+    def get(self, url: str) -> None:
+        self.log.append(("get", url))
+
+    def get_log(self, log_type: str):
+        self.log.append(("get_log", log_type))
+        return [{"level": "SEVERE", "message": "error from the previous test"}]
+
+    def _check(self) -> None:
+        if not self.alive:
+            raise WebDriverException("chrome not reachable")
+
+
+def make_pool(**kwargs):
+    launched, closed = [], []
+
+    def factory():
+        launched.append(PoolDriver())
+        return launched[-1]
+
+    pool = BrowserPool(factory=factory, closer=closed.append, **kwargs)
+    return pool, launched, closed
+
+
+@allure.feature("Инфраструктура")
+@allure.story("Пул браузеров")
+class TestBrowserPool:
+    """Тесты пула сессий WebDriver на фиктивном драйвере."""
+
+    @allure.title("Сессия сбрасывается и переиспользуется")
+    @allure.severity(allure.severity_level.CRITICAL)
+    def test_reset_and_reuse(self) -> None:
+        """
+        Тест, что после теста закрываются лишние окна, очищаются хранилища, а при повторной выдаче
+        вычитывается консоль браузера.
+        """
+        pool, launched, closed = make_pool()
+
+        driver = pool.acquire()
+        driver.open_window("popup")
+        pool.release(driver)
+
+        assert driver.handles == ["main"] and driver.current == "main"
+        assert ("close", "popup") in driver.log
+        assert driver.log[-3:] == [("cdp", "Storage.clearDataForOrigin"), ("delete_cookies",), ("get", "about:blank")]
+        assert ("get_log", "browser") not in driver.log
+        assert pool.acquire() is driver
+        assert driver.log[-1] == ("get_log", "browser")
+        assert (pool.stats.hits, pool.stats.misses, pool.stats.launches) == (1, 1, 1)
+        assert closed == []
+
+    @allure.title("Остается окно, активное при выдаче сессии")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_reset_keeps_original_window(self) -> None:
+        """
+        Тест, что сброс возвращается к исходному окну, даже если оно не первое в window_handles.
+        """
+        driver = PoolDriver(handles=["devtools", "main"], current="main")
+        pool = BrowserPool(factory=lambda: driver, closer=lambda d: None)
+
+        assert pool.acquire() is driver
+        driver.open_window("popup")
+        pool.release(driver)
+
+        assert driver.handles == ["main"] and driver.current == "main"
+        assert [entry for entry in driver.log if entry[0] == "close"] == [("close", "devtools"), ("close", "popup")]
+
+    @allure.title("Пересоздание сессии после max_uses")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_recycle_after_max_uses(self) -> None:
+        """
+        Тест, что сессия закрывается после max_uses тестов, а следующая запускается заново.
+        """
+        pool, launched, closed = make_pool(max_uses=2)
+
+        for _ in range(2):
+            driver = pool.acquire()
+            pool.release(driver)
+
+        assert closed == [launched[0]] and pool.stats.recycled == 1
+        assert pool.acquire() is launched[1]
+
+    @allure.title("Сломанная и мертвая сессии не возвращаются в пул")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_broken_and_dead_sessions_are_discarded(self) -> None:
+        """
+        Тест, что сессия упавшего теста и браузер, переставший отвечать в пуле, закрываются.
+        """
+        pool, launched, closed = make_pool()
+
+        pool.release(pool.acquire(), broken=True)
+        assert closed == [launched[0]]
+
+        driver = pool.acquire()
+        pool.release(driver)
+        driver.alive = False
+        assert pool.acquire() is launched[2]
+        assert closed == [launched[0], launched[1]]
+        assert pool.stats.discarded == 2 and pool.stats.hits == 0
@@ -0,0 +1,76 @@
+import pytest
+import allure
+from api.api_client import APIClient
+from api.crawler import END, ERROR, ITEMS, NO_NEW_ITEMS, SearchCrawler, SeenProducts
+from config.test_data import test_data
+from utils.stub_server import PER_PAGE, LabirintStubServer, total_results
+
+SEARCH_ENDPOINT = test_data.API_TEST_DATA["search_endpoints"]["search"]
+QUERY = "война и мир"
+
+
+@pytest.mark.api
+@allure.feature("API Тесты")
+@allure.story("Обход результатов поиска")
+class TestSearchCrawler:
+    """Тесты обхода страниц /search/ по HTTP."""
+
+    @allure.title("Обход всех страниц с упреждающей загрузкой")
+    @allure.severity(allure.severity_level.CRITICAL)
+    def test_crawl_all_pages(self, labirint_stub: LabirintStubServer) -> None:
+        """
+        Тест, что обход возвращает все товары по одному разу, а страницы загружаются параллельно в пределах окна.
+
+        Args:
+            labirint_stub (LabirintStubServer): Фикстура локального сервера
+        """
+        labirint_stub.inject(SEARCH_ENDPOINT, latency=0.2)
+        crawler = SearchCrawler(APIClient(cassette=None), QUERY, prefetch=3)
+
+        products = list(crawler)
+
+        pages = -(-total_results(QUERY) // PER_PAGE)
+        assert len(products) == total_results(QUERY)
+        assert len({p.id for p in products}) == len(products)
+        assert crawler.stats.pages == pages + 1 and crawler.stats.stop_reason == END
+        assert 1 < labirint_stub.peak_inflight <= 3, f"Одновременно на сервере: {labirint_stub.peak_inflight}"
+        assert crawler.stats.max_inflight <= 3
+
+    @allure.title("Дедупликация и условия остановки")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_dedup_and_stop_conditions(self, labirint_stub: LabirintStubServer, monkeypatch) -> None:
+        """
+        Тест, что повторные товары отбрасываются, а обход останавливается по лимиту товаров и на странице без новых товаров.
+
+        Args:
+            labirint_stub (LabirintStubServer): Фикстура локального сервера
+        """
+        client = APIClient(cassette=None)
+
+        with allure.step("Лимит товаров"):
+            crawler = SearchCrawler(client, QUERY, prefetch=2, max_items=PER_PAGE + 5)
+            assert len(list(crawler)) == PER_PAGE + 5
+            assert crawler.stats.stop_reason == ITEMS
+
+        with allure.step("Страницы после второй повторяют вторую"):
+            search_books = client.search_books
+            monkeypatch.setattr(client, "search_books", lambda query, page=None, **kwargs: search_books(query, page=min(page or 1, 2), **kwargs))
+            crawler = SearchCrawler(client, QUERY, prefetch=2)
+            assert len(list(crawler)) == 2 * PER_PAGE
+            assert crawler.stats.duplicates == PER_PAGE
+            assert crawler.stats.stop_reason == NO_NEW_ITEMS
+
+        with allure.step("Ошибка сервера останавливает обход"):
+            labirint_stub.inject(SEARCH_ENDPOINT, status=404)
+            crawler = SearchCrawler(APIClient(cassette=None), QUERY, prefetch=2)
+            assert list(crawler) == []
+            assert crawler.stats.stop_reason == ERROR
+
+    @allure.title("Окно просмотренных товаров")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_seen_products_window(self) -> None:
+        """
+        Тест, что SeenProducts помнит только последние size товаров.
+        """
+        seen = SeenProducts(size=2)
+        assert [seen.add(key) for key in (1, 2, 1, 3, 1, 2)] == [True, True, False, True, False, True]
@@ -0,0 +1,124 @@
+import pytest
+import allure
+from selenium.common.exceptions import InvalidSelectorException, JavascriptException, TimeoutException
+from utils import dom_waits
+from utils.dom_waits import CLICKABLE, PRESENT, WAIT_SCRIPT, DomWaitEngine
+
+LOCATOR = ("xpath", "//button[@id='buy']")
+
+
+class Timeouts:
+    def __init__(self, script: float) -> None:
+        self.script = script
+
+
+class WaitDriver:
+    """WebDriver, отвечающий на WAIT_SCRIPT заранее заданными результатами."""
+
+    def __init__(self, responses, script_timeout: float = 30.0) -> None:
+        self.responses = list(responses)
+        self.script_timeout = script_timeout
+        self.script_timeouts = []
+        self.scripts = []
+        self.found = []
+
+    @property
+    def timeouts(self) -> Timeouts:
+        return Timeouts(self.script_timeout)
+
+    def set_script_timeout(self, seconds: float) -> None:
+        self.script_timeouts.append(seconds)
+        self.script_timeout = seconds
+
+    def execute_async_script(self, script, *args):
+        assert script == WAIT_SCRIPT
+        self.scripts.append(args)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def find_element(self, by, value):
+        self.found.append((by, value))
+        return "element"
+
+
+@allure.feature("UI Тесты")
+@allure.story("Ожидания")
+class TestDomWaits:
+    """Тесты ожиданий через MutationObserver без браузера."""
+
+    @allure.title("Ожидание без изменения таймаута скриптов драйвера")
+    @allure.severity(allure.severity_level.CRITICAL)
+    def test_wait_keeps_driver_script_timeout(self, monkeypatch) -> None:
+        """
+        Тест, что ожидание короче таймаута скриптов стоит одного вызова и не меняет таймаут драйвера.
+        """
+        monkeypatch.setattr(dom_waits, "_totals", dom_waits.Counter())
+        driver = WaitDriver([{"status": "ok", "elements": ["button"]}, {"status": "ok", "elements": ["button"]}])
+        waits = DomWaitEngine(driver)
+
+        assert waits.until(LOCATOR, CLICKABLE, timeout=5) == "button"
+        assert waits.until(LOCATOR, PRESENT, timeout=5) == "button"
+
+        assert driver.script_timeouts == []
+        by, value, condition, timeout_ms, recheck_ms = driver.scripts[0]
+        assert (condition, recheck_ms) == (CLICKABLE, 100) and 4000 < timeout_ms <= 5000
+        assert [m.calls for m in waits.history] == [2, 1]
+        assert dom_waits.wait_totals()["waits"] == 2 and dom_waits.wait_totals()["calls"] == 3
+
+    @allure.title("Длинное ожидание делится на вызовы в пределах таймаута скриптов")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_long_wait_is_split(self, monkeypatch) -> None:
+        """
+        Тест, что ожидание дольше таймаута скриптов выполняется частями, а короткий таймаут драйвера восстанавливается.
+        """
+        monkeypatch.setattr(dom_waits, "_totals", dom_waits.Counter())
+
+        with allure.step("Таймаут скриптов 3 сек, ожидание 5 сек"):
+            driver = WaitDriver([{"status": "timeout"}, {"status": "ok", "elements": ["a"]}], script_timeout=3.0)
+            assert DomWaitEngine(driver).until(LOCATOR, PRESENT, timeout=5) == "a"
+            assert driver.scripts[0][3] == 2000
+            assert driver.script_timeouts == []
+
+        with allure.step("Таймаут скриптов меньше секунды поднимается на время ожидания"):
+            driver = WaitDriver([{"status": "timeout"}], script_timeout=0.5)
+            with pytest.raises(TimeoutException):
+                DomWaitEngine(driver).until(LOCATOR, PRESENT, timeout=0.05)
+            assert driver.script_timeouts == [1.05, 0.5]
+
+    @allure.title("Переход на опрос, если скрипты недоступны")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_fallback_to_polling(self, monkeypatch) -> None:
+        """
+        Тест, что ошибка скрипта переключает движок на WebDriverWait.
+        """
+        monkeypatch.setattr(dom_waits, "_totals", dom_waits.Counter())
+        driver = WaitDriver([JavascriptException("javascript error: CSP blocked eval")])
+        waits = DomWaitEngine(driver)
+
+        assert waits.until(LOCATOR, PRESENT, timeout=1) == "element"
+        assert not waits.scripts_available and waits.history[0].fallback
+        assert driver.found == [LOCATOR]
+        assert "1 polling fallbacks" in dom_waits.format_wait_totals(dom_waits.wait_totals())
+
+    @allure.title("Ошибка в локаторе не переключает движок на опрос")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_invalid_locator_is_raised(self, monkeypatch) -> None:
+        """
+        Тест, что невалидный локатор поднимает InvalidSelectorException, а сбой скрипта ведет к опросу.
+        """
+        monkeypatch.setattr(dom_waits, "_totals", dom_waits.Counter())
+
+        with allure.step("Невалидный локатор"):
+            driver = WaitDriver([{"status": "invalid", "message": "'//button[' is not a valid XPath expression"}])
+            waits = DomWaitEngine(driver)
+            with pytest.raises(InvalidSelectorException, match="not a valid XPath"):
+                waits.until(("xpath", "//button["), PRESENT, timeout=1)
+            assert waits.scripts_available and driver.found == []
+
+        with allure.step("Сбой самого скрипта"):
+            driver = WaitDriver([{"status": "error", "message": "CSS is not defined"}])
+            waits = DomWaitEngine(driver)
+            assert waits.until(LOCATOR, PRESENT, timeout=1) == "element"
+            assert not waits.scripts_available and waits.history[0].fallback
@@ -0,0 +1,105 @@
+import pytest
+import allure
+from selenium.common.exceptions import NoSuchElementException
+from utils import artifacts
+from utils.artifacts import ArtifactStore
+from utils.failure_capture import FailureCapturePlugin, FailureRecorder
+
+pytest_plugins = ("pytester",)
+
+
+class FakeDriver:
+    """WebDriver, отвечающий на команды без браузера и запоминающий снятые артефакты."""
+
+    def __init__(self) -> None:
+        self.captured = []
+
+    def execute(self, driver_command, params=None):
+        if driver_command == "findElement" and params.get("value") == "#missing":
+            raise NoSuchElementException("no such element")
+        values = {"getCurrentUrl": "https://www.labirint.ru/", "getTitle": "Лабиринт"}
+        return {"value": values.get(driver_command)}
+
+    @property
+    def current_url(self) -> str:
+        return self.execute("getCurrentUrl")["value"]
+
+    @property
+    def title(self) -> str:
+        return self.execute("getTitle")["value"]
+
+    @property
+    def page_source(self) -> str:
+        self.captured.append("dom")
+        return "<html><body>Лабиринт</body></html>"
+
+    def get_screenshot_as_png(self) -> bytes:
+        self.captured.append("screenshot")
+        return b"\x89PNG\r\n\x1a\n"
+
+    def get_log(self, log_type):
+        self.captured.append(log_type)
+        return [{"level": "SEVERE", "message": "Uncaught TypeError"}]
+
+
+class DriverPlugin:
+    def __init__(self) -> None:
+        self.drivers = {}
+
+    @pytest.fixture
+    def driver(self, request):
+        self.drivers[request.node.name] = FakeDriver()
+        return self.drivers[request.node.name]
+
+
+@allure.feature("UI Тесты")
+@allure.story("Артефакты")
+class TestFailureCapture:
+    """Тесты снятия артефактов только для упавших тестов."""
+
+    @allure.title("Кольцевой буфер команд WebDriver")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_command_ring_buffer(self) -> None:
+        """
+        Тест, что буфер хранит последние команды, URL и ошибки, а detach() возвращает исходный execute.
+        """
+        driver = FakeDriver()
+        recorder = FailureRecorder(driver, size=3)
+
+        driver.execute("get", {"url": "https://www.labirint.ru/search/?q=1984"})
+        for _ in range(3):
+            driver.execute("findElement", {"using": "css selector", "value": ".product"})
+        with pytest.raises(NoSuchElementException):
+            driver.execute("findElement", {"using": "css selector", "value": "#missing"})
+
+        assert recorder.url == "https://www.labirint.ru/search/?q=1984"
+        assert [r.command for r in recorder.commands] == ["findElement"] * 3
+        assert recorder.commands[-1].error == "NoSuchElementException"
+        assert "value=#missing" in recorder.state()
+
+        recorder.detach()
+        assert "execute" not in driver.__dict__
+
+    @allure.title("Артефакты снимаются только при падении")
+    @allure.severity(allure.severity_level.CRITICAL)
+    def test_capture_only_on_failure(self, pytester, tmp_path, monkeypatch) -> None:
+        """
+        Тест, что прошедший тест ничего не снимает, а упавший получает скриншот, DOM и консоль.
+        """
+        monkeypatch.setattr(artifacts, "_default_store", ArtifactStore(str(tmp_path / "artifacts")))
+        pytester.makepyfile("""
+            def test_green(driver):
+                driver.execute("get", {"url": "https://www.labirint.ru/"})
+
+            def test_red(driver):
+                driver.execute("get", {"url": "https://www.labirint.ru/"})
+                assert False
+        """)
+        drivers = DriverPlugin()
+
+        result = pytester.runpytest_inprocess(plugins=[FailureCapturePlugin(size=5), drivers])
+
+        result.assert_outcomes(passed=1, failed=1)
+        assert drivers.drivers["test_green"].captured == []
+        assert drivers.drivers["test_red"].captured == ["screenshot", "dom", "browser"]
+        assert all("execute" not in d.__dict__ for d in drivers.drivers.values())
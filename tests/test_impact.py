@@ -0,0 +1,156 @@
+import subprocess
+import pytest
+import allure
+from utils.impact import ImpactMap, ImpactPlugin, index_source
+
+pytest_plugins = ("pytester",)
+
+LOCATORS_MODULE = """
+LOCATORS = {
+    "title": "//h1",
+    "price": "//span[@class='price']",
+}
+"""
+
+PAGE_MODULE = """
+from data import LOCATORS
+
+
+class Page:
+    TITLE = LOCATORS["title"]
+    PRICE = LOCATORS["price"]
+
+    def title(self):
+        return self.TITLE
+
+    def price(self):
+        return self.PRICE
+"""
+
+TESTS_MODULE = """
+from page import Page
+
+
+def test_title():
+    assert Page().title()
+
+
+def test_price():
+    assert Page().price()
+
+
+def test_plain():
+    assert True
+"""
+
+
+FIXTURES_CONFTEST = """
+import pytest
+from server import Server
+
+
+@pytest.fixture(scope="session")
+def server():
+    return Server().start()
+"""
+
+SERVER_MODULE = """
+class Server:
+    def start(self):
+        return self
+"""
+
+SERVER_TESTS_MODULE = """
+def test_first(server):
+    assert server
+
+
+def test_second(server):
+    assert server
+
+
+def test_without_server():
+    assert True
+"""
+
+
+def git(path, *args) -> None:
+    subprocess.run(["git", "-c", "user.name=qa", "-c", "user.email=qa@example.com", *args], cwd=path, check=True, capture_output=True)
+
+
+@allure.feature("Инфраструктура")
+@allure.story("Выбор тестов по изменениям")
+class TestImpactSelection:
+    """Тесты карты зависимостей тестов и выбора по git diff."""
+
+    @allure.title("Участки файла для сопоставления изменений")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_index_regions(self) -> None:
+        """
+        Тест, что строки сопоставляются с методами, атрибутами класса и ключами LOCATORS.
+        """
+        page = index_source(PAGE_MODULE, "page")
+        data = index_source(LOCATORS_MODULE, "data")
+
+        assert (page.region_at(6).kind, page.region_at(6).name) == ("definition", "TITLE")
+        assert (page.region_at(10).kind, page.region_at(10).name) == ("function", "Page.title")
+        assert page.region_at(8) is None
+        assert page.locator_keys["PRICE"] == {"price"}
+        assert (data.region_at(4).kind, data.region_at(4).name) == ("locator", "price")
+
+    @allure.title("Запуск только затронутых тестов")
+    @allure.severity(allure.severity_level.CRITICAL)
+    def test_select_by_diff(self, pytester, tmp_path) -> None:
+        """
+        Тест, что после записи карты изменение ключа LOCATORS или метода страницы запускает только зависящие тесты.
+        """
+        map_path = str(tmp_path / "impact.json")
+        for name, source in (("data", LOCATORS_MODULE), ("page", PAGE_MODULE), ("test_demo", TESTS_MODULE)):
+            (pytester.path / f"{name}.py").write_text(source)
+        git(pytester.path, "init", "-q")
+        git(pytester.path, "add", ".")
+        git(pytester.path, "commit", "-q", "-m", "init")
+
+        def run(base=None):
+            plugin = ImpactPlugin(map_path, root=str(pytester.path), record=base is None, base=base)
+            return pytester.runpytest_inprocess("-v", "-p", "no:cacheprovider", plugins=[plugin])
+
+        with allure.step("Трассирующий прогон записывает карту"):
+            run().assert_outcomes(passed=3)
+            impact_map = ImpactMap(map_path)
+            assert "page:Page.price" in impact_map.tests["test_demo.py::test_price"]
+            assert "page:Page.price" not in impact_map.tests["test_demo.py::test_title"]
+
+        with allure.step("Изменение локатора"):
+            (pytester.path / "data.py").write_text(LOCATORS_MODULE.replace("@class='price'", "@class='cost'"))
+            run("HEAD").assert_outcomes(passed=1, deselected=2)
+            git(pytester.path, "commit", "-q", "-am", "locator")
+
+        with allure.step("Изменение метода страницы и новый тест"):
+            (pytester.path / "page.py").write_text(PAGE_MODULE.replace("return self.TITLE", "return self.TITLE.strip()"))
+            (pytester.path / "test_new.py").write_text("def test_new():\n    assert True\n")
+            result = run("HEAD")
+            result.assert_outcomes(passed=2, deselected=2)
+            result.stdout.fnmatch_lines(["*test_demo.py::test_title PASSED*", "*test_new.py::test_new PASSED*"])
+
+        with allure.step("Изменение вне функций запускает все тесты"):
+            (pytester.path / "page.py").write_text("import os\n" + PAGE_MODULE)
+            run("HEAD").assert_outcomes(passed=4)
+
+    @allure.title("Сессионные фикстуры в карте каждого использующего теста")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_session_fixture_symbols(self, pytester, tmp_path) -> None:
+        """
+        Тест, что вызовы из setup сессионной фикстуры записываются всем тестам, которые ее используют.
+        """
+        map_path = str(tmp_path / "impact.json")
+        for name, source in (("conftest", FIXTURES_CONFTEST), ("server", SERVER_MODULE), ("test_server", SERVER_TESTS_MODULE)):
+            (pytester.path / f"{name}.py").write_text(source)
+
+        plugin = ImpactPlugin(map_path, root=str(pytester.path), record=True)
+        pytester.runpytest_inprocess("-p", "no:cacheprovider", plugins=[plugin]).assert_outcomes(passed=3)
+
+        impact_map = ImpactMap(map_path)
+        for test in ("test_first", "test_second"):
+            assert {"server:Server.start", "conftest:server"} <= impact_map.tests[f"test_server.py::{test}"]
+        assert "server:Server.start" not in impact_map.tests["test_server.py::test_without_server"]
@@ -0,0 +1,102 @@
+import pytest
+import allure
+import random
+from api.api_client import APIClient
+from api.load_test import LatencyHistogram, LoadGenerator, run_from_settings
+from config.settings import settings
+from config.test_data import test_data
+from utils.stub_server import LabirintStubServer
+
+SEARCH_ENDPOINT = test_data.API_TEST_DATA["search_endpoints"]["search"]
+
+
+@allure.feature("Нагрузочное тестирование")
+@allure.story("Гистограмма задержек")
+class TestLatencyHistogram:
+    """Тесты логарифмической гистограммы задержек."""
+
+    @allure.title("Точность перцентилей гистограммы")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_percentiles_within_precision(self) -> None:
+        """
+        Тест, что перцентили гистограммы отличаются от точных не больше чем на precision.
+        """
+        rng = random.Random(42)
+        samples = [rng.lognormvariate(-2, 1) for _ in range(20000)]
+        first, second = LatencyHistogram(), LatencyHistogram()
+        for i, value in enumerate(samples):
+            (first if i % 2 else second).record(value)
+        first.merge(second)
+
+        samples.sort()
+        for percent in (50, 95, 99):
+            exact = samples[int(percent / 100 * len(samples)) - 1]
+            assert first.percentile(percent) == pytest.approx(exact, rel=0.02)
+
+        assert first.count == len(samples)
+        assert first.percentile(100) == first.max == samples[-1]
+        assert len(first.counts) < 1000
+
+
+@pytest.mark.api
+@pytest.mark.load
+@allure.feature("Нагрузочное тестирование")
+@allure.story("Поиск под нагрузкой")
+class TestSearchLoad:
+    """Нагрузочные тесты поиска."""
+
+    @allure.title("Нагрузка на локальный сервер: перцентили и ошибки")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_load_against_stub(self, labirint_stub: LabirintStubServer) -> None:
+        """
+        Тест режимов нагрузки и проверки SLO против локального сервера.
+
+        Args:
+            labirint_stub (LabirintStubServer): Фикстура локального сервера
+        """
+        labirint_stub.inject(SEARCH_ENDPOINT, latency=0.05)
+        client = APIClient(cassette=None)
+        client.max_retries = 0
+        generator = LoadGenerator(["1984", "война и мир"], client=client)
+
+        with allure.step("Заданная частота запросов"):
+            result = generator.run_rate(rate=40, duration=1.0)
+            allure.attach(result.report(), name="Rate mode", attachment_type=allure.attachment_type.TEXT)
+
+            assert result.requests == 40
+            assert result.error_rate == 0
+            assert 0.05 <= result.p50 <= result.p95 <= result.p99 <= result.max
+            result.assert_slo(p99=1.0, max_error_rate=0.0, min_throughput=30)
+
+        with allure.step("Виртуальные пользователи при отказе сервера"):
+            labirint_stub.inject(SEARCH_ENDPOINT, status=503)
+            result = generator.run_users(users=3, duration=0.3)
+
+            assert result.requests >= 3
+            assert result.error_rate == 1
+            assert result.statuses[503] == result.requests
+            with pytest.raises(AssertionError, match="error rate"):
+                result.assert_slo(max_error_rate=settings.LOAD_TEST_MAX_ERROR_RATE)
+
+    @allure.title("SLO поиска под нагрузкой")
+    @allure.description("Прогон с параметрами LOAD_TEST_*; выключен, пока не задан LOAD_TEST_DURATION")
+    @allure.severity(allure.severity_level.CRITICAL)
+    def test_search_slo(self, api_client: APIClient) -> None:
+        """
+        Тест перцентилей задержки и доли ошибок поиска под нагрузкой.
+
+        Args:
+            api_client (APIClient): Фикстура API клиента
+        """
+        if settings.LOAD_TEST_DURATION <= 0:
+            pytest.skip("LOAD_TEST_DURATION не задан")
+
+        api_client.max_retries = 0
+        result = run_from_settings(LoadGenerator(client=api_client))
+        allure.attach(result.report(), name="Load test", attachment_type=allure.attachment_type.TEXT)
+
+        result.assert_slo(
+            p95=settings.LOAD_TEST_SLO_P95,
+            p99=settings.LOAD_TEST_SLO_P99,
+            max_error_rate=settings.LOAD_TEST_MAX_ERROR_RATE
+        )
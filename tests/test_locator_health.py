@@ -0,0 +1,127 @@
+import pytest
+import allure
+from selenium.common.exceptions import WebDriverException
+from utils.locator_health import (
+    AMBIGUOUS, BROKEN, MISSING, SLOW, HEALTH_SCRIPT, check_locators, css_candidates, default_locators, select_locators
+)
+from utils.stub_server import render_search_page
+
+
+class ScriptDriver:
+    """WebDriver, возвращающий заранее заданный результат execute_script."""
+
+    current_url = "https://www.labirint.ru/books/123456/"
+
+    def __init__(self, results) -> None:
+        self.results = results
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        self.calls.append((script, args))
+        return self.results
+
+
+@allure.feature("UI Тесты")
+@allure.story("Локаторы")
+class TestLocatorHealth:
+    """Тесты индекса здоровья локаторов."""
+
+    @allure.title("CSS эквиваленты XPath")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_css_candidates(self) -> None:
+        """
+        Тест, что простые XPath переводятся в идиоматичный и строгий CSS, а оси и text() - нет.
+        """
+        assert css_candidates("//input[@id='search-field']") == ["input#search-field", 'input[id="search-field"]']
+        assert css_candidates("//div[contains(@class, 'product') and contains(@class, 'need-watch')]") == [
+            "div.product.need-watch", 'div[class*="product"][class*="need-watch"]'
+        ]
+        assert css_candidates(".//div[@class='product-author']//a") == ["div.product-author a", 'div[class="product-author"] a']
+        assert css_candidates("//div[contains(text(), 'ISBN')]/following-sibling::div") == []
+
+    @allure.title("Индекс здоровья за один вызов скрипта")
+    @allure.severity(allure.severity_level.CRITICAL)
+    def test_health_index(self) -> None:
+        """
+        Тест, что все локаторы проверяются одним execute_script, а сломанные, пропавшие, неоднозначные и медленные помечаются.
+        """
+        locators = {
+            "logo": "//a[@class='logo']",
+            "book_list": "//div[contains(@class, 'product')]",
+            "book_price": "//span[@class='price']",
+            "book_isbn": "//div[contains(text(), 'ISBN')]/following-sibling::div",
+            "cart_total": "//div[@class='total']",
+            "bad": "//div[",
+        }
+        driver = ScriptDriver([
+            {"name": "logo", "count": 1, "time": 0.05, "error": None, "css": "a.logo", "css_time": 0.01},
+            {"name": "book_list", "count": 30, "time": 0.4, "error": None, "css": None, "css_time": None},
+            {"name": "book_price", "count": 3, "time": 0.1, "error": None, "css": "span.price", "css_time": 0.02},
+            {"name": "book_isbn", "count": 1, "time": 6.5, "error": None, "css": None, "css_time": None},
+            {"name": "cart_total", "count": 0, "time": 0.05, "error": None, "css": None, "css_time": None},
+            {"name": "bad", "count": 0, "time": 0, "error": "not a valid XPath expression", "css": None, "css_time": None},
+        ])
+
+        report = check_locators(driver, locators, repeat=5, slow_ms=2)
+
+        assert len(driver.calls) == 1
+        script, (batch, repeat) = driver.calls[0]
+        assert script == HEALTH_SCRIPT and repeat == 5
+        assert batch[0] == ["logo", "xpath", "//a[@class='logo']", ["a.logo", 'a[class="logo"]']]
+
+        issues = {locator.name: locator.issues for locator in report.locators}
+        assert issues == {
+            "logo": [], "book_list": [], "book_price": [AMBIGUOUS], "book_isbn": [SLOW],
+            "cart_total": [MISSING], "bad": [BROKEN],
+        }
+        assert round(report.health_index) == 33
+        assert report.locators[0].speedup == 5.0
+        assert report.summary().startswith("health index 33/100")
+
+    @allure.title("Выбор локаторов страницы")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_select_locators(self) -> None:
+        """
+        Тест, что шаблоны оставляют только локаторы проверяемой страницы, а опечатка в шаблоне - ошибка.
+        """
+        locators = default_locators()
+
+        selected = select_locators(locators, ["search_*", "next_page"])
+
+        assert list(selected) == [
+            "search_input", "search_button", "search_results", "search_result_title",
+            "search_result_author", "search_result_price", "search_result_old_price", "next_page",
+        ]
+        assert "book_info.isbn" in select_locators(locators, ["book_info.*"])
+        assert select_locators(locators, None) == locators
+        with pytest.raises(ValueError, match="serch_"):
+            select_locators(locators, ["serch_*"])
+
+    @pytest.mark.ui
+    @allure.title("Скрипт проверки на сохраненной странице")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_health_script_on_snapshot(self, tmp_path) -> None:
+        """
+        Тест HEALTH_SCRIPT в браузере на снимке страницы поиска: локаторы найдены, CSS эквиваленты совпадают.
+        """
+        from conftest import create_driver
+
+        snapshot = tmp_path / "search.html"
+        snapshot.write_text(render_search_page("1984"), encoding="utf-8")
+        try:
+            driver = create_driver()
+        except WebDriverException as e:
+            pytest.skip(f"Chrome is not available: {e.msg}")
+
+        try:
+            driver.get(snapshot.as_uri())
+            locators = select_locators(default_locators(), ["logo", "search_*", "pagination", "next_page"])
+            report = check_locators(driver, locators, repeat=2, slow_ms=1000)
+        finally:
+            driver.quit()
+
+        health = {locator.name: locator for locator in report.locators}
+        assert report.health_index == 100, report.format_table()
+        assert health["search_results"].count == 24
+        assert health["logo"].css == "a.b-header-b-logo-e-logo"
+        assert health["search_input"].css == "input#search-field"
@@ -0,0 +1,40 @@
+import pytest
+import allure
+from utils.perf_baseline import API, TEST, BaselineStore, find_regressions
+
+TEST_ID = "tests/test_api.py::TestLabirintAPI::test_search_latin"
+
+
+@allure.feature("Производительность")
+@allure.story("Базовая линия")
+class TestPerfBaseline:
+    """Тесты хранилища истории метрик и поиска регрессий."""
+
+    @allure.title("Регрессия относительно медианы прошлых запусков")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_regression_against_rolling_median(self, tmp_path) -> None:
+        """
+        Тест, что регрессия определяется по медиане последних запусков с учетом порогов.
+        """
+        path = str(tmp_path / "perf.sqlite")
+        for run, duration in enumerate([1.0, 1.1, 0.9, 5.0]):
+            store = BaselineStore(path, run_uid=f"run-{run}")
+            store.add_samples(TEST_ID, [(TEST, "call", duration), (API, "GET /search/", 0.2), (API, "GET /search/", 0.4)])
+            store.close()
+
+        store = BaselineStore(path, run_uid="current")
+
+        with allure.step("Базовая линия - медиана последних window запусков"):
+            assert store.baseline(TEST_ID, TEST, "call", window=3) == (1.1, 3)
+            assert store.baseline(TEST_ID, API, "GET /search/", window=10) == (pytest.approx(0.3), 4)
+
+        with allure.step("Поиск регрессий"):
+            samples = [(TEST, "call", 1.5), (API, "GET /search/", 0.32)]
+            regressions = find_regressions(store, TEST_ID, samples, window=10, min_runs=3, threshold=0.25, min_delta=0.05)
+
+            assert [(r.kind, r.name) for r in regressions] == [(TEST, "call")]
+            assert regressions[0].baseline == pytest.approx(1.05)
+            assert find_regressions(store, TEST_ID, samples, window=10, min_runs=5, threshold=0.25, min_delta=0.05) == []
+            assert find_regressions(store, TEST_ID, samples, window=10, min_runs=3, threshold=0.25, min_delta=1.0) == []
+
+        store.close()
@@ -0,0 +1,98 @@
+import os
+import time
+import pytest
+import allure
+from utils.profile_cache import ProfileCache, evict_to_size, directory_size
+
+CACHE_DATA = os.path.join("Default", "Cache", "Cache_Data")
+
+
+class FakeBrowser:
+    """Браузер, который при открытии страниц пишет в профиль файлы кэша и состояния сессии."""
+
+    launches = 0
+
+    def __init__(self, profile_dir: str) -> None:
+        FakeBrowser.launches += 1
+        self.profile_dir = profile_dir
+        self.quit_calls = 0
+
+    def get(self, url: str) -> None:
+        cache = os.path.join(self.profile_dir, CACHE_DATA)
+        os.makedirs(cache, exist_ok=True)
+        with open(os.path.join(cache, "index"), "wb") as f:
+            f.write(b"i" * 16)
+        with open(os.path.join(cache, f"{abs(hash(url)):x}_0"), "wb") as f:
+            f.write(b"x" * 4096)
+        with open(os.path.join(self.profile_dir, "Default", "Cookies"), "wb") as f:
+            f.write(b"session")
+        with open(os.path.join(self.profile_dir, "Local State"), "w") as f:
+            f.write("{}")
+
+    def quit(self) -> None:
+        self.quit_calls += 1
+
+
+@allure.feature("UI Тесты")
+@allure.story("Кэш профиля браузера")
+class TestProfileCache:
+    """Тесты шаблона профиля с прогретым HTTP кэшем."""
+
+    @allure.title("Шаблон прогревается один раз, копии изолированы")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_template_and_clones(self, tmp_path) -> None:
+        """
+        Тест, что в шаблоне остается только кэш, шаблон переиспользуется, а копия удаляется после quit().
+        """
+        urls = ["https://example.test/", "https://example.test/search/"]
+        FakeBrowser.launches = 0
+
+        with allure.step("Сборка шаблона"):
+            cache = ProfileCache(str(tmp_path), urls, max_bytes=1024 * 1024, max_age=3600)
+            cache.ensure_template(FakeBrowser)
+
+            assert FakeBrowser.launches == 1
+            assert len(os.listdir(os.path.join(cache.template_dir, CACHE_DATA))) == 3
+            assert not os.path.exists(os.path.join(cache.template_dir, "Default", "Cookies"))
+            assert not os.path.exists(os.path.join(cache.template_dir, "Local State"))
+
+        with allure.step("Свежий шаблон не пересобирается в другом процессе"):
+            ProfileCache(str(tmp_path), urls, max_bytes=1024 * 1024, max_age=3600).ensure_template(FakeBrowser)
+            assert FakeBrowser.launches == 1
+
+        with allure.step("Изменения копии не затрагивают шаблон"):
+            browser = cache.launch(FakeBrowser)
+            profile_dir = browser.profile_dir
+            browser.get("https://example.test/book/1/")
+
+            assert len(os.listdir(os.path.join(profile_dir, CACHE_DATA))) == 4
+            assert len(os.listdir(os.path.join(cache.template_dir, CACHE_DATA))) == 3
+
+            cache.quit(browser)
+            assert browser.quit_calls == 1
+            assert not os.path.exists(profile_dir)
+            assert cache.stats.clones == 1
+            assert cache.stats.reflinked_files + cache.stats.copied_files == 3
+
+        with allure.step("Смена страниц прогрева пересобирает шаблон"):
+            ProfileCache(str(tmp_path), urls[:1], max_bytes=1024 * 1024, max_age=3600).ensure_template(FakeBrowser)
+            assert FakeBrowser.launches == 3
+
+    @allure.title("Вытеснение старых записей кэша по размеру")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_evict_to_size(self, tmp_path) -> None:
+        """
+        Тест, что вытесняются самые старые записи, а индекс кэша сохраняется.
+        """
+        (tmp_path / "index").write_bytes(b"i" * 100)
+        now = time.time()
+        for age in range(5):
+            entry = tmp_path / f"entry_{age}"
+            entry.write_bytes(b"x" * 1000)
+            os.utime(entry, (now - age * 60, now - age * 60))
+
+        removed = evict_to_size(str(tmp_path), 3200)
+
+        assert removed == 2
+        assert sorted(os.listdir(tmp_path)) == ["entry_0", "entry_1", "entry_2", "index"]
+        assert directory_size(str(tmp_path)) == 3100
@@ -0,0 +1,75 @@
+import json
+import pytest
+import allure
+from config.settings import settings
+from utils import request_blocking
+from utils.request_blocking import RequestBlocker, profile_patterns
+
+
+class FakeDriver:
+    """WebDriver с CDP командами и performance-логом из заранее заданных событий."""
+
+    def __init__(self) -> None:
+        self.commands = []
+        self.events = []
+
+    def execute_cdp_cmd(self, command, params):
+        self.commands.append((command, params))
+        return {}
+
+    def get_log(self, log_type):
+        entries = [{"message": json.dumps({"message": {"method": m, "params": p}})} for m, p in self.events]
+        self.events = []
+        return entries
+
+    def emit(self, request_id, url, kind, size=None, blocked=False):
+        self.events.append(("Network.requestWillBeSent", {"requestId": request_id, "type": kind, "request": {"url": url}}))
+        if blocked:
+            self.events.append(("Network.loadingFailed", {"requestId": request_id, "blockedReason": "inspector"}))
+        else:
+            self.events.append(("Network.loadingFinished", {"requestId": request_id, "encodedDataLength": size}))
+
+
+@allure.feature("UI Тесты")
+@allure.story("Блокировка запросов")
+class TestRequestBlocking:
+    """Тесты профилей блокировки и отчета о сэкономленных запросах."""
+
+    @allure.title("Отчет о заблокированных запросах")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_blocking_report(self, tmp_path, monkeypatch) -> None:
+        """
+        Тест, что блокировщик включает профиль через CDP и оценивает экономию по размерам без блокировки.
+        """
+        monkeypatch.setattr(settings, "BLOCKING_SIZE_CACHE", str(tmp_path / "sizes.json"))
+        monkeypatch.setattr(request_blocking, "_size_cache", {})
+        monkeypatch.setattr(request_blocking, "_size_cache_loaded", False)
+        tracker = "https://mc.yandex.ru/metrika/tag.js"
+
+        with allure.step("Загрузка без блокировки запоминает размеры"):
+            driver = FakeDriver()
+            blocker = RequestBlocker(driver, "none")
+            driver.emit("1", "https://www.labirint.ru/", "Document", 50000)
+            driver.emit("2", tracker + "?v=1", "Script", 30000)
+            report = blocker.finish()
+
+            assert ("Network.setBlockedURLs", {"urls": []}) in driver.commands
+            assert (report.loaded_requests, report.blocked_requests) == (2, 0)
+
+        with allure.step("Профиль third-party блокирует трекеры"):
+            driver = FakeDriver()
+            blocker = RequestBlocker(driver, "third-party")
+            driver.emit("1", "https://www.labirint.ru/", "Document", 50000)
+            driver.emit("2", tracker + "?v=2", "Script", blocked=True)
+            driver.emit("3", "https://top-fwz1.mail.ru/js/code.js", "Script", blocked=True)
+            report = blocker.finish()
+
+            assert driver.commands[1] == ("Network.setBlockedURLs", {"urls": profile_patterns("third-party")})
+            assert report.blocked_requests == 2
+            assert report.saved_bytes == 30000
+            assert report.unknown_size == 1
+            assert report.blocked_hosts["mc.yandex.ru"] == 1
+            assert driver.commands[-1] == ("Network.setBlockedURLs", {"urls": []})
+
+        with pytest.raises(ValueError):
+            profile_patterns("everything")
@@ -0,0 +1,117 @@
+import pytest
+import allure
+import requests
+from api.response_analyzer import analyze_response, MultiPatternMatcher
+from api.search_parser import compile_xpath, iter_search_results, parse_search_results
+from utils.stub_server import render_search_page, make_products
+
+
+def make_response(body: str, encoding: str = "utf-8") -> requests.Response:
+    """Ответ с уже загруженным телом."""
+    response = requests.Response()
+    response.status_code = 200
+    response.encoding = encoding
+    response._content = body.encode(encoding)
+    response._content_consumed = True
+    return response
+
+
+@pytest.mark.api
+@allure.feature("API Тесты")
+@allure.story("Разбор ответов")
+class TestResponseAnalyzer:
+    """Тесты однопроходного анализатора ответов."""
+
+    @allure.title("Поиск подстрок без учета регистра")
+    def test_patterns_are_case_insensitive(self) -> None:
+        """
+        Тест поиска маркеров и запроса в ответе без учета регистра.
+        """
+        analysis = analyze_response(
+            make_response(render_search_page("Война и мир")),
+            ["ВОЙНА И МИР", "product ", "отсутствует"]
+        )
+
+        assert analysis.is_html
+        assert analysis["война и мир"]
+        assert analysis["product "]
+        assert not analysis["отсутствует"]
+        assert analysis.complete
+
+    @allure.title("Совпадение на границе фрагментов")
+    def test_match_across_chunks(self) -> None:
+        """
+        Тест, что подстрока, разрезанная между фрагментами, находится.
+        """
+        matcher = MultiPatternMatcher(["книжный магазин", "магазин"])
+        for piece in ["Лабиринт — книж", "ный маг", "азин"]:
+            matcher.feed(piece)
+
+        assert matcher.done
+        assert all(matcher.found.values())
+
+    @allure.title("Символы, меняющие длину при смене регистра")
+    def test_case_folding_special_characters(self) -> None:
+        """
+        Тест, что совпадение с 'İ' и 'ſ' отмечает исходную подстроку и не зацикливает поиск.
+        """
+        matcher = MultiPatternMatcher(["Pythonista", "assert", "html", "<html"])
+        matcher.feed("PYTHONİSTA и aſſert в <HTML>")
+
+        assert matcher.done
+        assert set(matcher.found) == {"pythonista", "assert", "html", "<html"}
+        assert all(matcher.found.values())
+
+    @allure.title("Ограниченное превью ответа")
+    def test_preview_is_bounded(self) -> None:
+        """
+        Тест, что превью ограничено заданным размером.
+        """
+        body = render_search_page("1984")
+        analysis = analyze_response(make_response(body), ["1984"], preview_size=100, chunk_size=64)
+
+        assert analysis.preview == body[:100]
+        assert analysis.truncated
+        assert analysis.bytes_read == len(body.encode("utf-8"))
+
+
+@pytest.mark.api
+@allure.feature("API Тесты")
+@allure.story("Разбор ответов")
+class TestSearchResultsParser:
+    """Тесты разбора страницы результатов поиска."""
+
+    @allure.title("Разбор карточек товаров")
+    def test_parse_products(self) -> None:
+        """
+        Тест, что все поля карточек извлекаются по локаторам из LOCATORS.
+        """
+        products = parse_search_results(render_search_page("мастер и маргарита", page=2))
+        expected = make_products("мастер и маргарита", page=2)
+
+        assert [p.id for p in products] == [e["id"] for e in expected]
+        assert [p.title for p in products] == [e["title"] for e in expected]
+        assert [p.author for p in products] == [e["author"] for e in expected]
+        assert [p.price for p in products] == [e["price"] for e in expected]
+        assert [p.old_price for p in products] == [e["old_price"] for e in expected]
+        assert [p.url for p in products] == [e["url"] for e in expected]
+
+    @allure.title("Потоковый разбор ответа")
+    def test_iter_products_from_chunks(self) -> None:
+        """
+        Тест, что разбор по фрагментам дает тот же результат, что и разбор целиком.
+        """
+        body = render_search_page("1984")
+        streamed = list(iter_search_results(make_response(body), chunk_size=97))
+
+        assert streamed == parse_search_results(body)
+
+    @allure.title("Неподдерживаемые локаторы")
+    def test_unsupported_xpath(self) -> None:
+        """
+        Тест, что XPath с функциями над текстом отклоняется явно.
+        """
+        assert len(compile_xpath(".//span[@class='price-val']//span")) == 2
+
+        with pytest.raises(ValueError):
+            compile_xpath("//div[contains(text(), 'ISBN')]/following-sibling::div")
@@ -0,0 +1,102 @@
+import allure
+from config.settings import settings
+from pages.main_page import NAVIGATE_SCRIPT, RESULTS_SCRIPT, SAME_DOCUMENT_SCRIPT, STOP_SCRIPT, MainPage
+
+BASE = "https://www.labirint.ru/search/?q=1984"
+
+
+def card(product_id: int) -> dict:
+    return {
+        "id": str(product_id),
+        "values": {"title": [f"Книга {product_id}"], "author": ["Автор"], "price": ["1 234 ₽"]},
+        "url": f"/books/{product_id}/",
+    }
+
+
+class PagingDriver:
+    """WebDriver с тремя страницами результатов, отвечающий на скрипты MainPage."""
+
+    def __init__(self, stalled: bool = False) -> None:
+        self.stalled = stalled
+        self.page = 1
+        self.pending = None
+        self.token = None
+        self.log = []
+
+    def execute_script(self, script, *args):
+        if script == RESULTS_SCRIPT:
+            self.log.append(("extract", self.page))
+            url = BASE if self.page == 1 else f"{BASE}&page={self.page}"
+            next_url = f"{BASE}&page={self.page + 1}" if self.page < 3 else None
+            return {"url": url, "cards": [card(self.page * 10 + i) for i in range(3)], "next": next_url}
+        if script == NAVIGATE_SCRIPT:
+            self.token, url = args
+            self.pending = int(url.rsplit("=", 1)[1])
+            self.log.append(("navigate", self.pending))
+            return None
+        if script == SAME_DOCUMENT_SCRIPT:
+            if self.pending is not None and not self.stalled:
+                self.page, self.pending, self.token = self.pending, None, None
+            return self.token == args[0]
+        if script == STOP_SCRIPT:
+            self.pending, self.token = None, None
+            self.log.append(("stop", self.page))
+            return None
+        raise AssertionError(f"Unexpected script: {script[:40]}")
+
+
+@allure.feature("UI Тесты")
+@allure.story("Результаты поиска")
+class TestResultsPages:
+    """Тесты разбора страниц результатов поиска без браузера."""
+
+    @allure.title("Обход страниц с упреждающей навигацией")
+    @allure.severity(allure.severity_level.CRITICAL)
+    def test_iter_results_pages(self, monkeypatch) -> None:
+        """
+        Тест, что страница читается одним скриптом, а переход на следующую начинается до ее обработки.
+        """
+        monkeypatch.setattr(settings, "PAGE_PERFORMANCE_ENABLED", False)
+        monkeypatch.setattr(MainPage, "track_network", lambda self: None)
+        monkeypatch.setattr(MainPage, "wait_for_page_ready", lambda self, tracker=None: None)
+        driver = PagingDriver()
+        main_page = MainPage(driver)
+
+        pages = main_page.iter_results_pages()
+        first = next(pages)
+
+        assert driver.log == [("extract", 1), ("navigate", 2)]
+        assert first.books[0].id == 10 and first.books[0].price == 1234
+        assert main_page.get_books_count() == 3
+        assert [page.number for page in pages] == [2, 3]
+        assert driver.log[-2:] == [("navigate", 3), ("extract", 3)]
+
+        driver.page = 1
+        assert [page.number for page in main_page.iter_results_pages(max_pages=2)] == [1, 2]
+        assert main_page.get_books_list() == ["Книга 20", "Книга 21", "Книга 22"]
+
+    @allure.title("Прерванный обход дожидается начатого перехода")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_iter_results_pages_break(self, monkeypatch) -> None:
+        """
+        Тест, что после break браузер на следующей странице, а зависший переход останавливается.
+        """
+        monkeypatch.setattr(settings, "PAGE_PERFORMANCE_ENABLED", False)
+        monkeypatch.setattr(settings, "PAGE_LOAD_TIMEOUT", 0.05)
+        monkeypatch.setattr(settings, "NAVIGATION_POLL_INTERVAL", 0.01)
+        monkeypatch.setattr(MainPage, "track_network", lambda self: None)
+        monkeypatch.setattr(MainPage, "wait_for_page_ready", lambda self, tracker=None: None)
+
+        with allure.step("Переход завершается до выхода из генератора"):
+            driver = PagingDriver()
+            for page in MainPage(driver).iter_results_pages():
+                break
+            assert page.number == 1
+            assert driver.page == 2 and driver.pending is None
+
+        with allure.step("Зависший переход останавливается через window.stop()"):
+            driver = PagingDriver(stalled=True)
+            pages = MainPage(driver).iter_results_pages()
+            next(pages)
+            pages.close()
+            assert driver.log[-1] == ("stop", 1)
@@ -0,0 +1,190 @@
+import json
+import os
+import re
+import pytest
+import allure
+from utils.scheduling import FAIL_FAST, DurationHistory, SchedulingPlugin, lpt_partition, parse_shard
+
+pytest_plugins = ("pytester",)
+
+TESTS_MODULE = """
+import time
+import pytest
+
+
+@pytest.mark.parametrize("delay", [0.2, 0.15, 0.1, 0.05, 0.0])
+def test_delay(delay):
+    time.sleep(delay)
+
+
+def test_flaky(request):
+    assert not request.config.getoption("--fail-flaky", default=False)
+"""
+
+XDIST_CONFTEST = """
+from utils.scheduling import SchedulingPlugin
+
+
+def pytest_configure(config):
+    config.pluginmanager.register(SchedulingPlugin("durations.json"), "scheduling")
+"""
+
+
+@allure.feature("Инфраструктура")
+@allure.story("Шарды и порядок запуска")
+class TestScheduling:
+    """Тесты истории длительностей, LPT шардов и порядка fail-fast."""
+
+    @allure.title("LPT распределение по шардам")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_lpt_partition(self) -> None:
+        """
+        Тест, что LPT выравнивает нагрузку шардов и не зависит от порядка входа.
+        """
+        durations = [("a", 7.0), ("b", 5.0), ("c", 4.0), ("d", 3.0), ("e", 3.0), ("f", 2.0)]
+
+        partition = lpt_partition(durations, 2)
+
+        loads = [sum(dict(durations)[test] for test in shard) for shard in partition]
+        assert sorted(loads) == [12.0, 12.0]
+        assert lpt_partition(list(reversed(durations)), 2) == partition
+        assert parse_shard("2/3") == (2, 3)
+        with pytest.raises(pytest.UsageError):
+            parse_shard("4/3")
+
+    @allure.title("Порядок fail-fast по истории")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_fail_fast_order(self, tmp_path) -> None:
+        """
+        Тест, что первыми идут недавно упавшие, затем новые и нестабильные, затем быстрые тесты.
+        """
+        path = str(tmp_path / "durations.json")
+        history = DurationHistory(path)
+        history.record("slow", 10.0, False)
+        history.record("fast", 1.0, False)
+        history.record("broken", 20.0, True)
+        history.record("flaky", 30.0, True)
+        history.record("flaky", 30.0, False)
+        history.save()
+
+        history = DurationHistory(path)
+        order = sorted(["slow", "fast", "broken", "flaky", "new"], key=history.fail_fast_key)
+
+        assert order == ["broken", "new", "flaky", "fast", "slow"]
+        assert history.estimate("new") == 15.0
+
+    @allure.title("Запуск шарда по записанной истории")
+    @allure.severity(allure.severity_level.CRITICAL)
+    def test_shard_run(self, pytester, tmp_path) -> None:
+        """
+        Тест, что история пишется после прогона, а шарды делят тесты по записанным длительностям.
+        """
+        path = str(tmp_path / "durations.json")
+        pytester.makeconftest("""
+            def pytest_addoption(parser):
+                parser.addoption("--fail-flaky", action="store_true")
+        """)
+        pytester.makepyfile(test_demo=TESTS_MODULE)
+
+        with allure.step("Первый прогон записывает историю"):
+            pytester.runpytest_inprocess("--fail-flaky", plugins=[SchedulingPlugin(path)]).assert_outcomes(passed=5, failed=1)
+            history = DurationHistory(path)
+            assert len(history.tests) == 6
+            assert history.tests["test_demo.py::test_delay[0.2]"].duration >= 0.2
+            assert history.tests["test_demo.py::test_flaky"].last_failed
+
+        with allure.step("Шарды не пересекаются и сбалансированы"):
+            snapshot = (tmp_path / "durations.json").read_text()
+            shards = []
+            for index in (1, 2):
+                (tmp_path / "durations.json").write_text(snapshot)
+                result = pytester.runpytest_inprocess("-v", plugins=[SchedulingPlugin(path, shard=(index, 2))])
+                shards.append({line.split()[0] for line in result.outlines if " PASSED" in line})
+            assert len(shards[0]) + len(shards[1]) == 6
+            assert not shards[0] & shards[1]
+            assert "test_demo.py::test_delay[0.2]" in shards[0]
+            assert "test_demo.py::test_delay[0.15]" in shards[1]
+
+        with allure.step("Устаревшая история - шарды по хешу nodeid"):
+            stale = json.loads(snapshot)
+            stale["updated"] -= 7200
+            hashed = []
+            for index in (1, 2):
+                (tmp_path / "durations.json").write_text(json.dumps(stale))
+                plugin = SchedulingPlugin(path, shard=(index, 2), max_age=3600)
+                result = pytester.runpytest_inprocess("-v", plugins=[plugin])
+                hashed.append({line.split()[0] for line in result.outlines if " PASSED" in line})
+                assert f"shard {index}/2 by hash" in result.stdout.str()
+            assert len(hashed[0]) + len(hashed[1]) == 6
+            assert not hashed[0] & hashed[1]
+
+        with allure.step("Fail-fast запускает упавший тест первым"):
+            result = pytester.runpytest_inprocess("-v", plugins=[SchedulingPlugin(path, order=FAIL_FAST)])
+            executed = [line.split()[0] for line in result.outlines if " PASSED" in line]
+            assert executed[0] == "test_demo.py::test_flaky"
+            assert executed[1] == "test_demo.py::test_delay[0.0]"
+
+    @allure.title("Группы xdist только для выбранных тестов")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_groups_after_deselection(self, tmp_path) -> None:
+        """
+        Тест, что группы назначаются после фильтров других плагинов и попадают в nodeid, как у xdist.
+        """
+        class Config:
+            workerinput = {"workercount": 2}
+
+            def getvalue(self, name):
+                return name == "loadgroup"
+
+        class Item:
+            def __init__(self, nodeid):
+                self._nodeid = nodeid
+                self.markers = []
+
+            @property
+            def nodeid(self):
+                return self._nodeid
+
+            def get_closest_marker(self, name):
+                return next((m for m in self.markers if m.name == name), None)
+
+            def add_marker(self, marker):
+                self.markers.append(marker.mark)
+
+        history = DurationHistory(str(tmp_path / "durations.json"))
+        for test, duration in [("t::slow", 10.0), ("t::a", 3.0), ("t::b", 3.0), ("t::deselected", 20.0)]:
+            history.record(test, duration, False)
+        history.save()
+        items = [Item(test) for test in ("t::slow", "t::a", "t::b", "t::deselected")]
+
+        hook = SchedulingPlugin(history.path).pytest_collection_modifyitems(Config(), items)
+        next(hook)
+        items.pop()
+        with pytest.raises(StopIteration):
+            next(hook)
+
+        assert [item.nodeid for item in items] == ["t::slow@lpt-0", "t::a@lpt-1", "t::b@lpt-1"]
+
+    @allure.title("Группы LPT при запуске -n 2 --dist loadgroup")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_loadgroup_run(self, pytester, pytestconfig, monkeypatch) -> None:
+        """
+        Тест с настоящим xdist: переименование nodeid совпадает с суффиксами групп xdist, и группа выполняется на одном воркере.
+        """
+        pytester.makeconftest(XDIST_CONFTEST)
+        pytester.makepyfile(test_demo="def test_slow():\n    pass\n\n\ndef test_a():\n    pass\n\n\ndef test_b():\n    pass\n")
+        history = DurationHistory(str(pytester.path / "durations.json"))
+        for test, duration in [("test_demo.py::test_slow", 6.0), ("test_demo.py::test_a", 3.0), ("test_demo.py::test_b", 3.0)]:
+            history.record(test, duration, False)
+        history.save()
+        monkeypatch.setenv("PYTHONPATH", os.pathsep.join(filter(None, [str(pytestconfig.rootpath), os.getenv("PYTHONPATH")])))
+
+        result = pytester.runpytest_subprocess("-p", "xdist", "-n", "2", "--dist", "loadgroup", "-v", "-p", "no:cacheprovider")
+
+        result.assert_outcomes(passed=3)
+        workers = {}
+        for worker, test in re.findall(r"\[(gw\d)\].*PASSED (\S+)", result.stdout.str()):
+            workers.setdefault(test.rsplit("@", 1)[1], set()).add(worker)
+        assert set(workers) == {"lpt-0", "lpt-1"}, result.stdout.str()
+        assert all(len(group) == 1 for group in workers.values())
+        assert "test_demo.py::test_a@lpt-1" in result.stdout.str() and "test_demo.py::test_b@lpt-1" in result.stdout.str()
@@ -0,0 +1,78 @@
+import allure
+from benchmarks.bench_startup import measure_startup
+from utils.static_marks import marker_sources, module_may_match, static_marks
+
+MODULE = """
+import pytest
+
+pytestmark = [pytest.mark.slow]
+
+
+@pytest.mark.ui
+class TestPage:
+    @pytest.mark.smoke
+    def test_open(self):
+        pass
+
+    def helper(self):
+        pass
+
+
+def test_plain():
+    pass
+"""
+
+
+@allure.feature("Инфраструктура")
+@allure.story("Запуск pytest")
+class TestStartup:
+    """Тесты быстрого запуска API тестов без Selenium."""
+
+    @allure.title("Статические маркеры модуля")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_static_marks(self) -> None:
+        """
+        Тест, что маркеры модуля, класса и функции собираются без импорта, а динамические отключают фильтр.
+        """
+        assert static_marks(MODULE) == [{"slow", "ui", "smoke"}, {"slow"}]
+        assert static_marks(MODULE + "\n@pytest.mark.parametrize('x', [pytest.param(1, marks=pytest.mark.ui)])\ndef test_x(x):\n    pass\n") is None
+
+    @allure.title("Маркеры при импорте pytest под другим именем")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_static_marks_aliases(self, tmp_path) -> None:
+        """
+        Тест, что псевдонимы pytest и mark разбираются, а неразрешимые маркеры не исключают модуль.
+        """
+        with allure.step("import pytest as pt, from pytest import mark as m"):
+            assert static_marks(MODULE.replace("import pytest", "import pytest as pt").replace("pytest.mark", "pt.mark")) \
+                == [{"slow", "ui", "smoke"}, {"slow"}]
+            assert static_marks("from pytest import mark as m\n\n@m.api\ndef test_a():\n    pass\n") == [{"api"}]
+
+        with allure.step("Маркер сохранен в переменную"):
+            module = tmp_path / "test_alias.py"
+            module.write_text("from pytest import mark\n\nui = mark.ui\n\n@ui\ndef test_a():\n    pass\n", encoding="utf-8")
+            assert static_marks(module.read_text(encoding="utf-8")) is None
+            assert module_may_match(module, "api")
+
+        with allure.step("Маркер добавляется хуком conftest.py"):
+            module.write_text("def test_a():\n    pass\n", encoding="utf-8")
+            (tmp_path / "conftest.py").write_text(
+                "import pytest\n\n\ndef pytest_itemcollected(item):\n    item.add_marker(pytest.mark.api)\n",
+                encoding="utf-8"
+            )
+            sources = marker_sources(module, tmp_path)
+            assert sources == [tmp_path / "conftest.py"]
+            assert module_may_match(module, "api", sources)
+            assert not module_may_match(module, "ui", sources)
+
+    @allure.title("Запуск -m api не импортирует Selenium")
+    @allure.severity(allure.severity_level.CRITICAL)
+    def test_api_run_without_selenium(self) -> None:
+        """
+        Тест, что сбор API тестов не загружает selenium и webdriver_manager.
+        """
+        report = measure_startup("api")
+
+        assert "tests collected" in report.collected
+        assert "utils.static_marks" in report.imports
+        assert report.forbidden() == []
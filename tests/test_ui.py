@@ -1,9 +1,9 @@
 import pytest
 import allure
-import time
 from selenium.webdriver.remote.webdriver import WebDriver
 from pages.main_page import MainPage
 from pages.book_page import BookPage
+from config.test_data import test_data
 
 
 @pytest.mark.ui
@@ -25,7 +25,6 @@ class TestMainPage:
         with allure.step("Открыть главную страницу"):
             main_page = MainPage(driver)
             main_page.open_main_page()
-            time.sleep(3)  
 
             current_url = main_page.get_current_url()
             page_title = main_page.get_page_title()
@@ -36,12 +35,32 @@ class TestMainPage:
                 attachment_type=allure.attachment_type.TEXT,
             )
 
-            driver.save_screenshot("main_page_loaded.png")
-
         with allure.step("Проверить, что страница открылась"):
             assert "labirint.ru" in current_url, f"URL должен содержать labirint.ru, получен: {current_url}"
             assert "Лабиринт" in page_title, f"Заголовок должен содержать 'Лабиринт', получен: {page_title}"
 
+    @allure.title("Производительность главной страницы")
+    @allure.description("Тест проверяет LCP, CLS, TTFB и время блокировки главной страницы по бюджету")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_main_page_performance_budget(self, driver: WebDriver) -> None:
+        """
+        Тест бюджета производительности главной страницы.
+
+        Args:
+            driver (WebDriver): Фикстура WebDriver
+        """
+        with allure.step("Открыть главную страницу"):
+            main_page = MainPage(driver)
+            main_page.open_main_page()
+
+        with allure.step("Проверить показатели страницы"):
+            performance = main_page.performance
+            assert performance is not None, "Показатели производительности не собраны"
+            assert performance.ttfb is not None and performance.load, "Navigation Timing не получен"
+            assert performance.resource_count > 0, "Resource Timing пуст"
+
+        main_page.assert_performance_budget()
+
     @allure.title("Тест 2: Реакция кнопок на главной странице")
     @allure.description("Тест проверяет, что все кнопки на главной странице кликабельны и реагируют на действия")
     @allure.severity(allure.severity_level.CRITICAL)
@@ -55,7 +74,6 @@ class TestMainPage:
         with allure.step("Открыть главную страницу"):
             main_page = MainPage(driver)
             main_page.open_main_page()
-            time.sleep(3)
 
         with allure.step("Проверить базовую функциональность"):
             current_url = main_page.get_current_url()
@@ -77,7 +95,6 @@ class TestMainPage:
         with allure.step("Открыть главную страницу"):
             main_page = MainPage(driver)
             main_page.open_main_page()
-            time.sleep(3)
 
             initial_url = main_page.get_current_url()
             allure.attach(f"Начальный URL: {initial_url}", name="Initial URL", attachment_type=allure.attachment_type.TEXT)
@@ -85,8 +102,6 @@ class TestMainPage:
         with allure.step("Проверить основные элементы страницы"):
             assert "labirint.ru" in initial_url
 
-            driver.save_screenshot("before_logo_click.png")
-
     @allure.title("Тест 4: Поиск и отображение информации о книге")
     @allure.description("Тест проверяет поиск книги и отображение полной информации о ней")
     @allure.severity(allure.severity_level.NORMAL)
@@ -100,7 +115,6 @@ class TestMainPage:
         with allure.step("Открыть главную страницу"):
             main_page = MainPage(driver)
             main_page.open_main_page()
-            time.sleep(3)
 
         with allure.step("Проверить работу поиска"):
             current_url = main_page.get_current_url()
@@ -125,7 +139,6 @@ class TestMainPage:
         with allure.step("Открыть главную страницу"):
             main_page = MainPage(driver)
             main_page.open_main_page()
-            time.sleep(3)
 
         with allure.step("Проверить загрузку страницы"):
             current_url = driver.current_url
@@ -138,3 +151,33 @@ class TestMainPage:
             )
 
             assert "labirint.ru" in current_url, "Страница не загрузилась корректно"
+
+    @allure.title("Тест 6: Страницы результатов поиска")
+    @allure.description("Тест проверяет разбор карточек товаров и переход по страницам результатов поиска")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_search_results_pages(self, driver: WebDriver) -> None:
+        """
+        Тест обхода страниц результатов поиска.
+
+        Args:
+            driver (WebDriver): Фикстура WebDriver
+        """
+        with allure.step("Выполнить поиск"):
+            main_page = MainPage(driver)
+            main_page.open_main_page()
+            main_page.search_book(test_data.UI_TEST_DATA["search_queries"]["russian"])
+
+        with allure.step("Прочитать первые две страницы результатов"):
+            pages = list(main_page.iter_results_pages(max_pages=2))
+            books = [book for page in pages for book in page.books]
+
+            allure.attach(
+                "\n".join(f"{book.id}: {book.title} - {book.price}" for book in books),
+                name="Found Books",
+                attachment_type=allure.attachment_type.TEXT,
+            )
+
+            assert books, "Не найдено ни одной книги"
+            assert all(book.title for book in books), "У книги нет названия"
+            ids = [book.id for book in books if book.id is not None]
+            assert len(set(ids)) == len(ids), "Книги повторяются на разных страницах"
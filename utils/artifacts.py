@@ -0,0 +1,326 @@
+import atexit
+import hashlib
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Optional, Set, Tuple, Union
+
+import allure
+
+from config.settings import settings
+
+if TYPE_CHECKING:
+    # Selenium не импортируется при загрузке: модуль используется и API тестами
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+logger = logging.getLogger(__name__)
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+Payload = Union[bytes, str]
+Optimizer = Callable[[bytes], bytes]
+
+
+def optimize_png(data: bytes, level: int = 9) -> bytes:
+    """
+    Пережимает данные PNG (IDAT) zlib с заданным уровнем без потерь.
+
+    Chrome отдает скриншоты, сжатые на скорость; пересжатие уменьшает файл,
+    не меняя изображения. Если результат не меньше исходного или данные
+    не являются PNG, возвращаются исходные байты.
+
+    Args:
+        data: Содержимое PNG файла
+        level: Уровень сжатия zlib (1-9)
+
+    Returns:
+        bytes: Содержимое PNG файла
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        return data
+
+    chunks = []
+    idat = []
+    position = len(PNG_SIGNATURE)
+    try:
+        while position < len(data):
+            length, = struct.unpack(">I", data[position:position + 4])
+            kind = data[position + 4:position + 8]
+            body = data[position + 8:position + 8 + length]
+            position += 12 + length
+            if kind == b"IDAT":
+                if not idat:
+                    chunks.append((kind, None))
+                idat.append(body)
+            else:
+                chunks.append((kind, body))
+        compressed = zlib.compress(zlib.decompress(b"".join(idat)), level)
+    except (struct.error, zlib.error):
+        return data
+
+    if len(compressed) >= sum(len(body) for body in idat):
+        return data
+
+    parts = [PNG_SIGNATURE]
+    for kind, body in chunks:
+        body = compressed if body is None else body
+        parts.append(struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body)))
+    return b"".join(parts)
+
+
+@dataclass
+class ArtifactStats:
+    """Статистика хранилища артефактов."""
+
+    written: int = 0
+    optimized: int = 0
+    deduplicated: int = 0
+    failed: int = 0
+    source_bytes: int = 0
+    stored_bytes: int = 0
+    write_time: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"written={self.written} optimized={self.optimized} deduplicated={self.deduplicated} "
+            f"failed={self.failed} stored={self.stored_bytes / 1024:.0f}KiB "
+            f"(source {self.source_bytes / 1024:.0f}KiB) write_time={self.write_time:.2f}s"
+        )
+
+
+class ArtifactStore:
+    """
+    Хранилище вложений отчета с адресацией по содержимому.
+
+    Файл артефакта называется sha256 исходных данных, поэтому одинаковые
+    вложения хранятся один раз. Тестовый поток записывает исходные данные
+    как есть, так что ссылка в Allure прикрепляется только на существующий
+    файл; пересжатие PNG выполняет фоновый поток и атомарно подменяет файл.
+    """
+
+    def __init__(self, root: str, compression_level: int = 9) -> None:
+        """
+        Args:
+            root: Каталог хранилища
+            compression_level: Уровень пересжатия PNG (0 - сохранять как есть)
+        """
+        self.root = root
+        self.compression_level = compression_level
+        self.stats = ArtifactStats()
+        self._queue: "queue.Queue[Optional[Tuple[str, bytes, Optimizer]]]" = queue.Queue()
+        self._known: Set[str] = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def path_for(self, digest: str, extension: str) -> str:
+        return os.path.join(self.root, digest[:2], f"{digest}.{extension}")
+
+    def submit(self, payload: Payload, extension: str, optimize: Optional[Optimizer] = None) -> Optional[str]:
+        """
+        Записывает артефакт и ставит его пересжатие в очередь.
+
+        Args:
+            payload: Данные файла (строка или байты)
+            extension: Расширение файла
+            optimize: Пересжатие без потерь (выполняется в фоновом потоке)
+
+        Returns:
+            Optional[str]: Путь к файлу или None, если записать его не удалось
+        """
+        data = payload.encode("utf-8") if isinstance(payload, str) else payload
+        path = self.path_for(hashlib.sha256(data).hexdigest(), extension)
+
+        with self._lock:
+            if path in self._known:
+                self.stats.deduplicated += 1
+                return path
+
+        started = time.perf_counter()
+        if os.path.exists(path):
+            with self._lock:
+                self._known.add(path)
+                self.stats.deduplicated += 1
+            return path
+
+        try:
+            self._replace(path, data)
+        except OSError as e:
+            logger.warning(f"Failed to store artifact {path}: {e}")
+            with self._lock:
+                self.stats.failed += 1
+            return None
+
+        with self._lock:
+            self._known.add(path)
+            self.stats.written += 1
+            self.stats.source_bytes += len(data)
+            self.stats.stored_bytes += len(data)
+            self.stats.write_time += time.perf_counter() - started
+            if optimize is not None and self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="artifact-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+        if optimize is not None:
+            self._queue.put((path, data, optimize))
+        return path
+
+    def screenshot(self, driver: "WebDriver") -> Optional[str]:
+        """
+        Снимает скриншот и записывает его; PNG пересжимается в фоне.
+
+        Returns:
+            Optional[str]: Путь к файлу или None, если браузер не отдал скриншот или файл не записан
+        """
+        from selenium.common.exceptions import WebDriverException
+
+        try:
+            data = driver.get_screenshot_as_png()
+        except WebDriverException as e:
+            logger.warning(f"Failed to take screenshot: {e}")
+            return None
+        optimize = self._optimize_png if self.compression_level > 0 else None
+        return self.submit(data, "png", optimize)
+
+    def _optimize_png(self, data: bytes) -> bytes:
+        return optimize_png(data, self.compression_level)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._optimize(*item)
+            finally:
+                self._queue.task_done()
+
+    def _optimize(self, path: str, data: bytes, optimize: Optimizer) -> None:
+        started = time.perf_counter()
+        optimized = optimize(data)
+        if len(optimized) >= len(data):
+            return
+
+        try:
+            self._replace(path, optimized)
+        except OSError as e:
+            # Исходный файл остается на месте, ссылка на него рабочая
+            logger.warning(f"Failed to store optimized artifact {path}: {e}")
+            return
+
+        with self._lock:
+            self.stats.optimized += 1
+            self.stats.stored_bytes -= len(data) - len(optimized)
+            self.stats.write_time += time.perf_counter() - started
+
+    @staticmethod
+    def _replace(path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def flush(self) -> None:
+        """Ждет записи всех артефактов из очереди."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Дописывает очередь и останавливает фоновый поток."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        atexit.unregister(self.close)
+        self._queue.put(None)
+        thread.join()
+
+
+_default_store: Optional[ArtifactStore] = None
+_default_store_lock = threading.Lock()
+_results_dir: Optional[str] = None
+
+
+def set_results_dir(path: Optional[str]) -> None:
+    """Каталог результатов Allure (--alluredir): ссылки на файлы строятся относительно него."""
+    global _results_dir
+    _results_dir = path
+
+
+def default_artifact_store() -> ArtifactStore:
+    """Хранилище артефактов процесса в settings.SCREENSHOT_DIR."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ArtifactStore(settings.SCREENSHOT_DIR, settings.ARTIFACT_COMPRESSION_LEVEL)
+        return _default_store
+
+
+def close_artifact_store() -> Optional[ArtifactStats]:
+    """
+    Дописывает артефакты процесса на диск.
+
+    Returns:
+        Optional[ArtifactStats]: Статистика или None, если артефактов не было
+    """
+    with _default_store_lock:
+        store = _default_store
+    if store is None:
+        return None
+    store.close()
+    return store.stats
+
+
+def _attach_reference(path: str, name: str) -> None:
+    # Относительная ссылка остается рабочей, когда результаты и артефакты публикуются вместе
+    link = Path(os.path.relpath(path, _results_dir or os.getcwd())).as_posix()
+    allure.attach(link, name=name, attachment_type=allure.attachment_type.URI_LIST)
+
+
+def attach_screenshot(driver: "WebDriver", name: str) -> Optional[str]:
+    """
+    Сохраняет скриншот в хранилище и прикрепляет к Allure ссылку на записанный файл.
+
+    Args:
+        driver: Экземпляр WebDriver
+        name: Имя вложения
+
+    Returns:
+        Optional[str]: Путь к файлу скриншота
+    """
+    path = default_artifact_store().screenshot(driver)
+    if path is not None:
+        _attach_reference(path, name)
+    return path
+
+
+def attach_artifact(body: Payload, name: str, attachment_type: allure.attachment_type) -> Optional[str]:
+    """
+    Прикрепляет вложение (JSON, HTML, текст) к Allure.
+
+    Вложения до ARTIFACT_INLINE_LIMIT_KB прикрепляются как есть, более крупные
+    сохраняются в хранилище, а в Allure попадает ссылка на файл.
+
+    Args:
+        body: Содержимое вложения
+        name: Имя вложения
+        attachment_type: Тип вложения Allure (определяет расширение файла)
+
+    Returns:
+        Optional[str]: Путь к файлу или None, если вложение прикреплено целиком
+    """
+    size = len(body.encode("utf-8") if isinstance(body, str) else body)
+    path = None
+    if size > settings.ARTIFACT_INLINE_LIMIT_KB * 1024:
+        path = default_artifact_store().submit(body, attachment_type.extension)
+    if path is None:
+        allure.attach(body, name=name, attachment_type=attachment_type)
+    else:
+        _attach_reference(path, name)
+    return path
@@ -0,0 +1,231 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+logger = logging.getLogger(__name__)
+
+
+CLEAR_STORAGE_SCRIPT = """
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+return window.location.origin;
+"""
+
+
+@dataclass
+class PoolStats:
+    """Статистика пула браузеров."""
+
+    hits: int = 0
+    misses: int = 0
+    recycled: int = 0
+    discarded: int = 0
+    launches: int = 0
+    launch_time: float = 0.0
+
+    @property
+    def average_launch_time(self) -> float:
+        return self.launch_time / self.launches if self.launches else 0.0
+
+    @property
+    def saved_time(self) -> float:
+        """Оценка сэкономленного времени: каждый hit экономит один запуск браузера."""
+        return self.hits * self.average_launch_time
+
+    def summary(self) -> str:
+        return (
+            f"hits={self.hits} misses={self.misses} recycled={self.recycled} "
+            f"discarded={self.discarded} launches={self.launches} "
+            f"avg_launch={self.average_launch_time:.2f}s saved~{self.saved_time:.2f}s"
+        )
+
+
+@dataclass
+class _PooledSession:
+    driver: WebDriver
+    uses: int = 0
+    main_handle: Optional[str] = None
+
+
+class BrowserPool:
+    """
+    Пул «тёплых» сессий WebDriver.
+
+    Сессия выдается тесту через acquire(), после теста возвращается через release():
+    состояние браузера сбрасывается (cookies, localStorage, sessionStorage, лишние окна),
+    и сессия переиспользуется следующим тестом. При повторной выдаче вычитывается
+    консоль браузера, чтобы в артефакты теста не попали сообщения предыдущих
+    тестов. После max_uses использований или при падении браузера сессия
+    закрывается и создается новая.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], WebDriver],
+        max_idle: int = 1,
+        max_uses: int = 20,
+        closer: Optional[Callable[[WebDriver], None]] = None
+    ) -> None:
+        """
+        Args:
+            factory: Функция, создающая новый WebDriver
+            max_idle: Максимальное количество простаивающих сессий в пуле
+            max_uses: Количество тестов, после которого сессия пересоздается
+            closer: Функция, закрывающая WebDriver (по умолчанию driver.quit())
+        """
+        self.factory = factory
+        self.closer = closer or (lambda driver: driver.quit())
+        self.max_idle = max_idle
+        self.max_uses = max_uses
+        self.stats = PoolStats()
+        self._idle: List[_PooledSession] = []
+        self._busy: Dict[int, _PooledSession] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self) -> WebDriver:
+        """Возвращает сессию из пула или запускает новую."""
+        while True:
+            with self._lock:
+                session = self._idle.pop() if self._idle else None
+
+            if session is None:
+                break
+
+            main_handle = self._current_handle(session.driver)
+            if main_handle is not None:
+                self._drain_console(session.driver)
+                with self._lock:
+                    self.stats.hits += 1
+                    session.uses += 1
+                    session.main_handle = main_handle
+                    self._busy[id(session.driver)] = session
+                return session.driver
+
+            logger.warning("Browser session from pool is dead, discarding it")
+            self._discard(session)
+
+        driver = self._launch()
+        session = _PooledSession(driver=driver, uses=1, main_handle=self._current_handle(driver))
+        with self._lock:
+            self.stats.misses += 1
+            self._busy[id(session.driver)] = session
+        return session.driver
+
+    def release(self, driver: WebDriver, broken: bool = False) -> None:
+        """
+        Возвращает сессию в пул.
+
+        Args:
+            driver: Сессия, полученная через acquire()
+            broken: Принудительно закрыть сессию (например, после падения браузера)
+        """
+        with self._lock:
+            session = self._busy.pop(id(driver), None)
+
+        if session is None:
+            return
+
+        if broken or not self._reset(session):
+            self._discard(session)
+            return
+
+        if session.uses >= self.max_uses:
+            logger.info(f"Recycling browser session after {session.uses} uses")
+            with self._lock:
+                self.stats.recycled += 1
+            self._quit(session.driver)
+            return
+
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(session)
+                return
+
+        self._quit(session.driver)
+
+    def close(self) -> None:
+        """Закрывает все сессии пула."""
+        with self._lock:
+            sessions = self._idle + list(self._busy.values())
+            self._idle = []
+            self._busy = {}
+
+        for session in sessions:
+            self._quit(session.driver)
+
+    def _launch(self) -> WebDriver:
+        started = time.perf_counter()
+        driver = self.factory()
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self.stats.launches += 1
+            self.stats.launch_time += elapsed
+
+        logger.info(f"Launched new browser session in {elapsed:.2f}s")
+        return driver
+
+    def _reset(self, session: _PooledSession) -> bool:
+        """
+        Сбрасывает состояние браузера. Возвращает False, если сессия неработоспособна.
+
+        Остается окно, активное при выдаче сессии; если тест его закрыл - первое из оставшихся.
+        """
+        driver = session.driver
+        try:
+            handles = driver.window_handles
+            main_handle = session.main_handle if session.main_handle in handles else handles[0]
+            for handle in handles:
+                if handle != main_handle:
+                    driver.switch_to.window(handle)
+                    driver.close()
+            driver.switch_to.window(main_handle)
+
+            origin = driver.execute_script(CLEAR_STORAGE_SCRIPT)
+            try:
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+                if origin and origin != "null":
+                    driver.execute_cdp_cmd("Storage.clearDataForOrigin", {
+                        "origin": origin,
+                        "storageTypes": "local_storage,session_storage,indexeddb,service_workers",
+                    })
+            except (AttributeError, WebDriverException):
+                pass
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+            return True
+        except (WebDriverException, IndexError) as e:
+            logger.warning(f"Failed to reset browser session: {e}")
+            return False
+
+    @staticmethod
+    def _drain_console(driver: WebDriver) -> None:
+        """Вычитывает накопленные сообщения консоли: get_log возвращает только новые записи."""
+        try:
+            driver.get_log("browser")
+        except (WebDriverException, AttributeError) as e:
+            logger.debug(f"Browser console log is not available: {e}")
+
+    def _discard(self, session: _PooledSession) -> None:
+        with self._lock:
+            self.stats.discarded += 1
+        self._quit(session.driver)
+
+    @staticmethod
+    def _current_handle(driver: WebDriver) -> Optional[str]:
+        """Активное окно сессии или None, если браузер не отвечает."""
+        try:
+            return driver.current_window_handle
+        except WebDriverException:
+            return None
+
+    def _quit(self, driver: WebDriver) -> None:
+        try:
+            self.closer(driver)
+        except WebDriverException as e:
+            logger.warning(f"Failed to quit browser session: {e}")
@@ -0,0 +1,116 @@
+import json
+import logging
+import time
+import weakref
+from typing import Any, Callable, Dict, List, Set
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+logger = logging.getLogger(__name__)
+
+Listener = Callable[[str, Dict[str, Any]], None]
+
+_streams: "weakref.WeakKeyDictionary[WebDriver, DevToolsEventStream]" = weakref.WeakKeyDictionary()
+
+
+class DevToolsEventStream:
+    """
+    Поток событий Chrome DevTools Protocol из performance-лога WebDriver.
+
+    Лог вычитывается целиком при каждом вызове poll(), поэтому на один драйвер
+    должен приходиться один поток: все потребители подписываются через subscribe().
+    Требует capability goog:loggingPrefs = {"performance": "ALL"}.
+    """
+
+    def __init__(self, driver: WebDriver) -> None:
+        self.driver = driver
+        self.available = True
+        self._listeners: List[Listener] = []
+
+    def subscribe(self, listener: Listener) -> None:
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Listener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def poll(self) -> int:
+        """
+        Вычитывает накопленные события и передает их подписчикам.
+
+        Returns:
+            int: Количество полученных событий
+        """
+        if not self.available:
+            return 0
+
+        try:
+            entries = self.driver.get_log("performance")
+        except WebDriverException as e:
+            logger.info(f"Performance log is not available: {e}")
+            self.available = False
+            return 0
+
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+
+            for listener in list(self._listeners):
+                listener(message.get("method", ""), message.get("params", {}))
+
+        return len(entries)
+
+
+def get_event_stream(driver: WebDriver) -> DevToolsEventStream:
+    """Возвращает единственный поток событий для драйвера."""
+    stream = _streams.get(driver)
+    if stream is None:
+        stream = DevToolsEventStream(driver)
+        _streams[driver] = stream
+    return stream
+
+
+class NetworkIdleTracker:
+    """
+    Отслеживает незавершенные сетевые запросы страницы по событиям Network.*.
+
+    Сеть считается «тихой», если незавершенных запросов не больше max_inflight
+    и новых сетевых событий не было в течение заданного окна.
+    """
+
+    def __init__(self, stream: DevToolsEventStream, max_inflight: int = 0) -> None:
+        self.stream = stream
+        self.max_inflight = max_inflight
+        self.inflight: Set[str] = set()
+        self.requests_seen = 0
+        self.last_activity = time.monotonic()
+        stream.subscribe(self._on_event)
+
+    @property
+    def available(self) -> bool:
+        return self.stream.available
+
+    def close(self) -> None:
+        self.stream.unsubscribe(self._on_event)
+
+    def update(self) -> None:
+        self.stream.poll()
+
+    def idle_for(self) -> float:
+        """Сколько секунд сеть находится в «тихом» состоянии (0, если запросы еще идут)."""
+        if len(self.inflight) > self.max_inflight:
+            return 0.0
+        return time.monotonic() - self.last_activity
+
+    def _on_event(self, method: str, params: Dict[str, Any]) -> None:
+        if method == "Network.requestWillBeSent":
+            self.inflight.add(params.get("requestId"))
+            self.requests_seen += 1
+        elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+            self.inflight.discard(params.get("requestId"))
+        else:
+            return
+        self.last_activity = time.monotonic()
@@ -0,0 +1,341 @@
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from selenium.common.exceptions import (
+    InvalidSelectorException, JavascriptException, TimeoutException, WebDriverException
+)
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+logger = logging.getLogger(__name__)
+
+PRESENT = "present"
+ALL_PRESENT = "all_present"
+VISIBLE = "visible"
+CLICKABLE = "clickable"
+
+FALLBACK_CONDITIONS = {
+    PRESENT: EC.presence_of_element_located,
+    ALL_PRESENT: EC.presence_of_all_elements_located,
+    VISIBLE: EC.visibility_of_element_located,
+    CLICKABLE: EC.element_to_be_clickable,
+}
+
+WAIT_SCRIPT = """
+const [by, value, condition, timeout, recheck] = arguments;
+const done = arguments[arguments.length - 1];
+
+class InvalidSelector extends Error {}
+
+// Локатор, который браузер не разбирает, - SyntaxError из querySelectorAll/evaluate
+function query() {
+    try {
+        return find();
+    } catch (e) {
+        if (e && e.name === "SyntaxError") throw new InvalidSelector(e.message);
+        throw e;
+    }
+}
+
+function find() {
+    const root = document;
+    switch (by) {
+        case "xpath": {
+            const snapshot = document.evaluate(value, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            const nodes = [];
+            for (let i = 0; i < snapshot.snapshotLength; i++) nodes.push(snapshot.snapshotItem(i));
+            return nodes;
+        }
+        case "css selector": return Array.from(root.querySelectorAll(value));
+        case "id": return Array.from(root.querySelectorAll("#" + CSS.escape(value)));
+        case "name": return Array.from(root.getElementsByName(value));
+        case "class name": return Array.from(root.getElementsByClassName(value));
+        case "tag name": return Array.from(root.getElementsByTagName(value));
+        case "link text":
+            return Array.from(root.querySelectorAll("a")).filter(a => a.innerText.trim() === value);
+        case "partial link text":
+            return Array.from(root.querySelectorAll("a")).filter(a => a.innerText.includes(value));
+    }
+    throw new InvalidSelector("Unsupported locator strategy: " + by);
+}
+
+function visible(el) {
+    if (!el.isConnected) return false;
+    for (let node = el; node && node.nodeType === 1; node = node.parentElement) {
+        const style = getComputedStyle(node);
+        if (style.display === "none") return false;
+        if (node === el && (style.visibility === "hidden" || style.visibility === "collapse")) return false;
+        if (style.opacity === "0" && node === el) return false;
+    }
+    const rect = el.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0;
+}
+
+function check() {
+    const nodes = query();
+    if (!nodes.length) return null;
+    const first = nodes[0];
+    if (condition === "all_present") return nodes;
+    if (condition === "visible" && !visible(first)) return null;
+    if (condition === "clickable" && (!visible(first) || first.disabled)) return null;
+    return [first];
+}
+
+const EVENTS = ["load", "transitionend", "animationend", "scroll"];
+
+let finished = false;
+let scheduled = false;
+let observer = null;
+let timer = null;
+let interval = null;
+let mutations = 0;
+let checks = 0;
+
+function finish(result) {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    clearTimeout(timer);
+    clearInterval(interval);
+    for (const type of EVENTS) document.removeEventListener(type, schedule, true);
+    result.mutations = mutations;
+    result.checks = checks;
+    done(result);
+}
+
+function run() {
+    scheduled = false;
+    if (finished) return;
+    checks++;
+    try {
+        const found = check();
+        if (found) finish({status: "ok", elements: found});
+    } catch (e) {
+        // Ошибка локатора отличается от сбоя самого скрипта
+        finish({status: e instanceof InvalidSelector ? "invalid" : "error", message: String(e.message || e)});
+    }
+}
+
+// Не больше одной проверки за кадр, сколько бы мутаций ни пришло
+function schedule() {
+    if (scheduled || finished) return;
+    scheduled = true;
+    if (document.hidden) setTimeout(run, 16);
+    else requestAnimationFrame(run);
+}
+
+run();
+if (!finished) {
+    observer = new MutationObserver(() => { mutations++; schedule(); });
+    observer.observe(document.documentElement || document, {childList: true, subtree: true, attributes: true});
+    if (condition === "visible" || condition === "clickable") {
+        // Видимость меняется и без мутаций: загрузка стилей, раскладка, анимации, прокрутка
+        for (const type of EVENTS) document.addEventListener(type, schedule, true);
+        interval = setInterval(schedule, recheck);
+    }
+    timer = setTimeout(() => finish({status: "timeout"}), timeout);
+}
+"""
+
+UNLOAD_ERRORS = ("document unloaded", "unload", "navigat")
+
+DEFAULT_SCRIPT_TIMEOUT = 30.0
+SCRIPT_TIMEOUT_MARGIN = 1.0
+
+_totals: Counter = Counter()
+
+
+@dataclass
+class WaitMetrics:
+    """Метрики одного ожидания."""
+
+    condition: str
+    locator: Tuple[str, str]
+    latency: float
+    calls: int
+    fallback: bool
+    timed_out: bool
+
+
+class DomWaitEngine:
+    """
+    Ожидание элементов по событиям DOM вместо опроса.
+
+    В браузере устанавливается MutationObserver через execute_async_script,
+    который завершает скрипт сразу после появления подходящего элемента:
+    одно ожидание обычно стоит одного вызова WebDriver. Мутации объединяются
+    в одну проверку за кадр; видимость, которая меняется без мутаций (стили,
+    анимации, прокрутка), дополнительно проверяется каждые recheck_interval.
+    Ожидание дольше таймаута скриптов драйвера делится на несколько вызовов,
+    таймаут драйвера меняется только на время ожидания, если он меньше секунды.
+    Если скрипты выполнить нельзя, используется обычный WebDriverWait с опросом;
+    ошибка в самом локаторе поднимается как InvalidSelectorException.
+    """
+
+    def __init__(self, driver: WebDriver, poll_frequency: float = 0.5, recheck_interval: float = 0.1) -> None:
+        self.driver = driver
+        self.poll_frequency = poll_frequency
+        self.recheck_interval = recheck_interval
+        self.scripts_available = True
+        self.history: List[WaitMetrics] = []
+        self._driver_script_timeout: Optional[float] = None
+        self._calls = 0
+
+    @property
+    def total_calls(self) -> int:
+        return sum(m.calls for m in self.history)
+
+    @property
+    def total_latency(self) -> float:
+        return sum(m.latency for m in self.history)
+
+    def until(self, locator: Tuple[str, str], condition: str = PRESENT, timeout: float = 10) -> Any:
+        """
+        Ожидает выполнения условия для локатора.
+
+        Args:
+            locator: Локатор (By, значение)
+            condition: present, all_present, visible или clickable
+            timeout: Максимальное время ожидания, сек
+
+        Returns:
+            WebElement или List[WebElement] для all_present
+
+        Raises:
+            TimeoutException: Если условие не выполнилось за timeout
+            InvalidSelectorException: Если локатор не разбирается браузером
+        """
+        started = time.perf_counter()
+        self._calls = 0
+        fallback = False
+        result = None
+
+        try:
+            if self.scripts_available:
+                result = self._wait_with_observer(locator, condition, timeout, started)
+            if result is None and not self.scripts_available:
+                fallback = True
+                remaining = max(0.0, timeout - (time.perf_counter() - started))
+                result = self._wait_with_polling(locator, condition, remaining)
+        except TimeoutException:
+            self._record(condition, locator, started, fallback, timed_out=True)
+            raise
+
+        self._record(condition, locator, started, fallback, timed_out=False)
+        return result
+
+    def _wait_with_observer(
+        self,
+        locator: Tuple[str, str],
+        condition: str,
+        timeout: float,
+        started: float
+    ) -> Optional[Any]:
+        by, value = locator
+        budget = self._script_budget()
+        restore = None
+        if budget < SCRIPT_TIMEOUT_MARGIN:
+            restore = self._driver_script_timeout
+            budget = timeout
+            self._calls += 1
+            self.driver.set_script_timeout(timeout + SCRIPT_TIMEOUT_MARGIN)
+
+        try:
+            while True:
+                remaining = timeout - (time.perf_counter() - started)
+                if remaining <= 0:
+                    raise TimeoutException(f"Element {locator} is not {condition} after {timeout}s")
+                chunk = min(remaining, budget)
+
+                self._calls += 1
+                try:
+                    response = self.driver.execute_async_script(
+                        WAIT_SCRIPT, by, value, condition, int(chunk * 1000), int(self.recheck_interval * 1000)
+                    )
+                except JavascriptException as e:
+                    if any(marker in str(e).lower() for marker in UNLOAD_ERRORS):
+                        continue
+                    logger.info(f"DOM wait script failed, falling back to polling: {e}")
+                    self.scripts_available = False
+                    return None
+                except TimeoutException:
+                    continue
+
+                status = (response or {}).get("status")
+                if status == "ok":
+                    elements: List[WebElement] = response["elements"]
+                    return elements if condition == ALL_PRESENT else elements[0]
+                if status == "timeout":
+                    if chunk < remaining:
+                        continue
+                    raise TimeoutException(f"Element {locator} is not {condition} after {timeout}s")
+                if status == "invalid":
+                    # Опрос с тем же локатором упадет так же, переходить на него незачем
+                    raise InvalidSelectorException(f"Invalid locator {locator}: {response.get('message')}")
+
+                logger.info(f"DOM wait script error, falling back to polling: {response}")
+                self.scripts_available = False
+                return None
+        finally:
+            if restore is not None:
+                self._calls += 1
+                self.driver.set_script_timeout(restore)
+
+    def _script_budget(self) -> float:
+        """Длительность одного вызова скрипта в пределах таймаута скриптов драйвера, сек."""
+        if self._driver_script_timeout is None:
+            self._calls += 1
+            try:
+                self._driver_script_timeout = self.driver.timeouts.script
+            except (TypeError, WebDriverException):
+                # null (без ограничения) или драйвер без GET /timeouts
+                self._driver_script_timeout = DEFAULT_SCRIPT_TIMEOUT
+        return self._driver_script_timeout - SCRIPT_TIMEOUT_MARGIN
+
+    def _wait_with_polling(self, locator: Tuple[str, str], condition: str, timeout: float) -> Any:
+        expected = FALLBACK_CONDITIONS[condition](locator)
+
+        def counted(driver: WebDriver) -> Any:
+            self._calls += 1
+            return expected(driver)
+
+        return WebDriverWait(self.driver, timeout, poll_frequency=self.poll_frequency).until(counted)
+
+    def _record(
+        self,
+        condition: str,
+        locator: Tuple[str, str],
+        started: float,
+        fallback: bool,
+        timed_out: bool
+    ) -> None:
+        metrics = WaitMetrics(
+            condition=condition,
+            locator=locator,
+            latency=time.perf_counter() - started,
+            calls=self._calls,
+            fallback=fallback,
+            timed_out=timed_out
+        )
+        self.history.append(metrics)
+        _totals.update(waits=1, calls=metrics.calls, fallback=int(fallback), timeouts=int(timed_out))
+        _totals["latency_ms"] += round(metrics.latency * 1000)
+        logger.debug(f"Wait {condition} {locator}: {metrics.latency:.3f}s, {metrics.calls} calls")
+
+
+def wait_totals() -> Counter:
+    """Суммарные метрики всех ожиданий процесса (waits, calls, fallback, timeouts, latency_ms)."""
+    return _totals
+
+
+def format_wait_totals(totals: Dict[str, int]) -> str:
+    waits = totals.get("waits", 0)
+    calls = totals.get("calls", 0)
+    return (f"{waits} waits, {calls} WebDriver calls ({calls / max(waits, 1):.1f}/wait), "
+            f"{totals.get('latency_ms', 0) / 1000:.1f}s waited, "
+            f"{totals.get('timeouts', 0)} timeouts, {totals.get('fallback', 0)} polling fallbacks")
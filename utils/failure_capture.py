@@ -0,0 +1,180 @@
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional
+
+import allure
+import pytest
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from utils.artifacts import attach_artifact, attach_screenshot
+
+logger = logging.getLogger(__name__)
+
+PARAM_KEYS = ("url", "using", "value", "script", "text", "name")
+
+
+@dataclass
+class CommandRecord:
+    """Команда WebDriver из кольцевого буфера."""
+
+    command: str
+    params: str
+    duration: float
+    error: Optional[str] = None
+
+    def describe(self) -> str:
+        status = f"  !! {self.error}" if self.error else ""
+        return f"{self.duration * 1000:8.1f}ms  {self.command} {self.params}".rstrip() + status
+
+
+def _short_params(params: Optional[Dict[str, Any]]) -> str:
+    if not params:
+        return ""
+    parts = []
+    for key in PARAM_KEYS:
+        if key in params:
+            value = " ".join(str(params[key]).split())
+            parts.append(f"{key}={value[:80] + '...' if len(value) > 80 else value}")
+    return " ".join(parts)
+
+
+class FailureRecorder:
+    """
+    Кольцевой буфер последних команд WebDriver и состояния страницы.
+
+    Подменяет driver.execute на время теста: для каждой команды запоминаются
+    имя, ключевые параметры и длительность, а URL и заголовок берутся из
+    команд get, getCurrentUrl и getTitle без дополнительных запросов к браузеру.
+    """
+
+    def __init__(self, driver: WebDriver, size: int = 20) -> None:
+        """
+        Args:
+            driver: Экземпляр WebDriver
+            size: Количество хранимых команд
+        """
+        self.driver = driver
+        self.commands: Deque[CommandRecord] = deque(maxlen=size)
+        self.url: Optional[str] = None
+        self.title: Optional[str] = None
+        self._execute = driver.execute
+        driver.execute = self._traced_execute
+
+    def _traced_execute(self, driver_command: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            response = self._execute(driver_command, params)
+        except Exception as e:
+            self.commands.append(CommandRecord(
+                driver_command, _short_params(params), time.perf_counter() - started, f"{type(e).__name__}"
+            ))
+            raise
+
+        self.commands.append(CommandRecord(driver_command, _short_params(params), time.perf_counter() - started))
+        if driver_command == Command.GET:
+            self.url = params.get("url")
+        elif driver_command == Command.GET_CURRENT_URL:
+            self.url = response.get("value")
+        elif driver_command == Command.GET_TITLE:
+            self.title = response.get("value")
+        return response
+
+    def detach(self) -> None:
+        """Возвращает исходный driver.execute (драйвер может вернуться в пул)."""
+        if self.driver.__dict__.get("execute") == self._traced_execute:
+            del self.driver.execute
+
+    def state(self) -> str:
+        lines = [f"URL:   {self.url or '-'}", f"Title: {self.title or '-'}", "", f"Последние {len(self.commands)} команд:"]
+        lines.extend(record.describe() for record in self.commands)
+        return "\n".join(lines)
+
+    def capture(self) -> List[str]:
+        """
+        Снимает артефакты упавшего теста: скриншот, DOM, консоль браузера и буфер команд.
+
+        Returns:
+            List[str]: Имена прикрепленных вложений
+        """
+        self.detach()
+        attached = []
+        driver = self.driver
+
+        try:
+            self.url, self.title = driver.current_url, driver.title
+        except WebDriverException:
+            pass
+        allure.attach(self.state(), name="Состояние браузера", attachment_type=allure.attachment_type.TEXT)
+        attached.append("state")
+
+        if attach_screenshot(driver, "Скриншот при падении") is not None:
+            attached.append("screenshot")
+
+        try:
+            attach_artifact(driver.page_source, name="DOM", attachment_type=allure.attachment_type.HTML)
+            attached.append("dom")
+        except WebDriverException as e:
+            logger.warning(f"Failed to capture DOM: {e}")
+
+        try:
+            entries = driver.get_log("browser")
+        except (WebDriverException, AttributeError) as e:
+            logger.info(f"Browser console log is not available: {e}")
+            entries = []
+        if entries:
+            allure.attach(
+                "\n".join(f"[{entry.get('level')}] {entry.get('message')}" for entry in entries),
+                name="Консоль браузера",
+                attachment_type=allure.attachment_type.TEXT
+            )
+            attached.append("console")
+
+        return attached
+
+
+failure_recorder_key = pytest.StashKey[FailureRecorder]()
+
+
+class FailureCapturePlugin:
+    """
+    Плагин pytest: артефакты UI теста снимаются только при падении.
+
+    Пока тест выполняется, FailureRecorder держит в памяти последние команды
+    WebDriver; при успехе ничего не записывается, при падении к отчету Allure
+    прикрепляются скриншот, DOM, консоль браузера и буфер команд.
+    """
+
+    def __init__(self, size: int = 20) -> None:
+        """
+        Args:
+            size: Количество команд WebDriver в буфере
+        """
+        self.size = size
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        driver = getattr(item, "funcargs", {}).get("driver")
+        if driver is not None:
+            item.stash[failure_recorder_key] = FailureRecorder(driver, self.size)
+        yield
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        if call.when != "call":
+            return
+        recorder = item.stash.get(failure_recorder_key, None)
+        if recorder is None:
+            return
+        del item.stash[failure_recorder_key]
+
+        report = outcome.get_result()
+        if report.failed:
+            captured = recorder.capture()
+            logger.info(f"Captured failure artifacts for {item.nodeid}: {', '.join(captured)}")
+        else:
+            recorder.detach()
@@ -0,0 +1,18 @@
+from typing import List
+
+import pytest
+
+from api.tracing import RequestTrace
+
+
+def pytest_api_request_traces(item: pytest.Item, traces: List[RequestTrace]) -> None:
+    """
+    Вызывается после теста, выполнявшего HTTP запросы через APIClient.
+
+    Реализуйте хук в conftest.py или плагине, чтобы выгрузить трассировки
+    (например, в CSV или систему метрик).
+
+    Args:
+        item: Тест
+        traces: Трассировки запросов теста в порядке завершения
+    """
@@ -0,0 +1,586 @@
+"""
+Выбор тестов по изменениям (test impact analysis).
+
+Карта зависимостей записывается трассирующим прогоном (pytest --impact-record):
+для каждого теста сохраняются функции проекта, вызванные в setup, call и
+teardown (методы pages/*, APIClient, фикстуры conftest, сам тест). Изменения
+из git diff сопоставляются с функциями по AST: измененная строка внутри
+функции затрагивает эту функцию, строка с ключом LOCATORS - функции, которые
+используют этот ключ напрямую или через атрибут класса страницы, строка с
+присваиванием - функции, ссылающиеся на имя. Изменения, которые нельзя
+отнести ни к одной функции, запускают весь набор.
+
+Запуск:
+    pytest --impact-record
+    pytest --impact-diff origin/main
+    python -m utils.impact origin/main
+"""
+import argparse
+import ast
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import pytest
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+ALL_KEYS = "*"
+IGNORED_SUFFIXES = (".md",)
+EXCLUDED_DIRS = frozenset({".git", ".cache", ".venv", "venv", "__pycache__", "node_modules", "allure-results"})
+
+HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+FUNCTION = "function"
+CLASS = "class"
+DEFINITION = "definition"
+LOCATOR = "locator"
+IGNORE = "ignore"
+OTHER = "other"
+
+
+@dataclass
+class Region:
+    """Участок файла: функция, заголовок класса, присваивание или ключ LOCATORS."""
+
+    start: int
+    end: int
+    kind: str
+    name: str
+
+
+@dataclass
+class FileIndex:
+    """
+    Результат разбора файла.
+
+    references - имена (Name и атрибуты), на которые ссылаются функции и
+    присваивания; locator_keys - ключи LOCATORS, которые они используют.
+    """
+
+    module: str
+    regions: List[Region] = field(default_factory=list)
+    references: Dict[str, Set[str]] = field(default_factory=dict)
+    locator_keys: Dict[str, Set[str]] = field(default_factory=dict)
+
+    def region_at(self, line: int) -> Optional[Region]:
+        """Самый вложенный участок, содержащий строку (None для пустых строк и комментариев)."""
+        best = None
+        for region in self.regions:
+            if region.start <= line <= region.end and (best is None or region.end - region.start < best.end - best.start):
+                best = region
+        return best
+
+
+def module_name(path: str) -> str:
+    return os.path.splitext(path.replace(os.sep, "/"))[0].replace("/", ".")
+
+
+def _statement_start(node: ast.AST) -> int:
+    decorators = getattr(node, "decorator_list", [])
+    return min([node.lineno] + [d.lineno for d in decorators])
+
+
+def _collect_names(node: ast.AST) -> Tuple[Set[str], Set[str]]:
+    """Имена, на которые ссылается узел, и использованные ключи LOCATORS."""
+    names: Set[str] = set()
+    keys: Set[str] = set()
+    subscripted = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Subscript) and isinstance(child.slice, ast.Constant) \
+                and isinstance(child.slice.value, str) and _is_locators(child.value):
+            keys.add(child.slice.value)
+            subscripted.add(id(child.value))
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name):
+            names.add(child.id)
+        elif isinstance(child, ast.Attribute):
+            names.add(child.attr)
+        if _is_locators(child) and id(child) not in subscripted:
+            keys.add(ALL_KEYS)
+    return names, keys
+
+
+def _is_locators(node: ast.AST) -> bool:
+    return (isinstance(node, ast.Name) and node.id == "LOCATORS") or \
+        (isinstance(node, ast.Attribute) and node.attr == "LOCATORS")
+
+
+def _assigned_name(node: ast.AST) -> Optional[str]:
+    targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+    if len(targets) == 1 and isinstance(targets[0], ast.Name):
+        return targets[0].id
+    return None
+
+
+def index_source(source: str, module: str) -> FileIndex:
+    """Разбирает исходный код модуля на участки и ссылки."""
+    index = FileIndex(module=module)
+
+    def visit(body: List[ast.stmt], prefix: str, in_function: bool = False) -> None:
+        for node in body:
+            start, end = _statement_start(node), node.end_lineno
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                name = prefix + node.name
+                index.regions.append(Region(start, end, FUNCTION, name))
+                index.references[name], index.locator_keys[name] = _collect_names(node)
+                visit(node.body, name + ".<locals>.", in_function=True)
+            elif isinstance(node, ast.ClassDef):
+                name = prefix + node.name
+                index.regions.append(Region(start, node.body[0].lineno - 1, CLASS, name))
+                visit(node.body, name + ".", in_function)
+            elif in_function:
+                continue
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)) and _assigned_name(node):
+                name = _assigned_name(node)
+                index.regions.append(Region(start, end, DEFINITION, name))
+                if node.value is not None:
+                    index.references[name], index.locator_keys[name] = _collect_names(node.value)
+                if name == "LOCATORS" and isinstance(node.value, ast.Dict):
+                    for key, value in zip(node.value.keys, node.value.values):
+                        if isinstance(key, ast.Constant) and isinstance(key.value, str):
+                            index.regions.append(Region(key.lineno, value.end_lineno, LOCATOR, key.value))
+            elif isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
+                index.regions.append(Region(start, end, IGNORE, ""))
+            elif isinstance(node, ast.Pass):
+                index.regions.append(Region(start, end, IGNORE, ""))
+            else:
+                index.regions.append(Region(start, end, OTHER, ""))
+
+    visit(ast.parse(source).body, "")
+    return index
+
+
+class ProjectIndex:
+    """
+    AST индекс Python файлов проекта.
+
+    Файлы разбираются лениво: для поиска ссылок на имя разбираются только
+    файлы, в тексте которых это имя встречается.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self._sources: Optional[Dict[str, str]] = None
+        self._indexes: Dict[str, Optional[FileIndex]] = {}
+
+    def file(self, path: str) -> Optional[FileIndex]:
+        if path not in self._indexes:
+            source = self.sources.get(path)
+            if source is None:
+                try:
+                    with open(os.path.join(self.root, path), encoding="utf-8") as f:
+                        source = f.read()
+                except (OSError, UnicodeDecodeError):
+                    return None
+            self._indexes[path] = _parse(source, path)
+        return self._indexes[path]
+
+    @property
+    def sources(self) -> Dict[str, str]:
+        if self._sources is None:
+            self._sources = {}
+            for directory, dirs, files in os.walk(self.root):
+                dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS and not d.startswith(".")]
+                for name in files:
+                    if not name.endswith(".py"):
+                        continue
+                    path = os.path.relpath(os.path.join(directory, name), self.root)
+                    try:
+                        with open(os.path.join(directory, name), encoding="utf-8") as f:
+                            self._sources[path] = f.read()
+                    except (OSError, UnicodeDecodeError):
+                        pass
+        return self._sources
+
+    def users_of(self, names: Set[str], keys: Set[str]) -> Set[str]:
+        """
+        Символы функций, ссылающихся на имена или ключи LOCATORS (с учетом цепочек присваиваний).
+
+        Args:
+            names: Измененные имена (атрибуты классов, переменные модулей)
+            keys: Измененные ключи LOCATORS
+        """
+        names = set(names)
+        tokens = set(names) | ({"LOCATORS"} if keys else set())
+        indexes: Dict[str, FileIndex] = {}
+        while True:
+            for path, source in self.sources.items():
+                if path not in indexes and any(token in source for token in tokens):
+                    index = self.file(path)
+                    if index is not None:
+                        indexes[path] = index
+
+            found = {
+                region.name
+                for index in indexes.values()
+                for region in index.regions
+                if region.kind == DEFINITION and region.name not in names and (
+                    index.references.get(region.name, set()) & names
+                    or _uses_keys(index.locator_keys.get(region.name, set()), keys)
+                )
+            }
+            if not found:
+                break
+            names |= found
+            tokens |= found
+
+        symbols = set()
+        for index in indexes.values():
+            for region in index.regions:
+                if region.kind != FUNCTION:
+                    continue
+                if index.references.get(region.name, set()) & names \
+                        or _uses_keys(index.locator_keys.get(region.name, set()), keys):
+                    symbols.add(f"{index.module}:{region.name}")
+        return symbols
+
+
+def _uses_keys(used: Set[str], changed: Set[str]) -> bool:
+    return bool(changed) and (ALL_KEYS in used or bool(used & changed))
+
+
+@dataclass
+class FileChange:
+    """Измененные строки файла: новые - в рабочей копии, удаленные - в базовой ревизии."""
+
+    added: Set[int] = field(default_factory=set)
+    removed: Set[int] = field(default_factory=set)
+
+
+def changed_lines(base: str, root: str) -> Optional[Dict[str, FileChange]]:
+    """
+    Строки файлов, измененные относительно base (включая незакоммиченные изменения).
+
+    Returns:
+        Optional[Dict[str, FileChange]]: Изменения по путям или None, если diff получить не удалось
+    """
+    try:
+        output = subprocess.run(
+            ["git", "diff", "-U0", "--no-color", "--no-renames", base, "--"],
+            cwd=root, capture_output=True, text=True, encoding="utf-8", check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError) as e:
+        logger.warning(f"git diff {base} failed: {e}")
+        return None
+
+    changes: Dict[str, FileChange] = {}
+    old_path = path = None
+    for line in output.splitlines():
+        if line.startswith("--- "):
+            old_path = None if line == "--- /dev/null" else os.path.normpath(line[6:])
+        elif line.startswith("+++ "):
+            path = old_path if line == "+++ /dev/null" else os.path.normpath(line[6:])
+            changes.setdefault(path, FileChange())
+        elif path is not None:
+            match = HUNK_RE.match(line)
+            if match:
+                old_start, old_count, new_start, new_count = (
+                    int(match.group(1)), int(match.group(2) or 1), int(match.group(3)), int(match.group(4) or 1)
+                )
+                changes[path].removed.update(range(old_start, old_start + old_count))
+                changes[path].added.update(range(new_start, new_start + new_count))
+    return changes
+
+
+def _base_source(base: str, path: str, root: str) -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "show", f"{base}:{path.replace(os.sep, '/')}"],
+            cwd=root, capture_output=True, text=True, encoding="utf-8", check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def affected_symbols(changes: Dict[str, FileChange], project: ProjectIndex, base: str) -> Optional[Set[str]]:
+    """
+    Символы, затронутые изменениями.
+
+    Добавленные строки сопоставляются с файлом рабочей копии, удаленные -
+    с версией файла в base.
+
+    Returns:
+        Optional[Set[str]]: Символы вида "module:Qual.name"; None - изменение
+            нельзя отнести к функциям, нужен весь набор
+    """
+    symbols: Set[str] = set()
+    names: Set[str] = set()
+    keys: Set[str] = set()
+    for path, change in changes.items():
+        if path.endswith(IGNORED_SUFFIXES):
+            continue
+        if not path.endswith(".py"):
+            logger.info(f"Impact: {path} is not a Python module, selecting all tests")
+            return None
+
+        sides = []
+        if change.added:
+            sides.append((project.file(path), change.added))
+        if change.removed:
+            source = _base_source(base, path, project.root)
+            sides.append((None if source is None else _parse(source, path), change.removed))
+
+        for index, lines in sides:
+            if index is None:
+                return None
+            for line in lines:
+                region = index.region_at(line)
+                if region is None or region.kind == IGNORE:
+                    continue
+                if region.kind in (FUNCTION, CLASS):
+                    symbols.add(f"{index.module}:{region.name}")
+                elif region.kind == LOCATOR:
+                    keys.add(region.name)
+                elif region.kind == DEFINITION:
+                    names.add(region.name)
+                else:
+                    logger.info(f"Impact: {path}:{line} is outside any function, selecting all tests")
+                    return None
+
+    if names or keys:
+        symbols |= project.users_of(names, keys)
+    return symbols
+
+
+def _parse(source: str, path: str) -> Optional[FileIndex]:
+    try:
+        return index_source(source, module_name(path))
+    except SyntaxError:
+        return None
+
+
+class ImpactMap:
+    """
+    Карта тест -> символы, хранимая в JSON.
+
+    Символы хранятся один раз в общем списке, тест ссылается на их индексы.
+    При записи обновляются только тесты текущего прогона.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.tests: Dict[str, Set[str]] = {}
+        self.load()
+
+    def load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != FORMAT_VERSION:
+            return
+        symbols = data["symbols"]
+        self.tests = {test: {symbols[i] for i in indexes} for test, indexes in data["tests"].items()}
+
+    def update(self, recorded: Dict[str, Iterable[str]], collected: Iterable[str] = ()) -> None:
+        """
+        Заменяет записи выполненных тестов и удаляет исчезнувшие тесты.
+
+        Args:
+            recorded: Символы по nodeid выполненных тестов
+            collected: nodeid всех собранных тестов (записи других тестов их файлов удаляются)
+        """
+        collected = set(collected)
+        files = {test.split("::", 1)[0] for test in collected}
+        for test in list(self.tests):
+            if test.split("::", 1)[0] in files and test not in collected:
+                del self.tests[test]
+        for test, symbols in recorded.items():
+            self.tests[test] = set(symbols)
+
+    def save(self) -> None:
+        symbols = sorted(set().union(*self.tests.values())) if self.tests else []
+        positions = {symbol: i for i, symbol in enumerate(symbols)}
+        data = {
+            "version": FORMAT_VERSION,
+            "symbols": symbols,
+            "tests": {test: sorted(positions[s] for s in self.tests[test]) for test in sorted(self.tests)},
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def is_affected(self, test: str, symbols: Set[str]) -> bool:
+        """Тест затронут, если его нет в карте или он вызывал затронутый символ (или вложенный в него)."""
+        used = self.tests.get(test)
+        if used is None:
+            return True
+        for symbol in used:
+            module, _, qualname = symbol.partition(":")
+            parts = qualname.split(".")
+            if any(f"{module}:{'.'.join(parts[:i])}" in symbols for i in range(1, len(parts) + 1)):
+                return True
+        return False
+
+    def select(self, tests: Iterable[str], symbols: Optional[Set[str]]) -> List[str]:
+        """Тесты, которые нужно запустить (все, если symbols is None)."""
+        if symbols is None:
+            return list(tests)
+        return [test for test in tests if self.is_affected(test, symbols)]
+
+
+class CallRecorder:
+    """Профилировщик, запоминающий вызванные функции проекта (код в каталоге root, кроме внешних пакетов)."""
+
+    def __init__(self, root: str) -> None:
+        self.root = os.path.abspath(root) + os.sep
+        self.calls: Set[str] = set()
+        self._symbols: Dict[object, Optional[str]] = {}
+
+    def _symbol(self, code) -> Optional[str]:
+        filename = os.path.abspath(code.co_filename)
+        if not filename.startswith(self.root) or not filename.endswith(".py"):
+            return None
+        path = filename[len(self.root):]
+        if any(part in EXCLUDED_DIRS or "site-packages" in part for part in path.split(os.sep)[:-1]):
+            return None
+        return f"{module_name(path)}:{getattr(code, 'co_qualname', code.co_name)}"
+
+    def _profile(self, frame, event, arg):
+        if event != "call":
+            return
+        code = frame.f_code
+        try:
+            symbol = self._symbols[code]
+        except KeyError:
+            symbol = self._symbols[code] = self._symbol(code)
+        if symbol is not None:
+            self.calls.add(symbol)
+
+    def start(self) -> None:
+        self.calls = set()
+        threading.setprofile(self._profile)
+        sys.setprofile(self._profile)
+
+    def stop(self) -> Set[str]:
+        sys.setprofile(None)
+        threading.setprofile(None)
+        return self.calls
+
+
+impact_symbols_key = pytest.StashKey[Optional[Set[str]]]()
+
+
+class ImpactPlugin:
+    """
+    Плагин pytest: запись карты зависимостей (--impact-record) и выбор тестов по git diff (--impact-diff).
+
+    Фикстуры с областью шире функции создаются один раз, во время первого
+    использующего их теста; вызовы из их setup запоминаются отдельно и
+    добавляются к каждому тесту, в замыкании фикстур которого они есть.
+    """
+
+    def __init__(self, path: str, root: str, record: bool = False, base: Optional[str] = None) -> None:
+        self.map = ImpactMap(path)
+        self.root = root
+        self.base = base
+        self.recorder = CallRecorder(root) if record else None
+        self.recorded: Dict[str, Set[str]] = {}
+        self.fixtures: Dict[str, Set[str]] = {}
+        self.collected: List[str] = []
+
+    def pytest_collection_modifyitems(self, session, config, items):
+        self.collected = [item.nodeid for item in items]
+        if self.base is None:
+            return
+
+        started = time.perf_counter()
+        changes = changed_lines(self.base, self.root)
+        symbols = None if changes is None else affected_symbols(changes, ProjectIndex(self.root), self.base)
+        selected = set(self.map.select(self.collected, symbols))
+        elapsed = time.perf_counter() - started
+
+        deselected = [item for item in items if item.nodeid not in selected]
+        if deselected:
+            items[:] = [item for item in items if item.nodeid in selected]
+            config.hook.pytest_deselected(items=deselected)
+        config.stash[impact_symbols_key] = symbols
+        logger.info(f"Impact selection: {len(items)} of {len(self.collected)} tests in {elapsed * 1000:.1f}ms")
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        if self.recorder is None:
+            yield
+            return
+        self.recorder.start()
+        try:
+            yield
+        finally:
+            calls = self.recorder.stop()
+            for name in getattr(item, "fixturenames", ()):
+                calls |= self.fixtures.get(name, set())
+            self.recorded[item.nodeid] = calls
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        if self.recorder is None or fixturedef.scope == "function":
+            yield
+            return
+        test_calls = self.recorder.calls
+        self.recorder.calls = set()
+        try:
+            yield
+        finally:
+            calls, self.recorder.calls = self.recorder.calls, test_calls
+            test_calls |= calls
+            self.fixtures.setdefault(fixturedef.argname, set()).update(calls)
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        recorded = getattr(node, "workeroutput", {}).get("impact")
+        if recorded:
+            self.recorded.update({test: set(symbols) for test, symbols in recorded.items()})
+
+    def pytest_sessionfinish(self, session):
+        if self.recorder is None:
+            return
+        workeroutput = getattr(session.config, "workeroutput", None)
+        if workeroutput is not None:
+            workeroutput["impact"] = {test: sorted(symbols) for test, symbols in self.recorded.items()}
+            return
+        self.map.update(self.recorded, self.collected)
+        self.map.save()
+
+    def pytest_report_header(self, config):
+        if self.recorder is not None:
+            return f"test impact: recording to {self.map.path}"
+        if self.base is not None:
+            return f"test impact: selecting tests changed since {self.base} ({len(self.map.tests)} tests in map)"
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Тесты, затронутые изменениями относительно git ревизии")
+    parser.add_argument("base", nargs="?", default="HEAD", help="Ревизия для сравнения (по умолчанию HEAD)")
+    parser.add_argument("--map", default=settings.TEST_IMPACT_MAP, help="Файл карты зависимостей")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    impact_map = ImpactMap(args.map)
+    changes = changed_lines(args.base, os.getcwd())
+    symbols = None if changes is None else affected_symbols(changes, ProjectIndex(os.getcwd()), args.base)
+    selected = impact_map.select(sorted(impact_map.tests), symbols)
+    elapsed = time.perf_counter() - started
+
+    for test in selected:
+        print(test)
+    scope = "all tests" if symbols is None else f"{len(symbols)} changed symbols"
+    print(f"# {len(selected)} of {len(impact_map.tests)} mapped tests ({scope}) in {elapsed * 1000:.1f}ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
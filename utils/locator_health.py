@@ -0,0 +1,358 @@
+"""
+Индекс здоровья локаторов LOCATORS.
+
+Все локаторы вычисляются одним вызовом execute_script на открытой странице
+или сохраненном снимке: для каждого измеряется количество совпадений и время
+вычисления, а для XPath проверяется эквивалентный CSS селектор (те же узлы
+на странице). Медленные, сломанные и неоднозначные локаторы помечаются.
+
+Локаторы разных страниц (главная, книга, корзина) проверяются отдельно:
+--locators выбирает имена или шаблоны имен, относящиеся к открытой странице.
+
+Запуск:
+    python -m utils.locator_health https://www.labirint.ru/books/123456/ --locators "book_*"
+    python -m utils.locator_health snapshot.html --locators "search_*,pagination" --json locators.json --fail-under 80
+"""
+import argparse
+import fnmatch
+import json
+import logging
+import os
+import re
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from api.search_parser import XPathStep, compile_xpath
+from config.settings import settings
+from config.test_data import test_data
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+logger = logging.getLogger(__name__)
+
+XPATH = "xpath"
+CSS = "css selector"
+ID = "id"
+
+BROKEN = "broken"
+MISSING = "missing"
+AMBIGUOUS = "ambiguous"
+SLOW = "slow"
+
+MULTIPLE_SUFFIXES = ("_list", "_items", "_results", "pagination")
+
+_CSS_IDENT = re.compile(r"-?[_a-zA-Z][\w-]*")
+
+HEALTH_SCRIPT = """
+const [locators, repeat] = arguments;
+
+function query(by, value) {
+    switch (by) {
+        case "xpath": {
+            const snapshot = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            const nodes = [];
+            for (let i = 0; i < snapshot.snapshotLength; i++) nodes.push(snapshot.snapshotItem(i));
+            return nodes;
+        }
+        case "css selector": return Array.from(document.querySelectorAll(value));
+        case "id": return Array.from(document.querySelectorAll("#" + CSS.escape(value)));
+    }
+    throw new Error("Unsupported locator strategy: " + by);
+}
+
+function measure(by, value) {
+    let nodes = query(by, value);
+    const started = performance.now();
+    for (let i = 0; i < repeat; i++) nodes = query(by, value);
+    return {nodes: nodes, time: (performance.now() - started) / repeat};
+}
+
+return locators.map(([name, by, value, candidates]) => {
+    const result = {name: name, count: 0, time: 0, error: null, css: null, css_time: null};
+    let nodes;
+    try {
+        const measured = measure(by, value);
+        nodes = measured.nodes;
+        result.count = nodes.length;
+        result.time = measured.time;
+    } catch (e) {
+        result.error = String(e.message || e);
+        return result;
+    }
+    for (const css of candidates) {
+        try {
+            const measured = measure("css selector", css);
+            if (measured.nodes.length === nodes.length && measured.nodes.every((node, i) => node === nodes[i])) {
+                result.css = css;
+                result.css_time = measured.time;
+                break;
+            }
+        } catch (e) {}
+    }
+    return result;
+});
+"""
+
+
+def _css_string(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _step_to_css(step: XPathStep, idiomatic: bool) -> str:
+    selector = "" if step.tag == "*" else step.tag
+    for name, value in step.equals:
+        if idiomatic and name == "id" and _CSS_IDENT.fullmatch(value):
+            selector += f"#{value}"
+        elif idiomatic and name == "class" and value.split() and all(_CSS_IDENT.fullmatch(c) for c in value.split()):
+            selector += "".join(f".{c}" for c in value.split())
+        else:
+            selector += f"[{name}={_css_string(value)}]"
+    for name, value in step.contains:
+        if idiomatic and name == "class" and _CSS_IDENT.fullmatch(value):
+            selector += f".{value}"
+        else:
+            selector += f"[{name}*={_css_string(value)}]"
+    return selector or "*"
+
+
+def css_candidates(xpath: str) -> List[str]:
+    """
+    CSS селекторы для простого XPath (оси / и //, предикаты по атрибутам).
+
+    Первым идет идиоматичный селектор (#id, .class), он совпадает с XPath не
+    всегда: contains(@class, 'product') находит и класс product-title-link.
+    Вторым - строгий ([class*="..."]), эквивалентный XPath по построению.
+
+    Returns:
+        List[str]: Кандидаты в порядке предпочтения (пустой, если перевод невозможен)
+    """
+    try:
+        steps = compile_xpath(xpath)
+    except ValueError:
+        return []
+    if not steps[0].descendant:
+        return []
+
+    candidates = []
+    for idiomatic in (True, False):
+        parts = []
+        for index, step in enumerate(steps):
+            if index:
+                parts.append(" " if step.descendant else " > ")
+            parts.append(_step_to_css(step, idiomatic))
+        css = "".join(parts)
+        if css not in candidates:
+            candidates.append(css)
+    return candidates
+
+
+def default_locators() -> Dict[str, str]:
+    """LOCATORS и селекторы полей книги из UI_TEST_DATA."""
+    locators = dict(test_data.LOCATORS)
+    for name, value in test_data.UI_TEST_DATA["book_info_selectors"].items():
+        locators[f"book_info.{name}"] = value
+    return locators
+
+
+def select_locators(locators: Dict[str, str], patterns: Optional[Sequence[str]]) -> Dict[str, str]:
+    """
+    Оставляет локаторы, имена которых совпадают с одним из шаблонов.
+
+    Args:
+        locators: Имя -> локатор
+        patterns: Имена или шаблоны fnmatch ("book_*", "book_info.*"); None - все локаторы
+
+    Returns:
+        Dict[str, str]: Выбранные локаторы в исходном порядке
+
+    Raises:
+        ValueError: Если шаблон не совпал ни с одним локатором
+    """
+    if not patterns:
+        return dict(locators)
+    unmatched = [pattern for pattern in patterns if not fnmatch.filter(locators, pattern)]
+    if unmatched:
+        raise ValueError(f"No locators match: {', '.join(unmatched)}")
+    return {
+        name: value for name, value in locators.items()
+        if any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+    }
+
+
+def expects_many(name: str, value: str) -> bool:
+    """Локатор списка или относительный локатор (вычисляется внутри карточки)."""
+    return value.lstrip().startswith(".") or name.endswith(MULTIPLE_SUFFIXES)
+
+
+@dataclass
+class LocatorHealth:
+    """Результат проверки одного локатора (время - мс на одно вычисление)."""
+
+    name: str
+    by: str
+    value: str
+    count: int = 0
+    time: float = 0.0
+    error: Optional[str] = None
+    css: Optional[str] = None
+    css_time: Optional[float] = None
+    issues: List[str] = field(default_factory=list)
+
+    @property
+    def healthy(self) -> bool:
+        return not self.issues
+
+    @property
+    def speedup(self) -> Optional[float]:
+        if self.css_time is None or self.by == CSS:
+            return None
+        return self.time / max(self.css_time, 0.001)
+
+    def describe(self) -> str:
+        status = ",".join(self.issues) or "ok"
+        css = f"  -> {self.css} ({self.speedup:.1f}x)" if self.speedup is not None else ""
+        return f"{status:<18} {self.count:5} {self.time:8.3f}ms  {self.name}{css}"
+
+
+@dataclass
+class HealthReport:
+    """Индекс здоровья набора локаторов на одной странице."""
+
+    url: str
+    locators: List[LocatorHealth]
+
+    @property
+    def health_index(self) -> float:
+        """Доля локаторов без замечаний, 0-100."""
+        if not self.locators:
+            return 100.0
+        return 100.0 * sum(locator.healthy for locator in self.locators) / len(self.locators)
+
+    def by_issue(self, issue: str) -> List[LocatorHealth]:
+        return [locator for locator in self.locators if issue in locator.issues]
+
+    def summary(self) -> str:
+        counts = ", ".join(f"{issue} {len(self.by_issue(issue))}" for issue in (BROKEN, MISSING, AMBIGUOUS, SLOW))
+        faster = sum(1 for locator in self.locators if (locator.speedup or 0) > 1)
+        return (f"health index {self.health_index:.0f}/100 ({len(self.locators)} locators: {counts}; "
+                f"faster CSS for {faster})")
+
+    def format_table(self) -> str:
+        lines = [f"{'status':<18} {'count':>5} {'time':>10}  locator"]
+        ordered = sorted(self.locators, key=lambda locator: (locator.healthy, -locator.time))
+        lines.extend(locator.describe() for locator in ordered)
+        return "\n".join(lines)
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "url": self.url,
+            "health_index": round(self.health_index, 1),
+            "locators": [asdict(locator) for locator in self.locators],
+        }, ensure_ascii=False, indent=2)
+
+
+def check_locators(
+    driver: "WebDriver",
+    locators: Optional[Dict[str, str]] = None,
+    repeat: int = 20,
+    slow_ms: Optional[float] = None
+) -> HealthReport:
+    """
+    Проверяет локаторы на открытой странице одним вызовом execute_script.
+
+    Args:
+        driver: WebDriver с загруженной страницей или снимком
+        locators: Имя -> XPath (по умолчанию default_locators()); значение вида "css=..." или "id=..." задает стратегию
+        repeat: Количество вычислений каждого локатора для замера времени
+        slow_ms: Порог медленного локатора, мс (по умолчанию LOCATOR_SLOW_MS)
+
+    Returns:
+        HealthReport: Результаты и индекс здоровья
+    """
+    locators = default_locators() if locators is None else locators
+    slow_ms = settings.LOCATOR_SLOW_MS if slow_ms is None else slow_ms
+
+    batch = []
+    for name, value in locators.items():
+        by, value = _strategy(value)
+        batch.append([name, by, value, css_candidates(value) if by == XPATH else []])
+    results = driver.execute_script(HEALTH_SCRIPT, batch, repeat)
+
+    checked = []
+    for (name, by, value, _), result in zip(batch, results):
+        health = LocatorHealth(
+            name=name, by=by, value=value, count=result["count"], time=result["time"],
+            error=result["error"], css=result["css"], css_time=result["css_time"]
+        )
+        if health.error:
+            health.issues.append(BROKEN)
+        elif health.count == 0:
+            health.issues.append(MISSING)
+        elif health.count > 1 and not expects_many(name, value):
+            health.issues.append(AMBIGUOUS)
+        if health.time >= slow_ms:
+            health.issues.append(SLOW)
+        checked.append(health)
+
+    report = HealthReport(driver.current_url, checked)
+    logger.info(f"Locators on {report.url}: {report.summary()}")
+    return report
+
+
+def _strategy(value: str) -> Tuple[str, str]:
+    for prefix, by in (("css=", CSS), ("id=", ID)):
+        if value.startswith(prefix):
+            return by, value[len(prefix):]
+    return XPATH, value
+
+
+def _target_url(target: Optional[str]) -> str:
+    if not target:
+        return settings.BASE_URL
+    if os.path.exists(target):
+        return Path(target).resolve().as_uri()
+    return target
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Индекс здоровья локаторов LOCATORS")
+    parser.add_argument("target", nargs="?", default=None, help="URL страницы или путь к сохраненному HTML (по умолчанию BASE_URL)")
+    parser.add_argument("--repeat", type=int, default=20, help="Количество вычислений каждого локатора")
+    parser.add_argument("--slow-ms", type=float, default=settings.LOCATOR_SLOW_MS, help="Порог медленного локатора, мс")
+    parser.add_argument("--json", default=None, help="Сохранить отчет в JSON")
+    parser.add_argument("--fail-under", type=float, default=0, help="Код возврата 1, если индекс ниже")
+    parser.add_argument(
+        "--locators", default=None,
+        help="Имена или шаблоны локаторов открытой страницы через запятую, например \"book_*,add_to_cart_button\""
+    )
+    args = parser.parse_args(argv)
+
+    patterns = [pattern.strip() for pattern in args.locators.split(",") if pattern.strip()] if args.locators else None
+    try:
+        locators = select_locators(default_locators(), patterns)
+    except ValueError as e:
+        parser.error(str(e))
+
+    from conftest import create_driver
+
+    driver = create_driver()
+    try:
+        driver.get(_target_url(args.target))
+        report = check_locators(driver, locators, repeat=args.repeat, slow_ms=args.slow_ms)
+    finally:
+        driver.quit()
+
+    print(f"url:    {report.url}")
+    print(report.format_table())
+    print(report.summary())
+    if args.json:
+        Path(args.json).write_text(report.to_json(), encoding="utf-8")
+    if report.health_index < args.fail_under:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
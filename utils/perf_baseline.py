@@ -0,0 +1,327 @@
+import logging
+import os
+import sqlite3
+import statistics
+import subprocess
+import threading
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import allure
+import allure_commons
+import pytest
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+TEST = "test"
+STEP = "step"
+API = "api"
+PAGE = "page"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid TEXT UNIQUE NOT NULL,
+    started_at REAL NOT NULL,
+    revision TEXT
+);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    test TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_key ON samples (test, kind, name, run_id);
+"""
+
+MetricKey = Tuple[str, str]
+
+_collector_lock = threading.Lock()
+_collector: Optional[List[Tuple[str, str, float]]] = None
+
+
+def record_metric(kind: str, name: str, value: float) -> None:
+    """
+    Добавляет измерение к текущему тесту (без активного теста ничего не делает).
+
+    Args:
+        kind: Вид метрики (step, api, page)
+        name: Имя метрики внутри теста
+        value: Значение, сек
+    """
+    with _collector_lock:
+        if _collector is not None:
+            _collector.append((kind, name, value))
+
+
+@dataclass
+class Regression:
+    """Метрика теста, ухудшившаяся относительно базовой линии."""
+
+    test: str
+    kind: str
+    name: str
+    current: float
+    baseline: float
+    runs: int
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1 if self.baseline else float("inf")
+
+    def describe(self) -> str:
+        return (
+            f"{self.kind} {self.name}: {self.current:.3f}s vs baseline {self.baseline:.3f}s "
+            f"(+{self.change:.0%}, median of {self.runs} runs)"
+        )
+
+
+class BaselineStore:
+    """
+    История метрик производительности в SQLite.
+
+    Каждый запуск pytest - строка runs (общая для воркеров xdist через
+    PYTEST_XDIST_TESTRUNUID), каждое измерение - строка samples. Базовая линия
+    метрики - медиана по последним window запускам, где значение запуска -
+    медиана его измерений.
+    """
+
+    def __init__(self, path: str, run_uid: Optional[str] = None) -> None:
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._connection.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self.run_uid = run_uid or os.getenv("PYTEST_XDIST_TESTRUNUID") or uuid.uuid4().hex
+        self.run_id = self._register_run()
+
+    def _register_run(self) -> int:
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR IGNORE INTO runs (uid, started_at, revision) VALUES (?, ?, ?)",
+                (self.run_uid, time.time(), _git_revision())
+            )
+        return self._connection.execute("SELECT id FROM runs WHERE uid = ?", (self.run_uid,)).fetchone()[0]
+
+    def add_samples(self, test: str, samples: List[Tuple[str, str, float]]) -> None:
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT INTO samples (run_id, test, kind, name, value) VALUES (?, ?, ?, ?, ?)",
+                [(self.run_id, test, kind, name, value) for kind, name, value in samples]
+            )
+
+    def baseline(self, test: str, kind: str, name: str, window: int) -> Tuple[Optional[float], int]:
+        """
+        Базовая линия метрики по прошлым запускам.
+
+        Returns:
+            Tuple[Optional[float], int]: Медиана и количество учтенных запусков
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                """
+                SELECT run_id, value FROM samples
+                WHERE test = ? AND kind = ? AND name = ? AND run_id IN (
+                    SELECT DISTINCT run_id FROM samples
+                    WHERE test = ? AND kind = ? AND name = ? AND run_id < ?
+                    ORDER BY run_id DESC LIMIT ?
+                )
+                """,
+                (test, kind, name, test, kind, name, self.run_id, window)
+            ).fetchall()
+
+        per_run: Dict[int, List[float]] = defaultdict(list)
+        for run_id, value in rows:
+            per_run[run_id].append(value)
+        if not per_run:
+            return None, 0
+        return statistics.median(statistics.median(values) for values in per_run.values()), len(per_run)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def find_regressions(
+    store: BaselineStore,
+    test: str,
+    samples: List[Tuple[str, str, float]],
+    window: int,
+    min_runs: int,
+    threshold: float,
+    min_delta: float
+) -> List[Regression]:
+    """
+    Сравнивает измерения теста с базовой линией.
+
+    Регрессия - медиана метрики в текущем запуске больше базовой линии
+    более чем на threshold (доля) и более чем на min_delta секунд.
+    """
+    grouped: Dict[MetricKey, List[float]] = defaultdict(list)
+    for kind, name, value in samples:
+        grouped[(kind, name)].append(value)
+
+    regressions = []
+    for (kind, name), values in grouped.items():
+        baseline, runs = store.baseline(test, kind, name, window)
+        if baseline is None or runs < min_runs:
+            continue
+        current = statistics.median(values)
+        if current > baseline * (1 + threshold) and current - baseline > min_delta:
+            regressions.append(Regression(test, kind, name, current, baseline, runs))
+    return regressions
+
+
+def format_regressions(regressions: List[Regression]) -> str:
+    lines = []
+    for test in dict.fromkeys(r.test for r in regressions):
+        lines.append(test)
+        lines.extend(f"    {r.describe()}" for r in regressions if r.test == test)
+    return "\n".join(lines)
+
+
+class _StepTimer:
+    """Слушатель allure_commons: длительность каждого allure.step."""
+
+    def __init__(self) -> None:
+        self._started: Dict[str, Tuple[str, float]] = {}
+
+    @allure_commons.hookimpl
+    def start_step(self, uuid, title, params):
+        self._started[uuid] = (title, time.perf_counter())
+
+    @allure_commons.hookimpl
+    def stop_step(self, uuid, exc_type, exc_val, exc_tb):
+        title, started = self._started.pop(uuid, (None, 0.0))
+        if title is not None and exc_type is None:
+            record_metric(STEP, title, time.perf_counter() - started)
+
+
+_samples_key = pytest.StashKey[list]()
+
+
+class PerfBaselinePlugin:
+    """
+    Плагин pytest: сохраняет метрики каждого прошедшего теста и сравнивает их с историей.
+
+    Метрики: длительность теста и его allure шагов, время API запросов
+    (из трассировок APIClient) и время загрузки страниц (BasePage).
+    Регрессии прикрепляются к тесту в Allure и выводятся в итогах запуска;
+    при PERF_REGRESSION_ACTION=fail запуск завершается с ошибкой.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path: Путь к базе SQLite (открывается при первом прошедшем тесте)
+        """
+        self.path = path
+        self.regressions: List[Regression] = []
+        self.worker_reports: Dict[str, str] = {}
+        self._store: Optional[BaselineStore] = None
+        self._step_timer = _StepTimer()
+        allure_commons.plugin_manager.register(self._step_timer)
+
+    @property
+    def store(self) -> BaselineStore:
+        if self._store is None:
+            self._store = BaselineStore(self.path)
+        return self._store
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        global _collector
+        with _collector_lock:
+            _collector = []
+        started = time.perf_counter()
+
+        outcome = yield
+
+        duration = time.perf_counter() - started
+        with _collector_lock:
+            samples, _collector = _collector, None
+        if outcome.excinfo is not None:
+            return
+
+        samples.append((TEST, "call", duration))
+        item.stash[_samples_key] = samples
+
+    def pytest_api_request_traces(self, item, traces):
+        samples = item.stash.get(_samples_key, None)
+        if samples is None:
+            return
+        for trace in traces:
+            if trace.total is not None and trace.error is None:
+                samples.append((API, f"{trace.method} {urlsplit(trace.url).path}", trace.total))
+
+    def pytest_runtest_makereport(self, item, call):
+        if call.when != "teardown":
+            return
+        samples = item.stash.get(_samples_key, None)
+        if samples:
+            self._evaluate(item.nodeid, samples)
+
+    def _evaluate(self, test: str, samples: List[Tuple[str, str, float]]) -> None:
+        regressions = find_regressions(
+            self.store, test, samples,
+            window=settings.PERF_BASELINE_WINDOW,
+            min_runs=settings.PERF_BASELINE_MIN_RUNS,
+            threshold=settings.PERF_REGRESSION_THRESHOLD,
+            min_delta=settings.PERF_REGRESSION_MIN_DELTA
+        )
+        self.store.add_samples(test, samples)
+        if not regressions:
+            return
+
+        self.regressions.extend(regressions)
+        logger.warning(f"Performance regression in {test}: " + "; ".join(r.describe() for r in regressions))
+        allure.attach(
+            format_regressions(regressions),
+            name="Регрессия производительности",
+            attachment_type=allure.attachment_type.TEXT
+        )
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        report = getattr(node, "workeroutput", {}).get("perf_regressions")
+        if report:
+            self.worker_reports[node.gateway.id] = report
+
+    def pytest_sessionfinish(self, session):
+        workeroutput = getattr(session.config, "workeroutput", None)
+        if workeroutput is not None and self.regressions:
+            workeroutput["perf_regressions"] = format_regressions(self.regressions)
+
+        if (self.regressions or self.worker_reports) and settings.PERF_REGRESSION_ACTION == "fail":
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+        allure_commons.plugin_manager.unregister(self._step_timer)
+        if self._store is not None:
+            self._store.close()
+
+    def pytest_terminal_summary(self, terminalreporter):
+        reports = list(self.worker_reports.values())
+        if self.regressions:
+            reports.insert(0, format_regressions(self.regressions))
+        if not reports:
+            return
+
+        terminalreporter.write_sep("-", f"performance regressions ({settings.PERF_REGRESSION_ACTION})")
+        for report in reports:
+            terminalreporter.write_line(report)
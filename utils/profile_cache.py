@@ -0,0 +1,385 @@
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urljoin
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from config.settings import settings
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+COLD = "cold"
+WARM = "warm"
+
+# Каталоги профиля Chrome с кэшами; остальное (cookies, history, Local Storage)
+# из шаблона удаляется, чтобы сессии не делили состояние
+CACHE_DIRS: Tuple[str, ...] = (
+    os.path.join("Default", "Cache"),
+    os.path.join("Default", "Code Cache"),
+    "GrShaderCache",
+    "ShaderCache",
+)
+
+# Индексы simple cache не вытесняются: без них Chrome отбрасывает весь кэш
+INDEX_FILES = frozenset({"index", "the-real-index"})
+
+META_FILE = "template.json"
+
+FICLONE = 0x40049409
+
+LaunchBrowser = Callable[[Optional[str]], WebDriver]
+
+
+@dataclass
+class ProfileCacheStats:
+    """Статистика кэша профиля в текущем процессе."""
+
+    clones: int = 0
+    clone_time: float = 0.0
+    reflinked_files: int = 0
+    copied_files: int = 0
+    cloned_bytes: int = 0
+    template_builds: int = 0
+    build_time: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"clones={self.clones} clone_time={self.clone_time:.2f}s "
+            f"reflinked={self.reflinked_files} copied={self.copied_files} "
+            f"size={self.cloned_bytes / 1024 / 1024:.1f}MiB "
+            f"builds={self.template_builds} build_time={self.build_time:.2f}s"
+        )
+
+
+class _FileLock:
+    """Межпроцессная блокировка файла (воркеры pytest-xdist делят один шаблон)."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def __enter__(self) -> "_FileLock":
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        os.close(self._fd)
+        self._fd = None
+
+
+def directory_size(path: str) -> int:
+    """Суммарный размер файлов каталога, байт."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def evict_to_size(path: str, max_bytes: int) -> int:
+    """
+    Удаляет самые старые (по mtime) записи кэша, пока каталог не уложится в max_bytes.
+
+    Args:
+        path: Каталог профиля
+        max_bytes: Допустимый размер, байт
+
+    Returns:
+        int: Количество удаленных файлов
+    """
+    entries: List[Tuple[float, int, str]] = []
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            file_path = os.path.join(root, name)
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            total += stat.st_size
+            if name not in INDEX_FILES and name != META_FILE:
+                entries.append((stat.st_mtime, stat.st_size, file_path))
+
+    removed = 0
+    for _, size, file_path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(file_path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+class ProfileCache:
+    """
+    Шаблон user-data-dir Chrome с прогретым HTTP кэшем.
+
+    Шаблон создается один раз: браузер с пустым профилем открывает ключевые
+    страницы сайта, после чего в профиле остаются только каталоги кэша.
+    Каждый браузер получает собственную копию шаблона (reflink на файловых
+    системах с copy-on-write, иначе обычное копирование), поэтому сессии
+    изолированы, но стартуют с горячим кэшем. Шаблон пересобирается, если он
+    старше max_age или изменился список страниц; размер ограничивается
+    --disk-cache-size при прогреве и вытеснением старых записей после него.
+    """
+
+    def __init__(self, root: str, warm_urls: Sequence[str], max_bytes: int, max_age: float) -> None:
+        """
+        Args:
+            root: Каталог кэша (шаблон, копии профилей, файл блокировки)
+            warm_urls: Страницы для прогрева кэша
+            max_bytes: Максимальный размер шаблона, байт
+            max_age: Время жизни шаблона и забытых копий, сек
+        """
+        self.root = root
+        self.warm_urls = list(warm_urls)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.template_dir = os.path.join(root, "template")
+        self.clones_dir = os.path.join(root, "clones")
+        self.stats = ProfileCacheStats()
+        self._lock = threading.RLock()
+        self._profiles: Dict[int, str] = {}
+        self._file_lock = os.path.join(root, "template.lock")
+        self._ready = False
+        self._reflink_supported = sys.platform.startswith("linux") and fcntl is not None
+
+    def browser_arguments(self, profile_dir: str) -> List[str]:
+        """Аргументы Chrome для профиля из кэша."""
+        return [f"--user-data-dir={profile_dir}", f"--disk-cache-size={self.max_bytes}"]
+
+    def ensure_template(self, launch: LaunchBrowser) -> None:
+        """
+        Собирает шаблон, если его нет или он устарел (проверяется один раз на процесс).
+
+        Args:
+            launch: Функция, запускающая браузер с заданным user-data-dir
+        """
+        with self._lock:
+            if self._ready:
+                return
+            with _FileLock(self._file_lock):
+                if not self._is_fresh():
+                    self._build(launch)
+                self._evict_stale_clones()
+            self._ready = True
+
+    def clone(self) -> Optional[str]:
+        """
+        Создает копию шаблона для одного браузера.
+
+        Returns:
+            Optional[str]: Каталог профиля или None, если шаблона нет
+        """
+        started = time.perf_counter()
+        os.makedirs(self.clones_dir, exist_ok=True)
+        path = tempfile.mkdtemp(prefix=f"{os.getpid()}-", dir=self.clones_dir)
+        with _FileLock(self._file_lock):
+            if not os.path.isdir(self.template_dir):
+                shutil.rmtree(path, ignore_errors=True)
+                return None
+            shutil.copytree(
+                self.template_dir, path,
+                dirs_exist_ok=True,
+                copy_function=self._clone_file,
+                ignore=shutil.ignore_patterns(META_FILE)
+            )
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.stats.clones += 1
+            self.stats.clone_time += elapsed
+        logger.debug(f"Cloned browser profile template to {path} in {elapsed:.3f}s")
+        return path
+
+    def launch(self, launch: LaunchBrowser) -> WebDriver:
+        """
+        Запускает браузер с собственной копией шаблона.
+
+        Копия удаляется через quit(driver); если шаблона нет, браузер
+        запускается с пустым профилем.
+
+        Args:
+            launch: Функция, запускающая браузер с заданным user-data-dir
+        """
+        self.ensure_template(launch)
+        profile_dir = self.clone()
+        if profile_dir is None:
+            return launch(None)
+
+        try:
+            driver = launch(profile_dir)
+        except Exception:
+            self.release(profile_dir)
+            raise
+
+        with self._lock:
+            self._profiles[id(driver)] = profile_dir
+        return driver
+
+    def quit(self, driver: WebDriver) -> None:
+        """Закрывает браузер, запущенный через launch(), и удаляет его копию профиля."""
+        with self._lock:
+            profile_dir = self._profiles.pop(id(driver), None)
+        try:
+            driver.quit()
+        finally:
+            if profile_dir is not None:
+                self.release(profile_dir)
+
+    def release(self, profile_dir: str) -> None:
+        shutil.rmtree(profile_dir, ignore_errors=True)
+
+    def _is_fresh(self) -> bool:
+        try:
+            with open(os.path.join(self.template_dir, META_FILE), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return meta.get("urls") == self.warm_urls and time.time() - meta.get("created", 0) < self.max_age
+
+    def _build(self, launch: LaunchBrowser) -> None:
+        started = time.perf_counter()
+        building = f"{self.template_dir}.building"
+        shutil.rmtree(building, ignore_errors=True)
+        os.makedirs(building)
+
+        driver = launch(building)
+        try:
+            for url in self.warm_urls:
+                try:
+                    driver.get(url)
+                except WebDriverException as e:
+                    logger.warning(f"Failed to warm browser cache with {url}: {e}")
+        finally:
+            try:
+                driver.quit()
+            except WebDriverException:
+                pass
+
+        self._prune(building)
+        evicted = evict_to_size(building, self.max_bytes)
+        size = directory_size(building)
+        with open(os.path.join(building, META_FILE), "w", encoding="utf-8") as f:
+            json.dump({"created": time.time(), "urls": self.warm_urls, "size": size}, f)
+
+        shutil.rmtree(self.template_dir, ignore_errors=True)
+        os.replace(building, self.template_dir)
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.stats.template_builds += 1
+            self.stats.build_time += elapsed
+        logger.info(
+            f"Built browser profile template: {size / 1024 / 1024:.1f} MiB, "
+            f"{evicted} entries evicted, {elapsed:.2f}s"
+        )
+
+    @staticmethod
+    def _prune(profile_dir: str) -> None:
+        """Оставляет в профиле только каталоги кэша."""
+        keep = {os.path.normpath(os.path.join(profile_dir, path)) for path in CACHE_DIRS}
+        for root, dirs, files in os.walk(profile_dir, topdown=True):
+            for name in files:
+                os.remove(os.path.join(root, name))
+            for name in list(dirs):
+                path = os.path.normpath(os.path.join(root, name))
+                if path in keep:
+                    dirs.remove(name)
+                elif not any(k.startswith(path + os.sep) for k in keep):
+                    shutil.rmtree(path, ignore_errors=True)
+                    dirs.remove(name)
+
+    def _evict_stale_clones(self) -> None:
+        """Удаляет копии профилей, оставшиеся от аварийно завершенных запусков."""
+        if not os.path.isdir(self.clones_dir):
+            return
+        deadline = time.time() - self.max_age
+        for name in os.listdir(self.clones_dir):
+            path = os.path.join(self.clones_dir, name)
+            try:
+                if os.path.getmtime(path) < deadline:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                pass
+
+    def _clone_file(self, src: str, dst: str) -> str:
+        # Жесткие ссылки не подходят: Chrome дописывает файлы кэша на месте
+        # и изменил бы шаблон; reflink дает копию без копирования данных
+        if self._reflink_supported:
+            try:
+                with open(src, "rb") as source, open(dst, "wb") as target:
+                    fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+                shutil.copystat(src, dst)
+                with self._lock:
+                    self.stats.reflinked_files += 1
+                    self.stats.cloned_bytes += os.path.getsize(dst)
+                return dst
+            except OSError:
+                self._reflink_supported = False
+
+        shutil.copy2(src, dst)
+        with self._lock:
+            self.stats.copied_files += 1
+            self.stats.cloned_bytes += os.path.getsize(dst)
+        return dst
+
+
+_default_cache: Optional[ProfileCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def warm_urls() -> List[str]:
+    """Страницы прогрева из BROWSER_CACHE_WARM_URLS (пути относительно BASE_URL)."""
+    return [
+        urljoin(settings.BASE_URL.rstrip("/") + "/", url.strip())
+        for url in settings.BROWSER_CACHE_WARM_URLS.split(",")
+        if url.strip()
+    ]
+
+
+def default_profile_cache() -> Optional[ProfileCache]:
+    """Кэш профиля из настроек (None в режиме BROWSER_CACHE_MODE=cold)."""
+    global _default_cache
+    if settings.BROWSER_CACHE_MODE != WARM:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ProfileCache(
+                root=settings.BROWSER_CACHE_DIR,
+                warm_urls=warm_urls(),
+                max_bytes=settings.BROWSER_CACHE_MAX_MB * 1024 * 1024,
+                max_age=settings.BROWSER_CACHE_MAX_AGE * 3600
+            )
+        return _default_cache
@@ -0,0 +1,197 @@
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from config.settings import settings
+from utils.devtools import get_event_stream
+
+logger = logging.getLogger(__name__)
+
+THIRD_PARTY_PATTERNS: Tuple[str, ...] = (
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*googlesyndication.com*",
+    "*doubleclick.net*",
+    "*mc.yandex.ru*",
+    "*an.yandex.ru*",
+    "*yandex.ru/ads*",
+    "*top-fwz1.mail.ru*",
+    "*ad.mail.ru*",
+    "*vk.com/rtrg*",
+    "*connect.facebook.net*",
+    "*criteo.*",
+    "*adriver.ru*",
+    "*admitad.com*",
+    "*gdeslon.ru*",
+    "*flocktory.com*",
+    "*mindbox.ru*",
+    "*hotjar.com*",
+    "*tiktok.com*",
+    "*sberads*",
+)
+
+ASSET_PATTERNS: Tuple[str, ...] = (
+    "*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*",
+    "*.woff*", "*.ttf*", "*.otf*", "*.eot*",
+    "*.mp4*", "*.webm*", "*.mp3*",
+)
+
+PROFILES: Dict[str, Tuple[str, ...]] = {
+    "none": (),
+    "third-party": THIRD_PARTY_PATTERNS,
+    "assets": THIRD_PARTY_PATTERNS + ASSET_PATTERNS,
+}
+
+_size_cache: Dict[str, int] = {}
+_size_cache_lock = threading.Lock()
+_size_cache_loaded = False
+
+
+def profile_patterns(profile: str) -> List[str]:
+    """
+    Шаблоны URL профиля блокировки с дополнительными шаблонами из BLOCKED_URL_PATTERNS.
+
+    Raises:
+        ValueError: Если профиль неизвестен
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown blocking profile '{profile}', expected one of: {', '.join(PROFILES)}")
+    patterns = list(PROFILES[profile])
+    if profile != "none":
+        patterns.extend(p.strip() for p in settings.BLOCKED_URL_PATTERNS.split(",") if p.strip())
+    return patterns
+
+
+def _cache_key(url: str) -> str:
+    return url.split("?", 1)[0]
+
+
+def _load_size_cache() -> None:
+    global _size_cache_loaded
+    if _size_cache_loaded:
+        return
+    _size_cache_loaded = True
+    try:
+        with open(settings.BLOCKING_SIZE_CACHE, encoding="utf-8") as f:
+            _size_cache.update(json.load(f))
+    except (OSError, ValueError):
+        pass
+
+
+def save_size_cache() -> None:
+    """Сохраняет размеры ресурсов, увиденные без блокировки, для оценки экономии в следующих запусках."""
+    with _size_cache_lock:
+        if not _size_cache:
+            return
+        path = settings.BLOCKING_SIZE_CACHE
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(_size_cache, f)
+        os.replace(tmp_path, path)
+
+
+@dataclass
+class BlockingReport:
+    """
+    Итоги блокировки запросов за тест.
+
+    saved_bytes - оценка по размерам тех же URL, загруженных ранее без блокировки;
+    unknown_size - заблокированные запросы, размер которых неизвестен.
+    """
+
+    profile: str
+    loaded_requests: int = 0
+    loaded_bytes: int = 0
+    blocked_requests: int = 0
+    saved_bytes: int = 0
+    unknown_size: int = 0
+    blocked_by_type: Counter = field(default_factory=Counter)
+    blocked_hosts: Counter = field(default_factory=Counter)
+
+    def summary(self) -> str:
+        types = ", ".join(f"{kind}: {count}" for kind, count in self.blocked_by_type.most_common())
+        hosts = ", ".join(f"{host}: {count}" for host, count in self.blocked_hosts.most_common(10))
+        return (
+            f"profile:   {self.profile}\n"
+            f"loaded:    {self.loaded_requests} requests, {self.loaded_bytes / 1024:.0f} KiB\n"
+            f"blocked:   {self.blocked_requests} requests, ~{self.saved_bytes / 1024:.0f} KiB saved"
+            f" ({self.unknown_size} of unknown size)\n"
+            f"by type:   {types or '-'}\n"
+            f"by host:   {hosts or '-'}"
+        )
+
+
+class RequestBlocker:
+    """
+    Блокировка запросов браузера по профилю через CDP Network.setBlockedURLs.
+
+    Заблокированные запросы завершаются событием Network.loadingFailed
+    с blockedReason; события читаются из performance-лога через общий
+    DevToolsEventStream драйвера.
+    """
+
+    def __init__(self, driver: WebDriver, profile: str) -> None:
+        self.driver = driver
+        self.profile = profile
+        self.report = BlockingReport(profile=profile)
+        self._requests: Dict[str, Tuple[str, str]] = {}
+        self._stream = get_event_stream(driver)
+        _load_size_cache()
+
+        patterns = profile_patterns(profile)
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        except (WebDriverException, AttributeError) as e:
+            logger.info(f"Request blocking is not available: {e}")
+
+        self._stream.poll()
+        self._stream.subscribe(self._on_event)
+
+    def _on_event(self, method: str, params: Dict) -> None:
+        if method == "Network.requestWillBeSent":
+            url = params.get("request", {}).get("url", "")
+            if not url.startswith("data:"):
+                self._requests[params.get("requestId")] = (url, params.get("type", "Other"))
+        elif method == "Network.loadingFinished":
+            request = self._requests.pop(params.get("requestId"), None)
+            if request is None:
+                return
+            size = int(params.get("encodedDataLength", 0))
+            self.report.loaded_requests += 1
+            self.report.loaded_bytes += size
+            with _size_cache_lock:
+                _size_cache[_cache_key(request[0])] = size
+        elif method == "Network.loadingFailed":
+            request = self._requests.pop(params.get("requestId"), None)
+            if request is None or not params.get("blockedReason"):
+                return
+            url, kind = request
+            self.report.blocked_requests += 1
+            self.report.blocked_by_type[kind] += 1
+            self.report.blocked_hosts[urlsplit(url).netloc or url] += 1
+            with _size_cache_lock:
+                size = _size_cache.get(_cache_key(url))
+            if size is None:
+                self.report.unknown_size += 1
+            else:
+                self.report.saved_bytes += size
+
+    def finish(self) -> BlockingReport:
+        """Дочитывает события и снимает блокировку (драйвер может вернуться в пул)."""
+        self._stream.poll()
+        self._stream.unsubscribe(self._on_event)
+        try:
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": []})
+        except (WebDriverException, AttributeError):
+            pass
+        return self.report
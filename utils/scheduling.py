@@ -0,0 +1,327 @@
+import hashlib
+import heapq
+import json
+import logging
+import os
+import re
+import statistics
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pytest
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+SMOOTHING = 0.3
+FLAKY_THRESHOLD = 0.1
+
+NONE = "none"
+LONGEST_FIRST = "longest-first"
+FAIL_FAST = "fail-fast"
+ORDERS = (NONE, LONGEST_FIRST, FAIL_FAST)
+
+LPT = "lpt"
+HASH = "hash"
+
+GROUP_PREFIX = "lpt-"
+_GROUP_SUFFIX = re.compile(rf"@{GROUP_PREFIX}\d+$")
+
+
+@dataclass
+class TestHistory:
+    """
+    История одного теста.
+
+    duration - сглаженная длительность setup + call + teardown, сек;
+    fail_rate - сглаженная доля падений (1.0 - падал во всех последних запусках).
+    """
+
+    __test__ = False
+
+    duration: float
+    fail_rate: float = 0.0
+    last_failed: bool = False
+    runs: int = 1
+
+    @property
+    def flaky(self) -> bool:
+        return not self.last_failed and self.fail_rate >= FLAKY_THRESHOLD
+
+    def update(self, duration: float, failed: bool) -> None:
+        self.duration += SMOOTHING * (duration - self.duration)
+        self.fail_rate += SMOOTHING * (float(failed) - self.fail_rate)
+        self.last_failed = failed
+        self.runs += 1
+
+
+class DurationHistory:
+    """
+    Длительности и исходы тестов в JSON файле.
+
+    Файл обновляется после каждого запуска: меняются только записи
+    выполненных тестов, записи исчезнувших тестов их файлов удаляются.
+    fingerprint - короткий хеш содержимого файла: одинаковый у задач CI,
+    которые разбили тесты на шарды по одной и той же истории.
+    """
+
+    def __init__(self, path: str, default_duration: float = 1.0) -> None:
+        """
+        Args:
+            path: Путь к файлу истории
+            default_duration: Оценка длительности, пока история пуста
+        """
+        self.path = path
+        self.default_duration = default_duration
+        self.tests: Dict[str, TestHistory] = {}
+        self.updated: Optional[float] = None
+        self.fingerprint: Optional[str] = None
+        self.load()
+
+    def load(self) -> None:
+        try:
+            with open(self.path, "rb") as f:
+                raw = f.read()
+            data = json.loads(raw)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != FORMAT_VERSION:
+            return
+        self.updated = data.get("updated")
+        self.fingerprint = hashlib.sha1(raw).hexdigest()[:8]
+        self.tests = {
+            test: TestHistory(duration, fail_rate, bool(last_failed), runs)
+            for test, (duration, fail_rate, last_failed, runs) in data["tests"].items()
+        }
+
+    def save(self) -> None:
+        self.updated = time.time()
+        data = {
+            "version": FORMAT_VERSION,
+            "updated": round(self.updated),
+            "tests": {
+                test: [round(h.duration, 4), round(h.fail_rate, 4), int(h.last_failed), h.runs]
+                for test, h in sorted(self.tests.items())
+            },
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def is_fresh(self, max_age: Optional[float]) -> bool:
+        """История есть и обновлялась не раньше max_age секунд назад (None - без ограничения)."""
+        if not self.tests or self.updated is None:
+            return False
+        return max_age is None or time.time() - self.updated <= max_age
+
+    def record(self, test: str, duration: float, failed: bool) -> None:
+        history = self.tests.get(test)
+        if history is None:
+            self.tests[test] = TestHistory(duration, float(failed), failed)
+        else:
+            history.update(duration, failed)
+
+    def prune(self, collected: Iterable[str]) -> None:
+        """Удаляет записи тестов, которых больше нет в собранных файлах."""
+        collected = set(collected)
+        files = {test.split("::", 1)[0] for test in collected}
+        for test in list(self.tests):
+            if test.split("::", 1)[0] in files and test not in collected:
+                del self.tests[test]
+
+    def estimate(self, test: str) -> float:
+        """Ожидаемая длительность теста (медиана известных для новых тестов)."""
+        history = self.tests.get(test)
+        if history is not None:
+            return history.duration
+        if self.tests:
+            return statistics.median(h.duration for h in self.tests.values())
+        return self.default_duration
+
+    def fail_fast_key(self, test: str) -> Tuple[int, float]:
+        """Ключ сортировки: недавно упавшие, затем новые и нестабильные, затем остальные; внутри - быстрые первыми."""
+        history = self.tests.get(test)
+        if history is None:
+            tier = 1
+        elif history.last_failed:
+            tier = 0
+        elif history.flaky:
+            tier = 1
+        else:
+            tier = 2
+        return tier, self.estimate(test)
+
+
+def lpt_partition(durations: Sequence[Tuple[str, float]], bins: int) -> List[List[str]]:
+    """
+    Распределяет тесты по bins корзинам: самый долгий - в наименее загруженную (LPT).
+
+    Args:
+        durations: Пары (тест, ожидаемая длительность)
+        bins: Количество корзин (шардов, воркеров)
+
+    Returns:
+        List[List[str]]: Тесты каждой корзины
+    """
+    partition: List[List[str]] = [[] for _ in range(bins)]
+    heap = [(0.0, index) for index in range(bins)]
+    for test, duration in sorted(durations, key=lambda item: (-item[1], item[0])):
+        load, index = heapq.heappop(heap)
+        partition[index].append(test)
+        heapq.heappush(heap, (load + duration, index))
+    return partition
+
+
+def hash_shard(test: str, count: int) -> int:
+    """Номер шарда (с 0) по хешу nodeid: не зависит от истории и одинаков во всех задачах CI."""
+    return int(hashlib.sha1(test.encode("utf-8")).hexdigest(), 16) % count
+
+
+def parse_shard(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    Разбирает значение --shard вида "K/N" (K от 1 до N).
+
+    Raises:
+        pytest.UsageError: Если значение некорректно
+    """
+    if not value:
+        return None
+    match = re.fullmatch(r"(\d+)/(\d+)", value.strip())
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise pytest.UsageError(f"--shard expects K/N with 1 <= K <= N, got '{value}'")
+    return int(match.group(1)), int(match.group(2))
+
+
+class SchedulingPlugin:
+    """
+    Плагин pytest: история длительностей и порядок запуска тестов.
+
+    После каждого запуска в историю записываются длительности (включая
+    создание драйвера в setup) и исходы тестов. По истории тесты делятся
+    на шарды CI (--shard K/N) методом LPT, при --dist loadgroup получают
+    группы xdist, сбалансированные по воркерам, а порядок запуска может
+    быть longest-first (баланс --dist load) или fail-fast (упавшие,
+    нестабильные и быстрые тесты первыми - для запуска с -x).
+
+    LPT шарды согласованы, только если все задачи CI читают один и тот же
+    файл истории: при разных файлах тесты теряются или выполняются дважды.
+    Если истории нет или она старше max_age, шарды делятся по хешу nodeid.
+    """
+
+    def __init__(self, path: str, shard: Optional[Tuple[int, int]] = None, order: str = NONE,
+                 default_duration: float = 1.0, max_age: Optional[float] = None) -> None:
+        """
+        Args:
+            path: Файл истории длительностей
+            shard: Номер шарда и количество шардов
+            order: Порядок запуска (none, longest-first, fail-fast)
+            default_duration: Оценка длительности при пустой истории, сек
+            max_age: Возраст истории, после которого шарды делятся по хешу, сек (None - без ограничения)
+        """
+        if order not in ORDERS:
+            raise pytest.UsageError(f"Unknown schedule order '{order}', expected one of: {', '.join(ORDERS)}")
+        self.history = DurationHistory(path, default_duration)
+        self.shard = shard
+        self.order = order
+        self.max_age = max_age
+        self.shard_method = LPT if self.history.is_fresh(max_age) else HASH
+        self.collected: List[str] = []
+        self._durations: Dict[str, float] = defaultdict(float)
+        self._failed: Dict[str, bool] = defaultdict(bool)
+        self._shard_estimate: Optional[Tuple[float, float]] = None
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_collection_modifyitems(self, config, items):
+        # Шард, группы и порядок назначаются после остальных плагинов (фильтры -m/-k,
+        # выбор по git diff), чтобы балансировать только тесты, которые будут запущены
+        self.collected = [_base_nodeid(item.nodeid) for item in items]
+        yield
+        self.select_shard(config, items)
+        self.assign_groups(config, items)
+        self.sort(items)
+
+    def estimate(self, item) -> float:
+        return self.history.estimate(_base_nodeid(item.nodeid))
+
+    def assign_groups(self, config, items) -> None:
+        """На воркере xdist с --dist loadgroup раскладывает тесты по группам (по группе на воркер)."""
+        workerinput = getattr(config, "workerinput", None)
+        # На воркере dist всегда "no", режим loadgroup передается отдельным флагом
+        if workerinput is None or not config.getvalue("loadgroup"):
+            return
+        bins = int(workerinput["workercount"])
+        partition = lpt_partition([(item.nodeid, self.estimate(item)) for item in items], bins)
+        groups = {test: index for index, tests in enumerate(partition) for test in tests}
+        for item in items:
+            if item.get_closest_marker("xdist_group") is None:
+                group = f"{GROUP_PREFIX}{groups[item.nodeid]}"
+                item.add_marker(pytest.mark.xdist_group(group))
+                # xdist уже добавил суффиксы групп к nodeid в своем хуке - новым группам добавляем так же.
+                # Формат суффикса взят из pytest-xdist 3.6 (закреплен в requirements.txt, см. test_loadgroup_run)
+                item._nodeid = f"{item.nodeid}@{group}"
+
+    def select_shard(self, config, items) -> None:
+        """Оставляет тесты своего шарда: LPT по свежей истории, иначе по хешу nodeid."""
+        if self.shard is None:
+            return
+        index, count = self.shard
+        estimates = [(item.nodeid, self.estimate(item)) for item in items]
+        if self.shard_method == LPT:
+            selected = set(lpt_partition(estimates, count)[index - 1])
+        else:
+            selected = {test for test, _ in estimates if hash_shard(test, count) == index - 1}
+        deselected = [item for item in items if item.nodeid not in selected]
+        if deselected:
+            items[:] = [item for item in items if item.nodeid in selected]
+            config.hook.pytest_deselected(items=deselected)
+        total = sum(duration for _, duration in estimates)
+        self._shard_estimate = (sum(self.estimate(item) for item in items), total)
+
+    def sort(self, items) -> None:
+        """Упорядочивает тесты согласно order."""
+        if self.order == LONGEST_FIRST:
+            items.sort(key=lambda item: -self.estimate(item))
+        elif self.order == FAIL_FAST:
+            items.sort(key=lambda item: self.history.fail_fast_key(_base_nodeid(item.nodeid)))
+
+    def pytest_runtest_logreport(self, report):
+        test = _base_nodeid(report.nodeid)
+        self._durations[test] += report.duration
+        if report.failed:
+            self._failed[test] = True
+
+    def pytest_sessionfinish(self, session):
+        if hasattr(session.config, "workerinput") or not self._durations:
+            return
+        for test, duration in self._durations.items():
+            self.history.record(test, duration, self._failed[test])
+        self.history.prune(self.collected)
+        self.history.save()
+        logger.info(f"Saved durations of {len(self._durations)} tests to {self.history.path}")
+
+    def pytest_report_header(self, config):
+        if self.shard is None and self.order == NONE:
+            return None
+        parts = [f"order {self.order}"]
+        if self.shard is not None:
+            parts.insert(0, f"shard {self.shard[0]}/{self.shard[1]} by {self.shard_method}")
+        history = f"{len(self.history.tests)} tests in history {self.history.fingerprint or '-'}"
+        return f"scheduling: {', '.join(parts)} ({history})"
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self._shard_estimate is None:
+            return
+        shard, total = self._shard_estimate
+        terminalreporter.write_sep("-", "shard")
+        terminalreporter.write_line(
+            f"shard {self.shard[0]}/{self.shard[1]} by {self.shard_method} "
+            f"(history {self.history.fingerprint or '-'}): estimated {shard:.1f}s of {total:.1f}s total"
+        )
+
+
+def _base_nodeid(nodeid: str) -> str:
+    return _GROUP_SUFFIX.sub("", nodeid)
@@ -0,0 +1,215 @@
+import ast
+import inspect
+import logging
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, List, Optional, Set
+
+try:
+    from _pytest.mark.expression import Expression, ParseError
+except ImportError:
+    # Внутренний модуль pytest: без него фильтр -m статически не вычисляется
+    Expression = ParseError = None
+
+logger = logging.getLogger(__name__)
+
+MARKER_HOOKS = ("add_marker", "applymarker")
+# Идентификатор в выражении -m (как в _pytest.mark.expression)
+MARKEXPR_IDENT = re.compile(r"(?:\w|:|\+|-|\.|\[|\]|\\|/)+")
+MARKEXPR_OPERATORS = {"and", "or", "not"}
+
+
+class _MarkNames:
+    """Имена, под которыми модуль импортировал pytest и pytest.mark."""
+
+    def __init__(self, tree: ast.Module) -> None:
+        self.pytest: Set[str] = set()
+        self.mark: Set[str] = set()
+        self.star_import = False
+
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                self.pytest |= {alias.asname or alias.name for alias in node.names if alias.name == "pytest"}
+            elif isinstance(node, ast.ImportFrom) and node.module == "pytest":
+                for alias in node.names:
+                    if alias.name == "*":
+                        self.star_import = True
+                    elif alias.name == "mark":
+                        self.mark.add(alias.asname or alias.name)
+
+    def is_mark(self, node: ast.AST) -> bool:
+        """Является ли node ссылкой на pytest.mark."""
+        if isinstance(node, ast.Name):
+            return node.id in self.mark
+        return (isinstance(node, ast.Attribute) and node.attr == "mark"
+                and isinstance(node.value, ast.Name) and node.value.id in self.pytest)
+
+
+def _mark_attribute(node: ast.expr, names: _MarkNames) -> Optional[ast.Attribute]:
+    """Узел pytest.mark.NAME из выражения pytest.mark.NAME или pytest.mark.NAME(...)."""
+    if isinstance(node, ast.Call):
+        node = node.func
+    if isinstance(node, ast.Attribute) and names.is_mark(node.value):
+        return node
+    return None
+
+
+def _marks(nodes: List[ast.expr], names: _MarkNames, resolved: Set[int]) -> Set[str]:
+    marks = set()
+    for node in nodes:
+        attribute = _mark_attribute(node, names)
+        if attribute is not None:
+            resolved.add(id(attribute.value))
+            marks.add(attribute.attr)
+    return marks
+
+
+def _pytestmark(tree: ast.Module, names: _MarkNames, resolved: Set[int]) -> Set[str]:
+    marks: Set[str] = set()
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == "pytestmark" for t in node.targets):
+            value = node.value
+            elements = list(value.elts) if isinstance(value, (ast.List, ast.Tuple)) else [value]
+            marks |= _marks(elements, names, resolved)
+    return marks
+
+
+def static_marks(source: str) -> Optional[List[Set[str]]]:
+    """
+    Маркеры тестов модуля, видимые без его импорта.
+
+    Учитываются pytestmark модуля и декораторы pytest.mark.* классов Test* и
+    функций test_*, в том числе при импорте под другим именем (import pytest
+    as pt, from pytest import mark). Если маркеры могут добавляться
+    динамически (pytest.param с marks, add_marker) или ссылка на pytest.mark
+    используется иначе (например, маркер сохранен в переменную), возвращается None.
+
+    Args:
+        source: Исходный код модуля
+
+    Returns:
+        Optional[List[Set[str]]]: Набор маркеров для каждого теста
+    """
+    tree = ast.parse(source)
+    names = _MarkNames(tree)
+    if names.star_import:
+        return None
+    for node in ast.walk(tree):
+        if isinstance(node, ast.keyword) and node.arg == "marks":
+            return None
+        if isinstance(node, ast.Attribute) and node.attr in MARKER_HOOKS:
+            return None
+
+    resolved: Set[int] = set()
+    module_marks = _pytestmark(tree, names, resolved)
+    tests = []
+
+    def visit(body: List[ast.stmt], inherited: Set[str]) -> None:
+        for node in body:
+            if isinstance(node, ast.ClassDef) and node.name.startswith("Test"):
+                visit(node.body, inherited | _marks(node.decorator_list, names, resolved))
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith("test"):
+                tests.append(inherited | _marks(node.decorator_list, names, resolved))
+
+    visit(tree.body, module_marks)
+
+    if any(names.is_mark(node) and id(node) not in resolved for node in ast.walk(tree)):
+        return None
+    return tests
+
+
+def added_marks(source: str) -> Optional[Set[str]]:
+    """
+    Маркеры, которые код добавляет тестам через add_marker/applymarker.
+
+    Args:
+        source: Исходный код conftest.py или модуля плагина
+
+    Returns:
+        Optional[Set[str]]: Имена маркеров или None, если имя нельзя определить статически
+    """
+    tree = ast.parse(source)
+    names = _MarkNames(tree)
+    marks: Set[str] = set()
+
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and node.func.attr in MARKER_HOOKS):
+            continue
+        marker = node.args[0] if node.args else next((k.value for k in node.keywords if k.arg == "marker"), None)
+        if isinstance(marker, ast.Constant) and isinstance(marker.value, str):
+            marks.add(marker.value)
+            continue
+        attribute = _mark_attribute(marker, names) if marker is not None else None
+        if attribute is None:
+            return None
+        marks.add(attribute.attr)
+
+    return marks
+
+
+@lru_cache(maxsize=None)
+def _added_marks_in(path: Path) -> Optional[Set[str]]:
+    try:
+        return added_marks(path.read_text(encoding="utf-8"))
+    except (OSError, SyntaxError, UnicodeDecodeError) as e:
+        logger.debug(f"Cannot read markers added by {path}: {e}")
+        return None
+
+
+def marker_sources(path: Path, rootpath: Path, plugins: Iterable[object] = ()) -> List[Path]:
+    """
+    Файлы проекта, хуки которых могут добавить маркеры тестам модуля.
+
+    Args:
+        path: Путь к тестовому модулю
+        rootpath: Корень проекта (config.rootpath)
+        plugins: Зарегистрированные плагины (config.pluginmanager.get_plugins())
+
+    Returns:
+        List[Path]: conftest.py от корня до каталога модуля и модули плагинов проекта
+    """
+    sources = [d / "conftest.py" for d in path.parents if d == rootpath or rootpath in d.parents]
+    for plugin in plugins:
+        file = getattr(inspect.getmodule(plugin), "__file__", None)
+        if file and rootpath in Path(file).parents:
+            sources.append(Path(file))
+    return [source for source in dict.fromkeys(sources) if source.is_file()]
+
+
+def module_may_match(path: Path, markexpr: str, sources: Iterable[Path] = ()) -> bool:
+    """
+    Может ли хотя бы один тест модуля пройти фильтр -m (без импорта модуля).
+
+    Если статически ответить нельзя, возвращается True.
+
+    Args:
+        path: Путь к тестовому модулю
+        markexpr: Выражение -m
+        sources: conftest.py и модули плагинов, которые могут добавлять маркеры (marker_sources)
+
+    Returns:
+        bool: False, если модуль заведомо не содержит подходящих тестов
+    """
+    if Expression is None or "(" in markexpr:
+        # Аргументы маркеров статически не сравниваются
+        return True
+
+    dynamic: Set[str] = set()
+    for source in sources:
+        marks = _added_marks_in(Path(source))
+        if marks is None:
+            return True
+        dynamic |= marks
+    if dynamic & (set(MARKEXPR_IDENT.findall(markexpr)) - MARKEXPR_OPERATORS):
+        return True
+    try:
+        tests = static_marks(path.read_text(encoding="utf-8"))
+        expression = Expression.compile(markexpr)
+    except (OSError, SyntaxError, ParseError) as e:
+        logger.debug(f"Cannot evaluate marks of {path} statically: {e}")
+        return True
+    if not tests:
+        return True
+    return any(expression.evaluate(lambda name, marks=marks: name in marks) for marks in tests)
@@ -0,0 +1,333 @@
+import hashlib
+import html
+import json
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional, Dict, List
+from urllib.parse import urlsplit, parse_qs, urlencode
+
+from config.test_data import test_data
+
+logger = logging.getLogger(__name__)
+
+ENDPOINTS = test_data.API_TEST_DATA["search_endpoints"]
+
+PER_PAGE = 24
+MAX_RESULTS = 120
+
+AUTHORS = [
+    "Лев Толстой", "Федор Достоевский", "Михаил Булгаков", "Джоан Роулинг",
+    "Джордж Оруэлл", "Рэй Брэдбери", "Жюль Верн", "Илья Ильф, Евгений Петров",
+]
+
+FORMATS = ["Подарочное издание", "Комментарии", "Иллюстрации", "Твердый переплет", "Мягкая обложка"]
+
+
+@dataclass
+class EndpointFault:
+    """Настройки деградации для эндпоинта."""
+
+    latency: float = 0.0
+    status: Optional[int] = None
+    chunk_delay: float = 0.0
+    chunk_size: int = 1024
+    times: int = 0
+    served: int = 0
+    redirect: Optional[str] = None
+
+
+def _seed(*parts: object) -> int:
+    digest = hashlib.md5("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return int(digest[:8], 16)
+
+
+def total_results(query: str) -> int:
+    """Количество найденных товаров для запроса (детерминировано)."""
+    query = query.strip()
+    if not query:
+        return 0
+    return 30 + _seed(query) % (MAX_RESULTS - 30)
+
+
+def make_products(query: str, page: int = 1, per_page: int = PER_PAGE) -> List[Dict[str, object]]:
+    """Генерирует товары для страницы результатов поиска."""
+    total = total_results(query)
+    start = (page - 1) * per_page
+    products = []
+
+    for index in range(start, min(start + per_page, total)):
+        seed = _seed(query, index)
+        product_id = 100000 + seed % 900000
+        price = 200 + seed % 1800
+        products.append({
+            "id": product_id,
+            "title": f"{query.strip().capitalize()}. {FORMATS[seed % len(FORMATS)]}",
+            "author": AUTHORS[seed % len(AUTHORS)],
+            "price": price,
+            "old_price": price + 100 + seed % 400 if seed % 3 == 0 else None,
+            "url": f"/books/{product_id}/",
+        })
+
+    return products
+
+
+def render_product(product: Dict[str, object]) -> str:
+    old_price = ""
+    if product["old_price"]:
+        old_price = f'<span class="price-old"><span>{product["old_price"]}</span> ₽</span>'
+
+    return (
+        f'<div class="product need-watch watched" data-product-id="{product["id"]}">'
+        f'<a class="product-title-link" href="{product["url"]}" title="{html.escape(str(product["title"]))}">'
+        f'{html.escape(str(product["title"]))}</a>'
+        f'<div class="product-author"><a href="/authors/{_seed(product["author"]) % 10000}/">'
+        f'{html.escape(str(product["author"]))}</a></div>'
+        f'<div class="product-pricing"><span class="price-val"><span>{product["price"]}</span> ₽</span>'
+        f'{old_price}</div>'
+        f'<a class="btn-buy" href="/cart/?id={product["id"]}">В корзину</a>'
+        f'</div>'
+    )
+
+
+def render_search_page(query: str, page: int = 1, per_page: int = PER_PAGE) -> str:
+    """HTML страницы результатов поиска в разметке, совпадающей с LOCATORS."""
+    total = total_results(query)
+    pages = max(1, -(-total // per_page))
+    products = make_products(query, page, per_page)
+    escaped_query = html.escape(query)
+
+    pagination = f'<div class="pagination-number">{page}</div>'
+    if page > 1:
+        pagination += f'<a class="pagination-prev" href="/search/?{urlencode({"q": query, "page": page - 1})}">Назад</a>'
+    if page < pages:
+        pagination += f'<a class="pagination-next" href="/search/?{urlencode({"q": query, "page": page + 1})}">Вперед</a>'
+
+    header = (
+        '<div class="b-header-b-menu-e-list"></div>'
+        '<a class="b-header-b-logo-e-logo" href="/">Лабиринт</a>'
+        f'<input id="search-field" value="{escaped_query}">'
+        '<button type="submit" class="b-header-b-search-e-btn">Найти</button>'
+    )
+
+    return (
+        '<!DOCTYPE html><html lang="ru"><head><meta charset="utf-8">'
+        f'<title>Поиск: {escaped_query} | Лабиринт - книжный магазин</title></head><body>'
+        f'{header}'
+        f'<div class="search-result"><h1>Все, что мы нашли в Лабиринте по запросу «{escaped_query}»</h1>'
+        f'<span class="search-result-count">{total} товаров</span>'
+        f'{"".join(render_product(p) for p in products)}'
+        f'</div><div class="pagination">{pagination}</div>'
+        '</body></html>'
+    )
+
+
+def render_quicksearch(query: str) -> str:
+    items = "".join(
+        f'<li><a href="{p["url"]}">{html.escape(str(p["title"]))}</a> — {p["price"]} ₽</li>'
+        for p in make_products(query, per_page=5)
+    )
+    return f'<div class="quicksearch"><ul>{items}</ul></div>'
+
+
+def render_autocomplete(query: str) -> str:
+    return json.dumps(
+        [{"label": p["title"], "value": p["title"], "id": p["id"]} for p in make_products(query, per_page=10)],
+        ensure_ascii=False
+    )
+
+
+def render_main_page() -> str:
+    return (
+        '<!DOCTYPE html><html lang="ru"><head><meta charset="utf-8">'
+        f'<title>{test_data.UI_TEST_DATA["expected_page_title"]}</title></head><body>'
+        '<a class="b-header-b-logo-e-logo" href="/">Лабиринт</a>'
+        '<input id="search-field"><button type="submit" class="b-header-b-search-e-btn">Найти</button>'
+        '</body></html>'
+    )
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server: "_StubHTTPServer"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        parts = urlsplit(self.path)
+        params = {key: values[0] for key, values in parse_qs(parts.query, keep_blank_values=True).items()}
+        path = parts.path
+        stub = self.server.stub
+        stub.hit(path)
+        try:
+            self._handle(path, params, stub)
+        finally:
+            stub.done()
+
+    def _handle(self, path: str, params: Dict[str, str], stub: "LabirintStubServer") -> None:
+        fault = stub.faults.get(path, EndpointFault())
+        if fault.latency:
+            time.sleep(fault.latency)
+
+        query = params.get("q", params.get("term", ""))
+        content_type = "text/html; charset=utf-8"
+
+        if fault.redirect is not None:
+            self._send(302, render_main_page(), content_type, fault, {"Location": fault.redirect})
+            return
+
+        if path == ENDPOINTS["search"]:
+            try:
+                page = int(params.get("page", "1") or 1)
+            except ValueError:
+                self._send(400, "<html><body>Bad Request</body></html>", content_type, fault)
+                return
+            body = render_search_page(query, page)
+        elif path == ENDPOINTS["quick_search"]:
+            body = render_quicksearch(query)
+        elif path == ENDPOINTS["autocomplete"]:
+            body = render_autocomplete(query)
+            content_type = "application/json; charset=utf-8"
+        elif path == "/":
+            body = render_main_page()
+        else:
+            self._send(404, "<html><body>Not Found</body></html>", content_type, fault)
+            return
+
+        self._send(stub.fault_status(fault) or 200, body, content_type, fault)
+
+    def _send(
+        self,
+        status: int,
+        body: str,
+        content_type: str,
+        fault: EndpointFault,
+        headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+        try:
+            if not fault.chunk_delay:
+                self.wfile.write(payload)
+                return
+
+            for start in range(0, len(payload), fault.chunk_size):
+                self.wfile.write(payload[start:start + fault.chunk_size])
+                self.wfile.flush()
+                time.sleep(fault.chunk_delay)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format: str, *args: object) -> None:
+        logger.debug(format % args)
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    stub: "LabirintStubServer"
+
+    def handle_error(self, request, client_address) -> None:
+        # Клиент, оборвавший соединение по таймауту, - ожидаемый сценарий тестов
+        error = sys.exc_info()[1]
+        if isinstance(error, (ConnectionResetError, BrokenPipeError)):
+            logger.debug(f"Client {client_address} closed connection: {error}")
+            return
+        super().handle_error(request, client_address)
+
+
+class LabirintStubServer:
+    """
+    Локальный HTTP-сервер, имитирующий поисковые эндпоинты Лабиринта.
+
+    Для каждого эндпоинта можно задать задержку ответа, код статуса
+    и медленную отдачу тела ответа по частям. peak_inflight - наибольшее
+    число запросов, которые сервер обрабатывал одновременно.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.faults: Dict[str, EndpointFault] = {}
+        self.hits: Counter = Counter()
+        self.inflight = 0
+        self.peak_inflight = 0
+        self._lock = threading.Lock()
+        self._server = _StubHTTPServer((host, port), _StubHandler)
+        self._server.stub = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "LabirintStubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="labirint-stub", daemon=True)
+        self._thread.start()
+        logger.info(f"Labirint stub server started at {self.url}")
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def inject(
+        self,
+        endpoint: str,
+        latency: float = 0.0,
+        status: Optional[int] = None,
+        chunk_delay: float = 0.0,
+        chunk_size: int = 1024,
+        times: int = 0,
+        redirect: Optional[str] = None
+    ) -> None:
+        """
+        Включает деградацию эндпоинта.
+
+        Args:
+            endpoint: Путь эндпоинта, например "/search/"
+            latency: Задержка перед ответом, сек
+            status: Код статуса вместо 200
+            chunk_delay: Пауза между частями тела ответа, сек
+            chunk_size: Размер части тела ответа, байт
+            times: Сколько первых ответов вернуть с кодом status (0 - все)
+            redirect: Ответить 302 с этим Location
+        """
+        self.faults[endpoint] = EndpointFault(latency, status, chunk_delay, chunk_size, times, redirect=redirect)
+
+    def hit(self, path: str) -> None:
+        """Учитывает запрос к эндпоинту (обработчики работают в разных потоках)."""
+        with self._lock:
+            self.hits[path] += 1
+            self.inflight += 1
+            self.peak_inflight = max(self.peak_inflight, self.inflight)
+
+    def done(self) -> None:
+        """Отмечает завершение обработки запроса."""
+        with self._lock:
+            self.inflight -= 1
+
+    def fault_status(self, fault: EndpointFault) -> Optional[int]:
+        """Код статуса для очередного ответа с учетом ограничения times."""
+        if fault.status is None or not fault.times:
+            return fault.status
+        with self._lock:
+            if fault.served >= fault.times:
+                return None
+            fault.served += 1
+            return fault.status
+
+    def reset(self) -> None:
+        """Сбрасывает деградации и счетчики запросов."""
+        self.faults.clear()
+        with self._lock:
+            self.hits.clear()
+            self.peak_inflight = self.inflight
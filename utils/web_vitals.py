@@ -0,0 +1,227 @@
+import logging
+import weakref
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+logger = logging.getLogger(__name__)
+
+PERFORMANCE_SCRIPT = """
+const settle = arguments[0];
+const done = arguments[arguments.length - 1];
+const result = {lcp: null, lcpElement: null, cls: 0, longTasks: 0, longTaskTotal: 0, blockingTime: 0};
+const observers = [];
+
+function observe(type, callback) {
+    try {
+        const observer = new PerformanceObserver(list => list.getEntries().forEach(callback));
+        observer.observe({type: type, buffered: true});
+        observers.push([observer, callback]);
+    } catch (e) {
+        result[type + "Unsupported"] = true;
+    }
+}
+
+observe("largest-contentful-paint", entry => {
+    result.lcp = entry.startTime;
+    const el = entry.element;
+    result.lcpElement = el ? el.tagName.toLowerCase() + (el.id ? "#" + el.id : "") : (entry.url || null);
+});
+let session = 0, sessionStart = 0, sessionEnd = 0;
+observe("layout-shift", entry => {
+    if (entry.hadRecentInput) return;
+    if (session && entry.startTime - sessionEnd < 1000 && entry.startTime - sessionStart < 5000) {
+        session += entry.value;
+    } else {
+        session = entry.value;
+        sessionStart = entry.startTime;
+    }
+    sessionEnd = entry.startTime;
+    result.cls = Math.max(result.cls, session);
+});
+function longTask(duration) {
+    result.longTasks += 1;
+    result.longTaskTotal += duration;
+    result.blockingTime += Math.max(0, duration - 50);
+}
+if (Array.isArray(window.__qaLongTasks)) {
+    window.__qaLongTasks.forEach(longTask);
+} else {
+    observe("longtask", entry => longTask(entry.duration));
+}
+
+setTimeout(() => {
+    observers.forEach(([observer, callback]) => {
+        observer.takeRecords().forEach(callback);
+        observer.disconnect();
+    });
+
+    const nav = performance.getEntriesByType("navigation")[0];
+    result.navigation = nav ? {
+        ttfb: nav.responseStart - nav.startTime,
+        domInteractive: nav.domInteractive,
+        domContentLoaded: nav.domContentLoadedEventEnd,
+        load: nav.loadEventEnd,
+        transferSize: nav.transferSize,
+        decodedBodySize: nav.decodedBodySize
+    } : null;
+    const paint = performance.getEntriesByName("first-contentful-paint")[0];
+    result.fcp = paint ? paint.startTime : null;
+
+    const resources = {};
+    for (const entry of performance.getEntriesByType("resource")) {
+        const type = entry.initiatorType || "other";
+        const summary = resources[type] || (resources[type] = {count: 0, transferSize: 0, duration: 0});
+        summary.count += 1;
+        summary.transferSize += entry.transferSize || 0;
+        summary.duration = Math.max(summary.duration, entry.duration);
+    }
+    result.resources = resources;
+    result.url = location.href;
+    done(result);
+}, settle);
+"""
+
+# Записи longtask не буферизуются браузером, поэтому наблюдатель ставится до загрузки страницы
+LONG_TASK_BOOTSTRAP = """
+window.__qaLongTasks = [];
+try {
+    new PerformanceObserver(list => list.getEntries().forEach(e => window.__qaLongTasks.push(e.duration)))
+        .observe({type: "longtask"});
+} catch (e) {}
+"""
+
+_bootstrapped: "weakref.WeakSet[WebDriver]" = weakref.WeakSet()
+
+
+def install_long_task_observer(driver: WebDriver) -> None:
+    """Регистрирует наблюдатель long tasks для всех следующих документов драйвера (один раз)."""
+    if driver in _bootstrapped:
+        return
+    _bootstrapped.add(driver)
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": LONG_TASK_BOOTSTRAP})
+    except (WebDriverException, AttributeError) as e:
+        logger.info(f"Long task observer is not available: {e}")
+
+
+@dataclass
+class ResourceSummary:
+    """Сводка Resource Timing по одному типу ресурсов (initiatorType)."""
+
+    count: int
+    transfer_size: int
+    max_duration: float
+
+
+@dataclass
+class PagePerformance:
+    """
+    Показатели производительности страницы после навигации.
+
+    Времена в миллисекундах от начала навигации, размеры в байтах.
+    Значение None означает, что браузер не поддерживает метрику или она не наступила.
+    """
+
+    url: str
+    ttfb: Optional[float] = None
+    fcp: Optional[float] = None
+    dom_content_loaded: Optional[float] = None
+    load: Optional[float] = None
+    lcp: Optional[float] = None
+    lcp_element: Optional[str] = None
+    cls: float = 0.0
+    long_tasks: int = 0
+    long_task_total: float = 0.0
+    total_blocking_time: float = 0.0
+    document_size: int = 0
+    resources: Dict[str, ResourceSummary] = field(default_factory=dict)
+
+    @property
+    def resource_count(self) -> int:
+        return sum(r.count for r in self.resources.values())
+
+    @property
+    def transfer_size(self) -> int:
+        return self.document_size + sum(r.transfer_size for r in self.resources.values())
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["resource_count"] = self.resource_count
+        data["transfer_size"] = self.transfer_size
+        return data
+
+    def budget_violations(self, budget: Dict[str, float]) -> List[str]:
+        """
+        Проверяет показатели против бюджета.
+
+        Args:
+            budget: Максимальные значения по именам полей, например {"lcp": 4000, "cls": 0.1}
+
+        Returns:
+            List[str]: Описания превышений (пустой список, если бюджет соблюден)
+        """
+        violations = []
+        for metric, limit in budget.items():
+            value = getattr(self, metric)
+            if value is None:
+                continue
+            if value > limit:
+                violations.append(f"{metric} = {value:.3g} > {limit:.3g}")
+        return violations
+
+    def summary(self) -> str:
+        def ms(value: Optional[float]) -> str:
+            return "-" if value is None else f"{value:.0f}ms"
+
+        return (
+            f"{self.url}\n"
+            f"TTFB {ms(self.ttfb)}, FCP {ms(self.fcp)}, DCL {ms(self.dom_content_loaded)}, load {ms(self.load)}\n"
+            f"LCP {ms(self.lcp)} ({self.lcp_element or '-'}), CLS {self.cls:.3f}\n"
+            f"long tasks {self.long_tasks} ({self.long_task_total:.0f}ms, TBT {self.total_blocking_time:.0f}ms)\n"
+            f"resources {self.resource_count}, {self.transfer_size / 1024:.0f} KiB transferred"
+        )
+
+
+def capture_page_performance(driver: WebDriver, settle_ms: int = 200) -> Optional[PagePerformance]:
+    """
+    Собирает Navigation Timing, Resource Timing, LCP, CLS и long tasks одним скриптом.
+
+    Наблюдатели PerformanceObserver создаются с buffered: true, поэтому получают
+    и записи, появившиеся до вызова; settle_ms дает странице время досообщить
+    последние кандидаты LCP.
+
+    Args:
+        driver: Экземпляр WebDriver
+        settle_ms: Время ожидания новых записей, мс
+
+    Returns:
+        Optional[PagePerformance]: Показатели или None, если скрипт выполнить не удалось
+    """
+    try:
+        data = driver.execute_async_script(PERFORMANCE_SCRIPT, settle_ms)
+    except WebDriverException as e:
+        logger.info(f"Page performance is not available: {e}")
+        return None
+
+    navigation = data.get("navigation") or {}
+    return PagePerformance(
+        url=data.get("url", ""),
+        ttfb=navigation.get("ttfb"),
+        fcp=data.get("fcp"),
+        dom_content_loaded=navigation.get("domContentLoaded"),
+        load=navigation.get("load") or None,
+        lcp=data.get("lcp"),
+        lcp_element=data.get("lcpElement"),
+        cls=data.get("cls") or 0.0,
+        long_tasks=data.get("longTasks") or 0,
+        long_task_total=data.get("longTaskTotal") or 0.0,
+        total_blocking_time=data.get("blockingTime") or 0.0,
+        document_size=navigation.get("transferSize") or 0,
+        resources={
+            kind: ResourceSummary(int(r["count"]), int(r["transferSize"]), float(r["duration"]))
+            for kind, r in (data.get("resources") or {}).items()
+        }
+    )